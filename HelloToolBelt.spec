@@ -20,10 +20,15 @@ a = Analysis(
         ('eligibility_tool.py', '.'),
         ('configurator_tool.py', '.'),
         ('multisearch_tool.py', '.'),
+        ('multisearch_engine.py', '.'),  # Multi-file search worker functions
+        ('multisearch_index.py', '.'),  # Multi-file search folder index
         ('Cron_tool.py', '.'),
         ('Base64_Tool.py', '.'),
         ('DLQ_Tool.py', '.'),
         ('bill_hunter.py', '.'),
+        ('db_pool.py', '.'),  # Shared PostgreSQL connection pool
+        ('bill_hunter_engine.py', '.'),  # Bill Hunter matching engine
+        ('bill_hunter_cache.py', '.'),  # Bill Hunter local query cache
         ('shipping_map.py', '.'),
         ('hedis.py', '.'),
         ('icon.icns', '.'),  # Lowercase to match code
@@ -37,10 +42,15 @@ a = Analysis(
         'eligibility_tool',
         'configurator_tool', 
         'multisearch_tool',
+        'multisearch_engine',
+        'multisearch_index',
         'Cron_tool',
         'Base64_Tool',
         'DLQ_Tool',
         'bill_hunter',
+        'db_pool',
+        'bill_hunter_engine',
+        'bill_hunter_cache',
         'shipping_map',
         'hedis',
         'pandas',
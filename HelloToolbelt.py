@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import importlib.util
+import multiprocessing
 import sys
 import os
 import json
@@ -55,6 +56,12 @@ try:
 except ImportError:
     KEYRING_AVAILABLE = False
 
+try:
+    from db_pool import get_shared_pool, configure_shared_pool, close_shared_pool
+    DB_POOL_AVAILABLE = True
+except ImportError:
+    DB_POOL_AVAILABLE = False
+
 class AutoUpdater:
     
     def __init__(self, github_repo=GITHUB_REPO, current_version=APP_VERSION):
@@ -1931,6 +1938,8 @@ class MultiToolLauncher:
         self.db_name = tk.StringVar(value='')
         self.db_user = tk.StringVar(value='')
         self.db_password = tk.StringVar(value='')
+        self.db_pool_max_connections = tk.StringVar(value='4')
+        self.db_pool_idle_timeout = tk.StringVar(value='300')
         
         self.aws_access_key = tk.StringVar(value='')
         self.aws_secret_key = tk.StringVar(value='')
@@ -1950,6 +1959,7 @@ class MultiToolLauncher:
                     self.db_port.set(config.get('port', '5432'))
                     self.db_name.set(config.get('database', ''))
                     self.db_user.set(config.get('username', ''))
+                    self._apply_db_pool_settings(config)
             
             aws_config_file = os.path.join(os.path.expanduser('~'), '.hellotoolbelt_aws_config.json')
             if os.path.exists(aws_config_file):
@@ -1959,6 +1969,17 @@ class MultiToolLauncher:
         except Exception as e:
             pass
     
+    def _apply_db_pool_settings(self, config):
+        self.db_pool_settings = {
+            'pool_max_connections': config.get('pool_max_connections', 4),
+            'pool_idle_timeout': config.get('pool_idle_timeout', 300)
+        }
+        self.db_pool_max_connections.set(str(self.db_pool_settings['pool_max_connections']))
+        self.db_pool_idle_timeout.set(str(self.db_pool_settings['pool_idle_timeout']))
+        if DB_POOL_AVAILABLE:
+            configure_shared_pool(max_connections=self.db_pool_settings['pool_max_connections'],
+                                  idle_timeout=self.db_pool_settings['pool_idle_timeout'])
+    
     def ensure_credentials_loaded(self):
         if self._credentials_loaded:
             return
@@ -1978,6 +1999,7 @@ class MultiToolLauncher:
                     self.db_port.set(config.get('port', '5432'))
                     self.db_name.set(config.get('database', ''))
                     self.db_user.set(config.get('username', ''))
+                    self._apply_db_pool_settings(config)
             
             password = self.credential_manager.get_db_credentials()
             if password:
@@ -1989,13 +2011,28 @@ class MultiToolLauncher:
             pass
     
     def save_db_config(self):
+        try:
+            pool_max_connections = int(self.db_pool_max_connections.get().strip())
+            pool_idle_timeout = int(self.db_pool_idle_timeout.get().strip())
+        except ValueError:
+            messagebox.showerror("Invalid Pool Settings",
+                               "Max connections and idle timeout must be whole numbers.")
+            return
+        if pool_max_connections < 1 or pool_idle_timeout < 5:
+            messagebox.showerror("Invalid Pool Settings",
+                               "Max connections must be at least 1 and idle timeout at least 5 seconds.")
+            return
+        
         try:
             config = {
                 'host': self.db_host.get(),
                 'port': self.db_port.get(),
                 'database': self.db_name.get(),
-                'username': self.db_user.get()
+                'username': self.db_user.get(),
+                'pool_max_connections': pool_max_connections,
+                'pool_idle_timeout': pool_idle_timeout
             }
+            self._apply_db_pool_settings(config)
             config_file = os.path.join(os.path.expanduser('~'), '.hellotoolbelt_db_config.json')
             with open(config_file, 'w') as f:
                 json.dump(config, f, indent=2)
@@ -2057,15 +2094,21 @@ class MultiToolLauncher:
         
         def test_connection():
             try:
-                import psycopg2
-                conn = psycopg2.connect(
-                    host=host,
-                    port=port,
-                    database=database,
-                    user=user,
-                    password=password
-                )
-                conn.close()
+                if DB_POOL_AVAILABLE:
+                    with get_shared_pool().connection(host, port, database, user, password) as conn:
+                        cursor = conn.cursor()
+                        cursor.execute("SELECT 1")
+                        cursor.close()
+                else:
+                    import psycopg2
+                    conn = psycopg2.connect(
+                        host=host,
+                        port=port,
+                        database=database,
+                        user=user,
+                        password=password
+                    )
+                    conn.close()
                 
                 progress.stop()
                 test_window.destroy()
@@ -3265,6 +3308,23 @@ class MultiToolLauncher:
                                  width=25, show="*")
         password_entry.grid(row=2, column=3, sticky="ew", pady=(0, 10))
         
+        tk.Label(db_grid, text="Max connections:", font=('Segoe UI', 10, 'bold'),
+                bg=colors['frame_bg'], fg=colors['fg']).grid(row=3, column=0, sticky="w", pady=(0, 10), padx=(0, 10))
+        pool_size_entry = tk.Entry(db_grid, textvariable=self.db_pool_max_connections, font=('Segoe UI', 10), width=10)
+        pool_size_entry.grid(row=3, column=1, sticky="w", padx=(0, 20), pady=(0, 10))
+        
+        tk.Label(db_grid, text="Idle timeout (s):", font=('Segoe UI', 10, 'bold'),
+                bg=colors['frame_bg'], fg=colors['fg']).grid(row=3, column=2, sticky="w", pady=(0, 10), padx=(0, 10))
+        idle_timeout_entry = tk.Entry(db_grid, textvariable=self.db_pool_idle_timeout, font=('Segoe UI', 10), width=10)
+        idle_timeout_entry.grid(row=3, column=3, sticky="w", pady=(0, 10))
+        
+        pool_info_label = tk.Label(db_grid,
+                                  text="Connections are kept open and shared across tools: up to this many per "
+                                       "server and user, closed after sitting idle this long.",
+                                  font=('Segoe UI', 9), bg=colors['frame_bg'], fg=colors['text_secondary'],
+                                  wraplength=700, justify=tk.LEFT)
+        pool_info_label.grid(row=4, column=0, columnspan=4, sticky="w", pady=(0, 10))
+        
         db_grid.columnconfigure(1, weight=2)
         db_grid.columnconfigure(3, weight=1)
         
@@ -3557,6 +3617,9 @@ class MultiToolLauncher:
             for tool_name in tool_names:
                 self.safe_tool_cleanup(tool_name)
             
+            if DB_POOL_AVAILABLE:
+                close_shared_pool()
+            
             self.root.quit()
             self.root.destroy()
             self.log_info("Application cleanup completed")
@@ -4392,4 +4455,6 @@ def main():
         run_app(None)
 
 if __name__ == "__main__":
+    # Frozen builds re-launch this executable for tool worker processes
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
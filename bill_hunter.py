@@ -1,8 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext, simpledialog
 import csv
+import io
 import os
 import json
+import time
 from datetime import datetime
 try:
     import psycopg2
@@ -10,6 +12,19 @@ try:
 except ImportError:
     PSYCOPG2_AVAILABLE = False
 
+try:
+    from db_pool import get_shared_pool, configure_shared_pool
+    DB_POOL_AVAILABLE = True
+except ImportError:
+    DB_POOL_AVAILABLE = False
+
+from bill_hunter_engine import (run_match, build_file_index, file_key_rows, DateNormalizer, ColumnStore,
+                                load_batch_manifest, run_batch_audit, DEFAULT_BATCH_WORKERS,
+                                ingest_postgres_export, detect_delimiter, guess_match_columns,
+                                clean_postgres_value)
+from bill_hunter_cache import (QueryCache, build_refresh_query, build_user_ids_query, build_users_by_id_query,
+                               missing_user_ids)
+
 try:
     import boto3
     from botocore.exceptions import ClientError, NoCredentialsError, ProfileNotFound
@@ -21,6 +36,36 @@ except ImportError:
 DATE_PARSE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d',
                       '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S']
 
+S3_BUCKET = "s3.hello.do.integration"
+S3_PROFILE = "default"
+
+QUERY_FETCH_BATCH_SIZE = 5000
+
+SEARCH_DEBOUNCE_MS = 150
+
+# Characters str.strip() removes, passed to btrim as %(strip_chars)s
+SQL_STRIP_CHARS = ''.join(chr(code) for code in range(0x3001) if chr(code).isspace())
+
+
+def _sql_unquote(expr):
+    # The quote handling of clean_postgres_value: one pair of surrounding double quotes is dropped
+    return (f"CASE WHEN left({expr}, 1) = '\"' AND right({expr}, 1) = '\"' "
+            f"THEN substr({expr}, 2, greatest(length({expr}) - 2, 0)) ELSE {expr} END")
+
+
+# Server-side copy of the client join's clean_postgres_value keys for each users row, as c.*.
+# The DOB stays text, as the client compares it, so a malformed DOB cannot fail the query.
+SQL_CLEAN_KEYS = "\n".join([
+    "CROSS JOIN LATERAL (SELECT btrim(COALESCE(u.first_name::text, ''), %(strip_chars)s) AS first_name,",
+    "                           btrim(COALESCE(u.last_name::text, ''), %(strip_chars)s) AS last_name,",
+    "                           btrim(COALESCE(u.date_of_birth::text, ''), %(strip_chars)s) AS dob) s",
+    f"CROSS JOIN LATERAL (SELECT lower({_sql_unquote('s.first_name')}) AS first_name,",
+    f"                           lower({_sql_unquote('s.last_name')}) AS last_name,",
+    f"                           {_sql_unquote('s.dob')} AS dob) c"
+])
+SQL_NAME_MATCH = "{alias}.first_name = c.first_name AND {alias}.last_name = c.last_name"
+SQL_DOB_MATCH = "to_char({alias}.dob, 'YYYY-MM-DD') = c.dob"
+
 def format_file_size(size_bytes):
     try:
         size_int = int(size_bytes)
@@ -35,6 +80,15 @@ def format_file_size(size_bytes):
     except:
         return str(size_bytes)
 
+def make_s3_client(profile=None):
+    """S3 client for a named AWS profile; the default profile uses boto3's own credential chain"""
+    session_kwargs = {}
+    if profile and profile != "default":
+        session_kwargs['profile_name'] = profile
+    
+    session = boto3.Session(**session_kwargs)
+    return session.client('s3')
+
 def parse_date(date_str, formats=None):
     if not date_str or not str(date_str).strip():
         return None
@@ -225,8 +279,8 @@ class ScrollableFrame(tk.Frame):
         self.canvas.after_idle(lambda: self._bind_mousewheel_to_children(self.scrollable_frame))
 
 class S3FileBrowserWidget(tk.Frame):
-    def __init__(self, parent, bucket="s3.hello.do.integration", initial_prefix="clients/", 
-                 profile="default", on_file_select=None, bg_color='#ffffff', auto_load=True, **kwargs):
+    def __init__(self, parent, bucket=S3_BUCKET, initial_prefix="clients/", 
+                 profile=S3_PROFILE, on_file_select=None, bg_color='#ffffff', auto_load=True, **kwargs):
         super().__init__(parent, bg=bg_color, **kwargs)
         
         self.bucket = bucket
@@ -236,6 +290,7 @@ class S3FileBrowserWidget(tk.Frame):
         self.bg_color = bg_color
         
         self.all_items = []
+        self.all_item_keys = []
         
         self.sort_reverse = {}
         self.current_sort_column = None
@@ -364,12 +419,7 @@ class S3FileBrowserWidget(tk.Frame):
         self.update()
         
         try:
-            session_kwargs = {}
-            if self.profile and self.profile != "default":
-                session_kwargs['profile_name'] = self.profile
-            
-            session = boto3.Session(**session_kwargs)
-            s3_client = session.client('s3')
+            s3_client = make_s3_client(self.profile)
             
             list_kwargs = {
                 'Bucket': self.bucket,
@@ -402,9 +452,12 @@ class S3FileBrowserWidget(tk.Frame):
                 modified = obj['LastModified'].strftime('%Y-%m-%d %H:%M:%S')
                 files.append((filename, size, modified))
             
+            self.all_items = []
+            self.all_item_keys = []
+            
             for folder in sorted(folders):
-                self.tree.insert('', 'end', text=f"📁 {folder}", 
-                               values=('Folder', '--', ''), tags=('folder',))
+                self.all_items.append((f"📁 {folder}", ('Folder', '--', ''), ('folder',)))
+                self.all_item_keys.append({'#0': folder.lower(), 'Type': None, 'Size': None, 'Modified': None})
             
             for filename, size, modified in sorted(files):
                 size_str = format_file_size(size)
@@ -418,15 +471,11 @@ class S3FileBrowserWidget(tk.Frame):
                 else:
                     icon = '📄'
                 
-                self.tree.insert('', 'end', text=f"{icon} {filename}", 
-                               values=('File', size_str, modified), tags=('file',))
+                self.all_items.append((f"{icon} {filename}", ('File', size_str, modified), ('file',)))
+                self.all_item_keys.append({'#0': filename.lower(), 'Type': 'file', 'Size': size, 
+                                           'Modified': parse_date(modified)})
             
-            self.all_items = []
-            for item in self.tree.get_children():
-                item_text = self.tree.item(item, 'text')
-                item_values = self.tree.item(item, 'values')
-                item_tags = self.tree.item(item, 'tags')
-                self.all_items.append((item_text, item_values, item_tags))
+            self._render_items(self.all_items)
             
             folder_count = len(folders)
             file_count = len(files)
@@ -546,19 +595,13 @@ class S3FileBrowserWidget(tk.Frame):
         if search_term == "filter files...":
             return
         
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         if not search_term or search_term.strip() == "":
-            for text, values, tags in self.all_items:
-                self.tree.insert('', 'end', text=text, values=values, tags=tags)
+            self._render_items(self.all_items)
         else:
-            matching_count = 0
-            for text, values, tags in self.all_items:
-                clean_text = text.replace('📁 ', '').replace('📊 ', '').replace('📄 ', '').replace('📋 ', '')
-                if search_term in clean_text.lower():
-                    self.tree.insert('', 'end', text=text, values=values, tags=tags)
-                    matching_count += 1
+            matching = [item for item, keys in zip(self.all_items, self.all_item_keys)
+                        if search_term in keys['#0']]
+            self._render_items(matching)
+            matching_count = len(matching)
             
             if matching_count == 0:
                 self.status_label.config(text=f"No matches for '{search_term}'")
@@ -576,78 +619,46 @@ class S3FileBrowserWidget(tk.Frame):
         file_count = len(self.all_items) - folder_count
         self.status_label.config(text=f"✓ {folder_count} folder(s), {file_count} file(s)")
     
+    def _render_items(self, items):
+        self.tree.delete(*self.tree.get_children())
+        for text, values, tags in items:
+            self.tree.insert('', 'end', text=text, values=values, tags=tags)
+    
     def sort_tree_column(self, col):
-        items = []
-        for item_id in self.tree.get_children():
-            if col == '#0':
-                value = self.tree.item(item_id, 'text')
-            else:
-                values = self.tree.item(item_id, 'values')
-                col_index = ['Type', 'Size', 'Modified'].index(col)
-                value = values[col_index]
-            items.append((value, item_id))
-        
         reverse = self.sort_reverse.get(col, False)
         self.sort_reverse[col] = not reverse
         self.current_sort_column = col
         
-        if col == 'Modified':
-            def date_sort_key(item):
-                val = item[0]
-                if not val or val == '' or val == '--':
-                    return datetime.min if not reverse else datetime.max
-                try:
-                    return datetime.strptime(val, "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    try:
-                        return datetime.strptime(val, "%Y-%m-%d")
-                    except ValueError:
-                        return datetime.min if not reverse else datetime.max
-            
-            items.sort(key=date_sort_key, reverse=reverse)
+        keys = self.all_item_keys
         
-        elif col == 'Size':
-            def size_sort_key(item):
-                val = item[0]
-                if val == '--':
-                    return -1 if not reverse else float('inf')
-                try:
-                    if ' B' in val:
-                        return float(val.replace(' B', ''))
-                    elif ' KB' in val:
-                        return float(val.replace(' KB', '')) * 1024
-                    elif ' MB' in val:
-                        return float(val.replace(' MB', '')) * 1024 * 1024
-                    elif ' GB' in val:
-                        return float(val.replace(' GB', '')) * 1024 * 1024 * 1024
-                    else:
-                        return 0
-                except:
-                    return 0
-            
-            items.sort(key=size_sort_key, reverse=reverse)
+        # Folders (no Type/Size/Modified key) stay on top in both directions
+        def folder_rank(i):
+            is_folder = keys[i]['Type'] is None
+            return (0 if is_folder else 1) if not reverse else (1 if is_folder else 0)
         
+        if col == '#0':
+            def sort_key(i):
+                return (folder_rank(i), keys[i]['#0'])
         elif col == 'Type':
-            def type_sort_key(item):
-                val = item[0]
-                if val == 'Folder':
-                    return (0, '') if not reverse else (1, '')
-                else:
-                    return (1, val.lower()) if not reverse else (0, val.lower())
-            
-            items.sort(key=type_sort_key, reverse=reverse)
-        
+            sort_key = folder_rank
+        elif col == 'Modified':
+            missing = datetime.min if not reverse else datetime.max
+            def sort_key(i):
+                return keys[i]['Modified'] or missing
         else:
-            def name_sort_key(item):
-                text = item[0]
-                clean_text = text.replace('📁 ', '').replace('📊 ', '').replace('📄 ', '').replace('📋 ', '')
-                is_folder = '📁' in text
-                return (0 if is_folder else 1, clean_text.lower()) if not reverse else (1 if is_folder else 0, clean_text.lower())
-            
-            items.sort(key=name_sort_key, reverse=reverse)
+            missing = -1 if not reverse else float('inf')
+            def sort_key(i):
+                value = keys[i]['Size']
+                return missing if value is None else value
         
-        for index, (value, item_id) in enumerate(items):
-            self.tree.move(item_id, '', index)
+        order = sorted(range(len(self.all_items)), key=sort_key, reverse=reverse)
+        self.all_items = [self.all_items[i] for i in order]
+        self.all_item_keys = [keys[i] for i in order]
+        
+        if self.search_var.get().lower() == "filter files...":
+            self._render_items(self.all_items)
+        else:
+            self.filter_current_view()
         
         for column in ['#0', 'Type', 'Size', 'Modified']:
             if column == col:
@@ -775,12 +786,7 @@ class S3BrowserDialog:
         self.dialog.update()
         
         try:
-            session_kwargs = {}
-            if self.profile and self.profile != "default":
-                session_kwargs['profile_name'] = self.profile
-            
-            session = boto3.Session(**session_kwargs)
-            s3_client = session.client('s3')
+            s3_client = make_s3_client(self.profile)
             
             list_kwargs = {
                 'Bucket': self.bucket,
@@ -911,6 +917,230 @@ class S3BrowserDialog:
         self.result = None
         self.dialog.destroy()
 
+class IndexedRows:
+    """Read-only sequence of rows[i] for i in indices, without copying the rows"""
+    
+    def __init__(self, rows, indices):
+        self.rows = rows
+        self.indices = indices
+    
+    def __len__(self):
+        return len(self.indices)
+    
+    def __getitem__(self, position):
+        return self.rows[self.indices[position]]
+    
+    def __iter__(self):
+        rows = self.rows
+        for index in self.indices:
+            yield rows[index]
+
+class VirtualTable(tk.Frame):
+    """Treeview that only renders the visible window of a backing row list
+    
+    The Treeview holds one item per visible line; scrolling rewrites those
+    items from self.rows instead of inserting every row into Tcl.
+    """
+    
+    def __init__(self, parent, bg_color='#ffffff', select_bg='#0a9640', select_fg='#ffffff', *args, **kwargs):
+        super().__init__(parent, bg=bg_color, *args, **kwargs)
+        
+        self.columns = []
+        self.rows = []
+        self.offset = 0
+        self.visible_count = 1
+        self.selected = set()
+        self.anchor = None
+        self.items = []
+        
+        self.row_height = 20
+        self.header_height = 25
+        
+        self.v_scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.h_scrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL)
+        
+        self.tree = ttk.Treeview(self, selectmode='none', show='headings',
+                                 xscrollcommand=self.h_scrollbar.set)
+        self.h_scrollbar.config(command=self.tree.xview)
+        
+        self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        
+        self.tree.tag_configure('selected', background=select_bg, foreground=select_fg)
+        
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        self.tree.bind('<Button-1>', self._on_click)
+        self.tree.bind('<Shift-Button-1>', lambda e: self._on_click(e, extend=True))
+        self.tree.bind('<Control-Button-1>', lambda e: self._on_click(e, toggle=True))
+        self.tree.bind('<Command-Button-1>', lambda e: self._on_click(e, toggle=True))
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self._scroll_by(-self.visible_count))
+        self.tree.bind('<Next>', lambda e: self._scroll_by(self.visible_count))
+        self.tree.bind('<Home>', lambda e: self._scroll_to(0))
+        self.tree.bind('<End>', lambda e: self._scroll_to(len(self.rows)))
+        self.tree.bind('<Control-a>', self.select_all)
+        self.tree.bind('<Command-a>', self.select_all)
+    
+    def set_columns(self, columns, heading_command=None, width=150):
+        self.columns = list(columns)
+        self._clear_items()
+        
+        self.tree['columns'] = self.columns
+        for col in self.columns:
+            if heading_command:
+                self.tree.heading(col, text=col, command=lambda c=col: heading_command(c))
+            else:
+                self.tree.heading(col, text=col)
+            self.tree.column(col, width=width, anchor=tk.W)
+    
+    def set_heading(self, col, text, heading_command=None):
+        if heading_command:
+            self.tree.heading(col, text=text, command=lambda c=col: heading_command(c))
+        else:
+            self.tree.heading(col, text=text)
+    
+    def set_rows(self, rows, keep_position=False):
+        """Show rows (a list that is displayed as-is, not copied)"""
+        self.rows = rows
+        self.selected.clear()
+        self.anchor = None
+        if not keep_position:
+            self.offset = 0
+        self._render()
+    
+    def selected_rows(self):
+        return [self.rows[i] for i in sorted(self.selected) if i < len(self.rows)]
+    
+    def select_all(self, event=None):
+        self.selected = set(range(len(self.rows)))
+        self._render()
+        return 'break'
+    
+    def yview(self, *args):
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == 'pages':
+                amount *= self.visible_count
+            self._scroll_by(amount)
+    
+    def _scroll_by(self, amount):
+        self._scroll_to(self.offset + amount)
+        return 'break'
+    
+    def _scroll_to(self, offset):
+        max_offset = max(0, len(self.rows) - self.visible_count)
+        offset = max(0, min(offset, max_offset))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+        else:
+            self._update_scrollbar()
+        return 'break'
+    
+    def _on_mousewheel(self, event):
+        if abs(event.delta) >= 120:
+            steps = -int(event.delta / 120) * 3
+        else:
+            steps = -event.delta
+        return self._scroll_by(steps)
+    
+    def _on_resize(self, event=None):
+        if self.items:
+            bbox = self.tree.bbox(self.items[0])
+            if bbox:
+                self.header_height = bbox[1]
+                self.row_height = max(1, bbox[3])
+        
+        visible = max(1, (self.tree.winfo_height() - self.header_height) // self.row_height)
+        if visible != self.visible_count:
+            self.visible_count = visible
+            self.offset = max(0, min(self.offset, len(self.rows) - visible))
+            self._render()
+    
+    def _row_index_at(self, y):
+        item = self.tree.identify_row(y)
+        if not item or item not in self.items:
+            return None
+        index = self.offset + self.items.index(item)
+        return index if index < len(self.rows) else None
+    
+    def _on_click(self, event, extend=False, toggle=False):
+        self.tree.focus_set()
+        
+        if self.tree.identify_region(event.x, event.y) not in ('cell', 'tree'):
+            return
+        
+        index = self._row_index_at(event.y)
+        if index is None:
+            return 'break'
+        
+        if extend and self.anchor is not None:
+            low, high = sorted((self.anchor, index))
+            self.selected = set(range(low, high + 1))
+        elif toggle:
+            self.selected ^= {index}
+            self.anchor = index
+        else:
+            self.selected = {index}
+            self.anchor = index
+        
+        self._render()
+        return 'break'
+    
+    def _move_selection(self, step):
+        if not self.rows:
+            return 'break'
+        
+        current = self.anchor if self.anchor is not None else self.offset - step
+        index = max(0, min(len(self.rows) - 1, current + step))
+        self.selected = {index}
+        self.anchor = index
+        
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_count:
+            self.offset = index - self.visible_count + 1
+        
+        self._render()
+        return 'break'
+    
+    def _clear_items(self):
+        if self.items:
+            self.tree.delete(*self.items)
+        self.items = []
+    
+    def _render(self):
+        count = max(0, min(self.visible_count, len(self.rows) - self.offset))
+        
+        while len(self.items) < count:
+            self.items.append(self.tree.insert('', tk.END))
+        if len(self.items) > count:
+            self.tree.delete(*self.items[count:])
+            del self.items[count:]
+        
+        for position, item in enumerate(self.items):
+            index = self.offset + position
+            tags = ('selected',) if index in self.selected else ()
+            self.tree.item(item, values=self.rows[index], tags=tags)
+        
+        self._update_scrollbar()
+    
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible_count:
+            self.v_scrollbar.set(0, 1)
+        else:
+            self.v_scrollbar.set(self.offset / total, (self.offset + self.visible_count) / total)
+
 class FileParserGUI:
     def __init__(self, root):
         self.root = root
@@ -986,8 +1216,20 @@ class FileParserGUI:
         self.matched_results = []
         self.sort_reverse = {}
         self.query_cancelled = False
-        self.db_connection = None
-        self.db_cursor = None
+        self.last_query_timing = None
+        self.match_timings = {}
+        self.batch_results = []
+        self.query_cache = QueryCache()
+        self.use_query_cache = tk.BooleanVar(value=True)
+        self.fuzzy_match = tk.BooleanVar(value=False)
+        self.all_results = []
+        self.view_indices = []
+        self.sort_key_cache = {}
+        self.current_sort = None
+        self.search_blobs = None
+        self.last_search = ('', [])
+        self.filter_after_id = None
+        self.active_db_connection = None  # Only for stop_query; each DB worker owns its own handles
         self.selected_s3_file = None
         self.polling_active = False
         
@@ -1293,9 +1535,9 @@ class FileParserGUI:
         
         self.s3_browser = S3FileBrowserWidget(
             self.s3_content_frame,
-            bucket="s3.hello.do.integration",
+            bucket=S3_BUCKET,
             initial_prefix="clients/",
-            profile="default",
+            profile=S3_PROFILE,
             on_file_select=self.on_s3_file_selected,
             bg_color=self.bg_color,
             auto_load=False
@@ -1358,8 +1600,8 @@ class FileParserGUI:
                                 "Please select a file from the S3 browser first.")
             return
         
-        bucket = "s3.hello.do.integration"
-        profile = "default"
+        bucket = self.s3_browser.bucket
+        profile = self.s3_browser.profile
         
         progress_window = tk.Toplevel(self.root)
         progress_window.title("Downloading from S3")
@@ -1390,12 +1632,7 @@ class FileParserGUI:
             try:
                 import tempfile
                 
-                session_kwargs = {}
-                if profile and profile != "default":
-                    session_kwargs['profile_name'] = profile
-                
-                session = boto3.Session(**session_kwargs)
-                s3_client = session.client('s3')
+                s3_client = make_s3_client(profile)
                 
                 temp_dir = tempfile.gettempdir()
                 filename = s3_key.split('/')[-1]
@@ -1411,14 +1648,14 @@ class FileParserGUI:
                     
                     with open(local_path, 'r', encoding='utf-8') as f:
                         reader = csv.reader(f, delimiter=self.detected_delimiter)
-                        rows = list(reader)
+                        headers, data = ColumnStore.from_rows(reader)
                     
-                    if not rows:
+                    if headers is None:
                         messagebox.showwarning("Empty File", "The downloaded file is empty!")
                         return
                     
-                    self.headers = rows[0]
-                    self.data = rows[1:]
+                    self.headers = headers
+                    self.data = data
                     
                     if hasattr(self.root, 'log_file_access'):
                         self.root.log_file_access(f"s3://{bucket}/{s3_key}", "LOADED_FROM_S3")
@@ -1450,7 +1687,8 @@ class FileParserGUI:
                     
                     delimiter_name = {'|': 'Pipe (|)', ',': 'Comma (,)', '\t': 'Tab (\\t)'}
                     self.s3_info_label.config(
-                        text=f"✓ Loaded: {filename} | Rows: {len(self.data)} | Columns: {len(self.headers)}",
+                        text=f"✓ Loaded: {filename} | Rows: {len(self.data)} | Columns: {len(self.headers)}"
+                             f"{self.format_data_memory()}",
                         fg=self.success_color
                     )
                     
@@ -1793,6 +2031,11 @@ class FileParserGUI:
                             font=('Segoe UI', 10), padx=15, pady=6, relief='flat', bd=0, cursor="hand2")
         paste_btn.pack(side=tk.LEFT, padx=5)
         
+        export_btn = tk.Button(buttons_frame, text="Load PG Export", 
+                            command=self.load_postgres_export, bg='#8E44AD', fg='black',
+                            font=('Segoe UI', 10), padx=15, pady=6, relief='flat', bd=0, cursor="hand2")
+        export_btn.pack(side=tk.LEFT, padx=5)
+        
         separator = tk.Frame(buttons_frame, width=2, bg='#d0d0d0', relief='sunken', bd=1)
         separator.pack(side=tk.LEFT, fill=tk.Y, padx=10, pady=2)
         
@@ -1808,16 +2051,52 @@ class FileParserGUI:
                             command=self.stop_query, bg='#c0392b', fg='black',
                             font=('Segoe UI', 10), padx=15, pady=6, relief='flat', bd=0, cursor="hand2")
         
-        match_btn = tk.Button(buttons_frame, text="Match Results", 
+        self.query_status_label = tk.Label(actions_content, text="", font=('Segoe UI', 9),
+                                           bg=self.frame_bg, fg=self.text_secondary)
+        self.query_status_label.pack(pady=(10, 0))
+        
+        cache_frame = tk.Frame(actions_content, bg=self.frame_bg)
+        cache_frame.pack(pady=(5, 0))
+        
+        tk.Checkbutton(cache_frame, text="Reuse local snapshot of query results (refresh changed rows only)",
+                       variable=self.use_query_cache, bg=self.frame_bg, fg=self.text_color,
+                       selectcolor=self.frame_bg, font=('Segoe UI', 9)).pack(side=tk.LEFT)
+        
+        clear_cache_btn = tk.Button(cache_frame, text="Clear Cache", command=self.clear_query_cache,
+                                    bg=self.frame_bg, fg=self.text_color, font=('Segoe UI', 8),
+                                    padx=8, pady=2, relief='flat', bd=0, cursor="hand2")
+        clear_cache_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
+        tk.Checkbutton(actions_content, text="Fuzzy match unmatched users (same DOB, similar-sounding name)",
+                       variable=self.fuzzy_match, bg=self.frame_bg, fg=self.text_color,
+                       selectcolor=self.frame_bg, font=('Segoe UI', 9)).pack(pady=(5, 0))
+        
+        self.match_btn = tk.Button(buttons_frame, text="Match Results", 
                             command=self.match_results, bg='#16a085', fg='black',
                             font=('Segoe UI', 10), padx=15, pady=6, relief='flat', bd=0, cursor="hand2")
-        match_btn.pack(side=tk.LEFT, padx=5)
+        self.match_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.server_match_btn = tk.Button(buttons_frame, text="Match in DB", 
+                            command=self.match_results_in_db, bg='#1abc9c', fg='black',
+                            font=('Segoe UI', 10), padx=15, pady=6, relief='flat', bd=0, cursor="hand2")
+        self.server_match_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.batch_btn = tk.Button(buttons_frame, text="Batch Audit", 
+                            command=self.run_batch_audit, bg='#2980b9', fg='black',
+                            font=('Segoe UI', 10), padx=15, pady=6, relief='flat', bd=0, cursor="hand2")
+        self.batch_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Disabled while any DB worker runs, so no second run starts under it
+        self.db_action_buttons = [self.run_query_btn, self.match_btn, self.server_match_btn, self.batch_btn]
         
         self._add_button_hover(query_btn, self.warning_color, '#e67e22', normal_fg='black', hover_fg='black')
         self._add_button_hover(paste_btn, '#9C27B0', '#7B1FA2', normal_fg='black', hover_fg='black')
+        self._add_button_hover(export_btn, '#8E44AD', '#6C3483', normal_fg='black', hover_fg='black')
         self._add_button_hover(self.run_query_btn, self.danger_color, '#c0392b', normal_fg='black', hover_fg='black')
         self._add_button_hover(self.stop_query_btn, '#c0392b', '#a93226', normal_fg='black', hover_fg='black')
-        self._add_button_hover(match_btn, '#16a085', '#138d75', normal_fg='black', hover_fg='black')
+        self._add_button_hover(self.match_btn, '#16a085', '#138d75', normal_fg='black', hover_fg='black')
+        self._add_button_hover(self.server_match_btn, '#1abc9c', '#16a085', normal_fg='black', hover_fg='black')
+        self._add_button_hover(self.batch_btn, '#2980b9', '#2471a3', normal_fg='black', hover_fg='black')
 
     def _build_results_section(self, parent):
         results_frame = tk.Frame(parent, bg=self.frame_bg, relief='solid', bd=1)
@@ -1839,7 +2118,7 @@ class FileParserGUI:
         tk.Label(search_frame, text="🔍", bg=self.header_bg, font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=(0, 5))
         
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', lambda *args: self.filter_results())
+        self.search_var.trace('w', lambda *args: self.schedule_filter())
         
         self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, 
                                      font=('Segoe UI', 9), width=25,
@@ -1863,25 +2142,14 @@ class FileParserGUI:
         table_frame = tk.Frame(results_content, bg=self.bg_color, relief='solid', bd=1)
         table_frame.pack(fill=tk.BOTH, expand=True)
         
-        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
-        h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL)
-        
-        self.tree = ttk.Treeview(table_frame, 
-                                yscrollcommand=v_scrollbar.set,
-                                xscrollcommand=h_scrollbar.set)
-        
-        v_scrollbar.config(command=self.tree.yview)
-        h_scrollbar.config(command=self.tree.xview)
-        
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.results_table = VirtualTable(table_frame, bg_color=self.bg_color, select_bg=self.primary_color)
+        self.results_table.pack(fill=tk.BOTH, expand=True)
         
         self.sort_reverse = {}
         self.current_sort_column = None
         
-        self.tree.bind('<Control-c>', self.copy_selected_rows)
-        self.tree.bind('<Command-c>', self.copy_selected_rows)
+        self.results_table.tree.bind('<Control-c>', self.copy_selected_rows)
+        self.results_table.tree.bind('<Command-c>', self.copy_selected_rows)
 
     def _add_button_hover(self, button, normal_color, hover_color, normal_fg=None, hover_fg=None):
         try:
@@ -1928,63 +2196,38 @@ class FileParserGUI:
             pass
 
     def copy_selected_rows(self, event=None):
-        selected_items = self.tree.selection()
+        selected_rows = self.results_table.selected_rows()
         
-        if not selected_items:
+        if not selected_rows:
             return
         
-        columns = list(self.tree['columns'])
-        copied_text = '\t'.join(columns) + '\n'
-        
-        for item in selected_items:
-            values = self.tree.item(item)['values']
-            row_text = '\t'.join(str(v) for v in values)
-            copied_text += row_text + '\n'
+        lines = ['\t'.join(self.results_table.columns)]
+        lines.extend('\t'.join(str(v) for v in row) for row in selected_rows)
         
         self.root.clipboard_clear()
-        self.root.clipboard_append(copied_text.strip())
+        self.root.clipboard_append('\n'.join(lines).strip())
         
         return 'break'
     
     def detect_delimiter(self, file_path):
-        delimiters = ['|', ',', '\t']
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            first_line = f.readline()
-            delimiter_counts = {d: first_line.count(d) for d in delimiters}
-            max_delimiter = max(delimiter_counts, key=delimiter_counts.get)
-            if delimiter_counts[max_delimiter] > 0:
-                return max_delimiter
-            
-        return ','
+        return detect_delimiter(file_path)
+    
+    def format_data_memory(self):
+        if not isinstance(self.data, ColumnStore):
+            return ""
+        usage = self.data.memory_usage()
+        return (f" | Memory: {format_file_size(usage['store'])} "
+                f"(~{format_file_size(usage['as_lists'])} as lists)")
     
     def auto_detect_name_columns(self):
-        first_name_keywords = ['first', 'fname', 'firstname', 'first_name', 'given', 'givenname']
-        last_name_keywords = ['last', 'lname', 'lastname', 'last_name', 'surname', 'family', 'familyname']
-        termination_date_keywords = ['termination', 'term_date', 'termdate', 'termination_date', 'end_date', 'enddate']
-        date_of_birth_keywords = ['dob', 'birth', 'birthdate', 'birth_date', 'date_of_birth', 'dateofbirth']
-        
-        first_name_col = None
-        last_name_col = None
-        termination_date_col = None
-        date_of_birth_col = None
+        columns = guess_match_columns(self.headers)
         
-        for idx, header in enumerate(self.headers):
-            header_lower = header.lower().strip()
-            
-            if not first_name_col and any(keyword in header_lower for keyword in first_name_keywords):
-                first_name_col = f"{idx}: {header}"
-            
-            if not last_name_col and any(keyword in header_lower for keyword in last_name_keywords):
-                last_name_col = f"{idx}: {header}"
-            
-            if not termination_date_col and any(keyword in header_lower for keyword in termination_date_keywords):
-                termination_date_col = f"{idx}: {header}"
-            
-            if not date_of_birth_col and any(keyword in header_lower for keyword in date_of_birth_keywords):
-                date_of_birth_col = f"{idx}: {header}"
+        def column_option(name):
+            idx = columns[name]
+            return f"{idx}: {self.headers[idx]}" if idx is not None else None
         
-        return first_name_col, last_name_col, termination_date_col, date_of_birth_col
+        return (column_option('first_name'), column_option('last_name'),
+                column_option('termination_date'), column_option('date_of_birth'))
     
     def upload_file(self):
         file_path = filedialog.askopenfilename(
@@ -2000,14 +2243,14 @@ class FileParserGUI:
             
             with open(file_path, 'r', encoding='utf-8') as f:
                 reader = csv.reader(f, delimiter=self.detected_delimiter)
-                rows = list(reader)
+                headers, data = ColumnStore.from_rows(reader)
             
-            if not rows:
+            if headers is None:
                 messagebox.showwarning("Empty File", "The file is empty!")
                 return
             
-            self.headers = rows[0]
-            self.data = rows[1:]
+            self.headers = headers
+            self.data = data
             
             if hasattr(self.root, 'log_file_access'):
                 self.root.log_file_access(file_path, "LOADED_FILE")
@@ -2042,6 +2285,7 @@ class FileParserGUI:
                 text=f"File: {os.path.basename(file_path)} | "
                      f"Delimiter: {delimiter_name.get(self.detected_delimiter, self.detected_delimiter)} | "
                      f"Rows: {len(self.data)} | Columns: {len(self.headers)}"
+                     f"{self.format_data_memory()}"
             )
             
             self.display_data()
@@ -2096,12 +2340,7 @@ class FileParserGUI:
             try:
                 import tempfile
                 
-                session_kwargs = {}
-                if profile and profile != "default":
-                    session_kwargs['profile_name'] = profile
-                
-                session = boto3.Session(**session_kwargs)
-                s3_client = session.client('s3')
+                s3_client = make_s3_client(profile)
                 
                 temp_dir = tempfile.gettempdir()
                 filename = os.path.basename(key) if '/' in key else key
@@ -2117,14 +2356,14 @@ class FileParserGUI:
                     
                     with open(local_path, 'r', encoding='utf-8') as f:
                         reader = csv.reader(f, delimiter=self.detected_delimiter)
-                        rows = list(reader)
+                        headers, data = ColumnStore.from_rows(reader)
                     
-                    if not rows:
+                    if headers is None:
                         messagebox.showwarning("Empty File", "The downloaded file is empty!")
                         return
                     
-                    self.headers = rows[0]
-                    self.data = rows[1:]
+                    self.headers = headers
+                    self.data = data
                     
                     if hasattr(self.root, 'log_file_access'):
                         self.root.log_file_access(f"s3://{bucket}/{key}", "DOWNLOADED_FROM_S3")
@@ -2159,6 +2398,7 @@ class FileParserGUI:
                         text=f"S3 File: {filename} | "
                              f"Delimiter: {delimiter_name.get(self.detected_delimiter, self.detected_delimiter)} | "
                              f"Rows: {len(self.data)} | Columns: {len(self.headers)}"
+                             f"{self.format_data_memory()}"
                     )
                     
                     self.display_data()
@@ -2479,6 +2719,7 @@ class FileParserGUI:
                 "format": "%m-%d-%Y"
             }
         }
+        self.date_normalizer = DateNormalizer(self.date_formats)
     
     def load_db_config(self):
         try:
@@ -2489,6 +2730,9 @@ class FileParserGUI:
                     self.db_port.set(config.get('port', '5432'))
                     self.db_name.set(config.get('database', ''))
                     self.db_user.set(config.get('username', ''))
+                    if DB_POOL_AVAILABLE:
+                        configure_shared_pool(max_connections=config.get('pool_max_connections'),
+                                              idle_timeout=config.get('pool_idle_timeout'))
         except Exception:
             pass
     
@@ -2561,20 +2805,21 @@ class FileParserGUI:
         test_window.update()
         
         try:
-            conn = psycopg2.connect(
-                host=host,
-                port=port,
-                database=database,
-                user=user,
-                password=password,
-                connect_timeout=10
-            )
+            conn = self.acquire_db_connection({
+                'host': host,
+                'port': port,
+                'database': database,
+                'user': user,
+                'password': password
+            })
             
-            cursor = conn.cursor()
-            cursor.execute("SELECT version();")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT version();")
+                version = cursor.fetchone()[0]
+                cursor.close()
+            finally:
+                self.release_db_connection(conn)
             
             progress.stop()
             test_window.destroy()
@@ -2631,35 +2876,13 @@ class FileParserGUI:
         if not term_date_value or str(term_date_value).strip() == '':
             return term_date_value
         
-        term_date_str = str(term_date_value).strip()
-        
-        import re
-        for format_name, format_info in self.date_formats.items():
-            if re.match(format_info["regex"], term_date_str):
-                try:
-                    parsed_date = datetime.strptime(term_date_str, format_info["format"])
-                    return parsed_date.strftime("%Y-%m-%d")
-                except ValueError:
-                    continue
-        
-        return term_date_value
+        return self.date_normalizer.normalize(term_date_value)
 
     def normalize_dob(self, dob_value):
         if not dob_value or str(dob_value).strip() == '':
             return dob_value
         
-        dob_str = str(dob_value).strip()
-        
-        import re
-        for format_name, format_info in self.date_formats.items():
-            if re.match(format_info["regex"], dob_str):
-                try:
-                    parsed_date = datetime.strptime(dob_str, format_info["format"])
-                    return parsed_date.strftime("%Y-%m-%d")
-                except ValueError:
-                    continue
-        
-        return dob_value
+        return self.date_normalizer.normalize(dob_value)
     
     def apply_selection(self):
         if not self.headers:
@@ -2693,18 +2916,13 @@ class FileParserGUI:
             messagebox.showwarning("Billable Status Required", 
                                 "Please select a billable status!")
             return
+        
+        self.date_normalizer.reset()
     
         if dob_col != "Not selected" and dob_col in self.headers:
             try:
                 dob_idx = self.headers.index(dob_col)
-                
-                for row in self.data:
-                    if len(row) > dob_idx:
-                        original_value = row[dob_idx]
-                        normalized_value = self.normalize_dob(original_value)
-                        if original_value != normalized_value:
-                            row[dob_idx] = normalized_value
-                            dob_normalized_count += 1
+                dob_normalized_count = self.data.map_column(dob_idx, self.normalize_dob)
                             
             except ValueError as e:
                 messagebox.showerror("Error", f"DOB column error:\n{str(e)}")
@@ -2713,14 +2931,7 @@ class FileParserGUI:
         if term_col != "Not selected" and term_col in self.headers:
             try:
                 term_idx = self.headers.index(term_col)
-                
-                for row in self.data:
-                    if len(row) > term_idx:
-                        original_value = row[term_idx]
-                        normalized_value = self.normalize_term_date(original_value)
-                        if original_value != normalized_value:
-                            row[term_idx] = normalized_value
-                            term_normalized_count += 1
+                term_normalized_count = self.data.map_column(term_idx, self.normalize_term_date)
                             
             except ValueError as e:
                 messagebox.showerror("Error", f"Termination date column error:\n{str(e)}")
@@ -2740,6 +2951,12 @@ class FileParserGUI:
         if term_normalized_count > 0:
             msg += f"{term_normalized_count} termination date values normalized to yyyy-MM-dd format.\n"
         
+        if self.date_normalizer.parsed_count > 0:
+            msg += f"({self.date_normalizer.parsed_count:,} distinct dates parsed"
+            if self.date_normalizer.reused_count > 0:
+                msg += f", {self.date_normalizer.reused_count:,} reused from cache"
+            msg += ")\n"
+        
         if dob_normalized_count > 0 or term_normalized_count > 0:
             msg += "\n"
         
@@ -2747,20 +2964,7 @@ class FileParserGUI:
         
         messagebox.showinfo("Selection Applied", msg)
     
-    def generate_query(self):
-        client = self.client.get()
-        billable_status = self.billable_status.get()
-        
-        if not billable_status:
-            messagebox.showwarning("Billable Status Required", 
-                                "Please select a billable status first!")
-            return
-        
-        if not client:
-            messagebox.showwarning("Client Required", 
-                                "Please select a client first!")
-            return
-        
+    def build_users_query(self, client, billable_status, include_order=True):
         if billable_status == "Should be billable":
             where_clause = "WHERE unbillable IS TRUE"
         else:
@@ -2803,11 +3007,29 @@ class FileParserGUI:
             "        ELSE termination_date::date",
             "    END AS termed_in_cheif",
             f"FROM {client}.users",
-            where_clause,
-            "ORDER BY last_login_date DESC NULLS LAST;"
+            where_clause
         ]
         
-        query = "\n".join(query_lines)
+        if include_order:
+            query_lines.append("ORDER BY last_login_date DESC NULLS LAST;")
+        
+        return "\n".join(query_lines)
+    
+    def generate_query(self):
+        client = self.client.get()
+        billable_status = self.billable_status.get()
+        
+        if not billable_status:
+            messagebox.showwarning("Billable Status Required", 
+                                "Please select a billable status first!")
+            return
+        
+        if not client:
+            messagebox.showwarning("Client Required", 
+                                "Please select a client first!")
+            return
+        
+        query = self.build_users_query(client, billable_status)
         
         self.root.clipboard_clear()
         self.root.clipboard_append(query)
@@ -2818,19 +3040,14 @@ class FileParserGUI:
         self.query_cancelled = True
         
         try:
-            if self.db_cursor:
-                self.db_cursor.close()
-            if self.db_connection:
-                self.db_connection.cancel()
-                self.db_connection.close()
-        except:
+            conn = self.active_db_connection
+            if conn:
+                conn.cancel()
+        except Exception:
             pass
         
-        self.root.config(cursor="")
-        self.stop_query_btn.pack_forget()
-        self.run_query_btn.pack()
-        
-        messagebox.showinfo("Query Cancelled", "Database query has been stopped.")
+        self.stop_query_btn.config(state=tk.DISABLED)
+        self.query_status_label.config(text="Cancelling query...", fg=self.warning_color)
     
     def run_query_in_db(self):
         if not PSYCOPG2_AVAILABLE:
@@ -2885,126 +3102,218 @@ class FileParserGUI:
             if not result:
                 return
         
-        if billable_status == "Should be billable":
-            where_clause = "WHERE unbillable IS TRUE"
-        else:
-            where_clause = "WHERE unbillable IS FALSE OR unbillable IS NULL"
+        query = self.build_users_query(client, billable_status)
         
-        query_lines = [
-            "SELECT",
-            "    user_id,",
-            "    email,",
-            "    first_name,",
-            "    last_name,",
-            "    date_of_birth,",
-            "    total_bps,",
-            "    CASE",
-            "        WHEN first_login_date IS NULL",
-            "             OR NULLIF(first_login_date::text, '') IS NULL THEN NULL",
-            "        WHEN first_login_date::text ~ '^[0-9]+$'",
-            "             THEN to_timestamp((first_login_date::bigint) / 1000.0)::date",
-            "        ELSE first_login_date::date",
-            "    END AS first_login_date,",
-            "    CASE",
-            "        WHEN last_login_date IS NULL",
-            "             OR NULLIF(last_login_date::text, '') IS NULL THEN NULL",
-            "        WHEN last_login_date::text ~ '^[0-9]+$'",
-            "             THEN to_timestamp((last_login_date::bigint) / 1000.0)::date",
-            "        ELSE last_login_date::date",
-            "    END AS last_login_date,",
-            "    CASE",
-            "        WHEN last_bp_date IS NULL",
-            "             OR NULLIF(last_bp_date::text, '') IS NULL THEN NULL",
-            "        WHEN last_bp_date::text ~ '^[0-9]+$'",
-            "             THEN to_timestamp((last_bp_date::bigint) / 1000.0)::date",
-            "        ELSE last_bp_date::date",
-            "    END AS last_bp_date,",
-            "    CASE",
-            "        WHEN termination_date IS NULL",
-            "             OR NULLIF(termination_date::text, '') IS NULL THEN NULL",
-            "        WHEN termination_date::text ~ '^[0-9]+$'",
-            "             THEN to_timestamp((termination_date::bigint) / 1000.0)::date",
-            "        ELSE termination_date::date",
-            "    END AS termed_in_cheif",
-            f"FROM {client}.users",
-            where_clause,
-            "ORDER BY last_login_date DESC NULLS LAST;"
-        ]
+        self._start_db_work(f"Connecting to {db_host}...")
         
-        query = "\n".join(query_lines)
+        conn_params = {
+            'host': db_host,
+            'port': db_port,
+            'database': db_name,
+            'user': db_user,
+            'password': db_password
+        }
         
-        self.query_cancelled = False
+        import threading
+        query_thread = threading.Thread(target=self._run_query_worker, 
+                                        args=(query, client, billable_status, conn_params, 
+                                              self.use_query_cache.get()), 
+                                        daemon=True)
+        query_thread.start()
+    
+    def _run_query_worker(self, query, client, billable_status, conn_params, use_cache):
+        # Batches go straight into the compact store, so no full list of fetched rows is ever held
+        results = ColumnStore()
+        started = time.perf_counter()
         
-        self.run_query_btn.pack_forget()
-        self.stop_query_btn.pack()
+        cache_key = QueryCache.make_key(conn_params, client, billable_status)
+        snapshot = None
+        refresh_query, refresh_params = None, None
         
-        self.root.config(cursor="watch")
-        self.root.update()
+        if use_cache:
+            try:
+                snapshot = self.query_cache.load(cache_key)
+            except Exception as cache_error:
+                print(f"Bill Hunter: query cache unavailable: {cache_error}")
+            
+            if self.query_cache.is_fresh(snapshot):
+                users_query = self.build_users_query(client, billable_status, include_order=False)
+                refresh_query, refresh_params = build_refresh_query(users_query, snapshot)
         
+        conn = None
+        cursor = None
         try:
-            if self.query_cancelled:
-                raise Exception("Query cancelled by user")
-            
-            self.db_connection = psycopg2.connect(
-                host=db_host,
-                port=db_port,
-                database=db_name,
-                user=db_user,
-                password=db_password,
-                connect_timeout=10
-            )
-            
-            if self.query_cancelled:
-                self.db_connection.close()
-                raise Exception("Query cancelled by user")
-            
-            self.db_cursor = self.db_connection.cursor()
-            
-            self.db_cursor.execute(query)
+            conn = self.acquire_db_connection(conn_params)
+            self.active_db_connection = conn
             
             if self.query_cancelled:
-                self.db_cursor.close()
-                self.db_connection.close()
-                raise Exception("Query cancelled by user")
-            
-            results = self.db_cursor.fetchall()
-            
-            column_names = [desc[0] for desc in self.db_cursor.description]
+                raise psycopg2.extensions.QueryCanceledError("Query cancelled by user")
             
-            self.db_cursor.close()
-            self.db_connection.close()
-            self.db_cursor = None
-            self.db_connection = None
-            
-            self.postgres_data = results
-            
-            self.root.config(cursor="")
-            
-            self.stop_query_btn.pack_forget()
-            self.run_query_btn.pack()
+            cursor = conn.cursor(name="bill_hunter_users")
+            cursor.itersize = QUERY_FETCH_BATCH_SIZE
+            if refresh_query:
+                cursor.execute(refresh_query, refresh_params)
+            else:
+                cursor.execute(query.rstrip().rstrip(';'))
             
-            messagebox.showinfo("Success", 
-                              f"Query executed successfully!\n\n"
-                              f"Retrieved {len(results)} rows from {client}.users\n\n"
-                              f"Results are now ready for matching.")
+            while True:
+                batch = cursor.fetchmany(QUERY_FETCH_BATCH_SIZE)
+                if not batch:
+                    break
+                
+                results.extend(batch)
+                self.root.after(0, self._update_query_progress, client, len(results))
+                
+                if self.query_cancelled:
+                    raise psycopg2.extensions.QueryCanceledError("Query cancelled by user")
+            
+            current_user_ids = None
+            if refresh_query:
+                # The watermark refresh only sees new rows, so fetch who matches now to drop
+                # the users who left and add the ones who started matching without a new login
+                id_cursor = conn.cursor()
+                try:
+                    id_cursor.execute(build_user_ids_query(users_query))
+                    current_user_ids = [row[0] for row in id_cursor.fetchall()]
+                    
+                    new_user_ids = missing_user_ids(snapshot, results, current_user_ids)
+                    if new_user_ids:
+                        id_cursor.execute(build_users_by_id_query(users_query), {'user_ids': new_user_ids})
+                        results.extend(id_cursor.fetchall())
+                finally:
+                    id_cursor.close()
             
-        except psycopg2.OperationalError as e:
-            self.root.config(cursor="")
-            self.stop_query_btn.pack_forget()
-            self.run_query_btn.pack()
+            cache_info = None
+            try:
+                if refresh_query:
+                    cache_info = {'cached': len(snapshot['rows']), 'fetched': len(results)}
+                    results = ColumnStore(self.query_cache.merge(snapshot, results, current_user_ids))
+                elif use_cache:
+                    self.query_cache.save(cache_key, results)
+                    cache_info = {'cached': 0, 'fetched': len(results)}
+            except Exception as cache_error:
+                print(f"Bill Hunter: could not update query cache: {cache_error}")
+            
+            self.root.after(0, self._on_query_complete, client, results, time.perf_counter() - started, 
+                            cache_info)
             
-            error_msg = str(e)
-            if "does not exist" in error_msg:
-                messagebox.showerror("Database Error", 
-                                   f"Database '{db_name}' not found.\n\n"
-                                   f"Please verify:\n"
-                                   f"1. Database name is correct\n"
-                                   f"2. Your user has access to this database\n\n"
-                                   f"Full error: {error_msg}")
-            elif "authentication failed" in error_msg or "password authentication failed" in error_msg:
-                messagebox.showerror("Authentication Error", 
-                                   f"Could not authenticate with provided credentials.\n\n"
-                                   f"Please check your username and password.\n\n"
+        except Exception as e:
+            self.root.after(0, self._on_query_failed, client, conn_params, e)
+        finally:
+            # The completion handler may already have let another worker start and set its own
+            if self.active_db_connection is conn:
+                self.active_db_connection = None
+            try:
+                if cursor:
+                    cursor.close()
+            except Exception:
+                pass
+            if conn:
+                self.release_db_connection(conn)
+    
+    def acquire_db_connection(self, conn_params):
+        if DB_POOL_AVAILABLE:
+            return get_shared_pool().getconn(**conn_params)
+        return psycopg2.connect(connect_timeout=10, **conn_params)
+    
+    def release_db_connection(self, conn, discard=False):
+        if DB_POOL_AVAILABLE:
+            get_shared_pool().putconn(conn, discard=discard)
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _update_query_progress(self, client, row_count):
+        if self.query_cancelled:
+            return
+        self.query_status_label.config(text=f"Fetching {client}.users... {row_count:,} rows", 
+                                       fg=self.text_secondary)
+    
+    def _start_db_work(self, status_text, cancellable=True):
+        # Every DB action stays disabled until the worker's completion handler resets the buttons
+        self.query_cancelled = False
+        
+        for button in self.db_action_buttons:
+            button.config(state=tk.DISABLED)
+        
+        if cancellable:
+            self.run_query_btn.pack_forget()
+            self.stop_query_btn.config(state=tk.NORMAL)
+            self.stop_query_btn.pack()
+        
+        self.query_status_label.config(text=status_text, fg=self.text_secondary)
+        self.root.config(cursor="watch")
+    
+    def _reset_query_buttons(self):
+        self.root.config(cursor="")
+        self.stop_query_btn.pack_forget()
+        self.run_query_btn.pack()
+        
+        for button in self.db_action_buttons:
+            button.config(state=tk.NORMAL)
+    
+    def _on_query_complete(self, client, results, elapsed, cache_info=None):
+        self._reset_query_buttons()
+        
+        self.postgres_data = results
+        self.last_query_timing = {'key': (client, self.billable_status.get()), 'seconds': elapsed}
+        
+        cache_text = ""
+        if cache_info and cache_info['cached']:
+            cache_text = (f"{cache_info['cached']:,} rows reused from local cache, "
+                          f"{cache_info['fetched']:,} changed rows fetched")
+        elif cache_info:
+            cache_text = f"{cache_info['fetched']:,} rows fetched and cached locally"
+        
+        status_text = f"✓ {len(results):,} rows from {client}.users"
+        if cache_text:
+            status_text += f" ({cache_text})"
+        self.query_status_label.config(text=status_text, fg=self.success_color)
+        
+        message = (f"Query executed successfully!\n\n"
+                   f"Retrieved {len(results)} rows from {client}.users\n\n")
+        if cache_text:
+            message += f"{cache_text[0].upper()}{cache_text[1:]}.\n\n"
+        message += "Results are now ready for matching."
+        
+        messagebox.showinfo("Success", message)
+    
+    def clear_query_cache(self):
+        try:
+            self.query_cache.clear()
+            self.query_status_label.config(text="✓ Local query cache cleared", fg=self.success_color)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to clear query cache:\n{str(e)}")
+    
+    def _on_query_failed(self, client, conn_params, error):
+        self._reset_query_buttons()
+        
+        db_host = conn_params['host']
+        db_port = conn_params['port']
+        db_name = conn_params['database']
+        
+        if self.query_cancelled or isinstance(error, psycopg2.extensions.QueryCanceledError):
+            self.query_status_label.config(text="Query cancelled", fg=self.text_secondary)
+            messagebox.showinfo("Query Cancelled", "Database query has been stopped.")
+            return
+        
+        self.query_status_label.config(text="❌ Query failed", fg=self.danger_color)
+        
+        if isinstance(error, psycopg2.OperationalError):
+            error_msg = str(error)
+            if "does not exist" in error_msg:
+                messagebox.showerror("Database Error", 
+                                   f"Database '{db_name}' not found.\n\n"
+                                   f"Please verify:\n"
+                                   f"1. Database name is correct\n"
+                                   f"2. Your user has access to this database\n\n"
+                                   f"Full error: {error_msg}")
+            elif "authentication failed" in error_msg or "password authentication failed" in error_msg:
+                messagebox.showerror("Authentication Error", 
+                                   f"Could not authenticate with provided credentials.\n\n"
+                                   f"Please check your username and password.\n\n"
                                    f"Full error: {error_msg}")
             elif "Connection refused" in error_msg or "could not connect" in error_msg:
                 messagebox.showerror("Connection Error", 
@@ -3016,143 +3325,147 @@ class FileParserGUI:
             else:
                 messagebox.showerror("Connection Error", 
                                    f"Could not connect to database:\n\n{error_msg}")
-        except psycopg2.ProgrammingError as e:
-            self.root.config(cursor="")
-            self.stop_query_btn.pack_forget()
-            self.run_query_btn.pack()
+        elif isinstance(error, psycopg2.ProgrammingError):
             messagebox.showerror("Query Error", 
-                               f"Error in SQL query:\n\n{str(e)}\n\n"
+                               f"Error in SQL query:\n\n{str(error)}\n\n"
                                f"Schema '{client}' may not exist or table 'users' not found.")
-        except psycopg2.Error as e:
-            self.root.config(cursor="")
-            self.stop_query_btn.pack_forget()
-            self.run_query_btn.pack()
+        elif isinstance(error, psycopg2.Error):
             messagebox.showerror("Database Error", 
-                               f"Database error:\n\n{str(e)}")
-        except Exception as e:
-            self.root.config(cursor="")
-            self.stop_query_btn.pack_forget()
-            self.run_query_btn.pack()
-            
-            if self.query_cancelled or "cancelled by user" in str(e).lower():
-                return
-            
+                               f"Database error:\n\n{str(error)}")
+        else:
             messagebox.showerror("Error", 
-                               f"Unexpected error:\n\n{str(e)}")
+                               f"Unexpected error:\n\n{str(error)}")
     
     def clean_postgres_value(self, value):
-        if value is None:
-            return ''
-        value_str = str(value).strip()
-        if value_str.startswith('"') and value_str.endswith('"'):
-            value_str = value_str[1:-1]
-        return value_str
+        return clean_postgres_value(value)
     
     def display_data(self):
-        self.tree.delete(*self.tree.get_children())
+        self.show_rows(self.headers, self.data)
+    
+    def show_rows(self, columns, rows):
+        self.sort_reverse = {}
+        self.current_sort_column = None
         
-        self.tree['columns'] = self.headers
-        self.tree['show'] = 'headings'
+        self.results_table.set_columns(columns, heading_command=self.sort_treeview)
         
-        self.sort_reverse = {}
+        self.all_results = rows if isinstance(rows, ColumnStore) else list(rows)
+        self.sort_key_cache = {}
+        self.current_sort = None
+        self.search_blobs = None
+        self.last_search = ('', [])
+        self.view_indices = list(range(len(self.all_results)))
+        
+        if self.search_var.get():
+            self.filter_results()
+        else:
+            self.render_view()
+    
+    def render_view(self):
+        self.results_table.set_rows(IndexedRows(self.all_results, self.view_indices))
+    
+    def get_sort_keys(self, col_index):
+        """Typed sort values for one column of all_results, computed once per load"""
+        if col_index in self.sort_key_cache:
+            return self.sort_key_cache[col_index]
+        
+        col = self.results_table.columns[col_index]
+        if isinstance(self.all_results, ColumnStore):
+            texts = [value.strip() for value in self.all_results.column(col_index)]
+        else:
+            texts = ['' if len(row) <= col_index or row[col_index] is None else str(row[col_index]).strip()
+                     for row in self.all_results]
         
-        for col in self.headers:
-            self.tree.heading(col, text=col, command=lambda c=col: self.sort_treeview(c))
-            self.tree.column(col, width=150, anchor=tk.W)
+        is_date_column = any(keyword in col.lower() for keyword in ['date', 'modified', 'created', 'updated', 'term'])
+        
+        if is_date_column:
+            parsed = {value: parse_date(value) for value in set(texts)}
+            keys = ('date', [parsed[value] for value in texts])
+        else:
+            try:
+                keys = ('number', [float(value) if value else 0 for value in texts])
+            except ValueError:
+                keys = ('text', [value.lower() for value in texts])
         
-        self.all_results = list(self.data)
+        self.sort_key_cache[col_index] = keys
+        return keys
+    
+    def sort_view(self, col_index, reverse):
+        kind, values = self.get_sort_keys(col_index)
         
-        for row in self.data:
-            self.tree.insert('', tk.END, values=row)
+        if kind == 'date':
+            # Blank or unparseable dates sort first in both directions
+            missing = datetime.min if not reverse else datetime.max
+            self.view_indices.sort(key=lambda i: values[i] or missing, reverse=reverse)
+        else:
+            self.view_indices.sort(key=values.__getitem__, reverse=reverse)
     
     def sort_treeview(self, col):
-        columns = list(self.tree['columns'])
+        columns = self.results_table.columns
         col_index = columns.index(col)
         
-        data_list = [(self.tree.set(item, col), item) for item in self.tree.get_children('')]
-        
         reverse = self.sort_reverse.get(col, False)
         self.sort_reverse[col] = not reverse
         
         self.current_sort_column = col
+        self.current_sort = (col_index, reverse)
         
-        is_date_column = any(keyword in col.lower() for keyword in ['date', 'modified', 'created', 'updated', 'term'])
-        
-        if is_date_column:
-            def date_key(item):
-                val = item[0]
-                if not val or val == '':
-                    return datetime.min if not reverse else datetime.max
-                
-                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%d/%m/%Y', '%Y/%m/%d', 
-                           '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S']:
-                    try:
-                        return datetime.strptime(str(val).strip(), fmt)
-                    except (ValueError, AttributeError):
-                        continue
-                
-                return datetime.min if not reverse else datetime.max
-            
-            try:
-                data_list.sort(key=date_key, reverse=reverse)
-            except Exception:
-                data_list.sort(key=lambda t: t[0].lower() if t[0] else '', reverse=reverse)
-        else:
-            try:
-                data_list.sort(key=lambda t: float(t[0]) if t[0] else 0, reverse=reverse)
-            except (ValueError, TypeError):
-                data_list.sort(key=lambda t: str(t[0]).lower() if t[0] else '', reverse=reverse)
-        
-        for index, (val, item) in enumerate(data_list):
-            self.tree.move(item, '', index)
+        self.sort_view(col_index, reverse)
+        self.render_view()
         
         for column in columns:
             if column == col:
                 direction = ' ▼' if reverse else ' ▲'
-                self.tree.heading(column, text=f"{column}{direction}", 
-                                command=lambda c=column: self.sort_treeview(c))
+                self.results_table.set_heading(column, f"{column}{direction}", self.sort_treeview)
             else:
-                self.tree.heading(column, text=column, 
-                                command=lambda c=column: self.sort_treeview(c))
+                self.results_table.set_heading(column, column, self.sort_treeview)
                 
     def copy_all_results(self):
-        items = self.tree.get_children()
+        rows = self.results_table.rows
         
-        if not items:
+        if not rows:
             messagebox.showinfo("No Data", "No results to copy!")
             return
         
-        columns = list(self.tree['columns'])
-        copied_text = '\t'.join(columns) + '\n'
-        
-        for item in items:
-            values = self.tree.item(item)['values']
-            row_text = '\t'.join(str(v) for v in values)
-            copied_text += row_text + '\n'
+        lines = ['\t'.join(self.results_table.columns)]
+        lines.extend('\t'.join(str(v) for v in row) for row in rows)
         
         self.root.clipboard_clear()
-        self.root.clipboard_append(copied_text.strip())
+        self.root.clipboard_append('\n'.join(lines).strip())
         
-        messagebox.showinfo("Copied", f"Copied {len(items)} rows to clipboard!")
+        messagebox.showinfo("Copied", f"Copied {len(rows)} rows to clipboard!")
+    
+    def schedule_filter(self):
+        if self.filter_after_id:
+            self.root.after_cancel(self.filter_after_id)
+        self.filter_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.filter_results)
     
     def filter_results(self):
-        if not hasattr(self, 'all_results'):
-            self.all_results = []
-            for item in self.tree.get_children():
-                values = self.tree.item(item)['values']
-                self.all_results.append(values)
-        
+        self.filter_after_id = None
         search_term = self.search_var.get().lower()
         
-        self.tree.delete(*self.tree.get_children())
+        previous_term, previous_indices = self.last_search
         
         if not search_term:
-            for row in self.all_results:
-                self.tree.insert('', tk.END, values=row)
+            self.view_indices = list(range(len(self.all_results)))
+            if self.current_sort:
+                self.sort_view(*self.current_sort)
         else:
-            for row in self.all_results:
-                if any(search_term in str(value).lower() for value in row):
-                    self.tree.insert('', tk.END, values=row)
+            if self.search_blobs is None:
+                # One lowercase blob per row; the separator keeps matches inside a single cell
+                self.search_blobs = ['\x00'.join(str(value).lower() for value in row) 
+                                     for row in self.all_results]
+            blobs = self.search_blobs
+            
+            if previous_term and search_term.startswith(previous_term):
+                # Typing more characters can only narrow the previous matches
+                self.view_indices = [i for i in previous_indices if search_term in blobs[i]]
+            else:
+                self.view_indices = [i for i, blob in enumerate(blobs) if search_term in blob]
+                if self.current_sort:
+                    self.sort_view(*self.current_sort)
+        
+        self.last_search = (search_term, self.view_indices)
+        self.render_view()
     
     def clear_search(self):
         self.search_var.set('')
@@ -3161,30 +3474,75 @@ class FileParserGUI:
     def paste_postgres_results(self):
         try:
             clipboard_content = self.root.clipboard_get()
-            
-            if not clipboard_content.strip():
-                messagebox.showwarning("Empty Clipboard", "Clipboard is empty!")
-                return
-            
-            lines = clipboard_content.strip().split('\n')
-            
-            if not lines:
-                messagebox.showwarning("No Data", "No data found in clipboard!")
-                return
-            
-            self.postgres_data = []
-            for line in lines:
-                if line.strip():
-                    raw_row = line.split('\t')
-                    cleaned_row = [self.clean_postgres_value(val) for val in raw_row]
-                    self.postgres_data.append(cleaned_row)
-            
-            messagebox.showinfo("Success", 
-                              f"PostgreSQL results loaded!\n"
-                              f"Rows: {len(self.postgres_data)}")
-            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to parse PostgreSQL results:\n{str(e)}")
+            return
+        
+        if not clipboard_content.strip():
+            messagebox.showwarning("Empty Clipboard", "Clipboard is empty!")
+            return
+        
+        self.start_postgres_ingest("pasted results", lambda: io.StringIO(clipboard_content), 
+                                   len(clipboard_content))
+    
+    def load_postgres_export(self):
+        file_path = filedialog.askopenfilename(
+            title="Select a PostgreSQL export (\\copy ... TO)",
+            filetypes=(("Export files", "*.tsv *.csv *.txt"), ("All files", "*.*"))
+        )
+        
+        if not file_path:
+            return
+        
+        self.start_postgres_ingest(os.path.basename(file_path), 
+                                   lambda: open(file_path, 'r', encoding='utf-8', newline=''),
+                                   os.path.getsize(file_path))
+    
+    def start_postgres_ingest(self, source_name, open_source, total_chars):
+        self.root.config(cursor="watch")
+        self.query_status_label.config(text=f"Reading {source_name}...", fg=self.text_secondary)
+        
+        import threading
+        ingest_thread = threading.Thread(target=self._run_ingest_worker, 
+                                         args=(source_name, open_source, total_chars), daemon=True)
+        ingest_thread.start()
+    
+    def _run_ingest_worker(self, source_name, open_source, total_chars):
+        def progress(percent, status, details):
+            self.root.after(0, self._update_ingest_progress, source_name, percent, details)
+        
+        try:
+            with open_source() as stream:
+                store = ingest_postgres_export(stream, total_chars, progress_callback=progress)
+            self.root.after(0, self._on_ingest_complete, source_name, store)
+        except Exception as e:
+            self.root.after(0, self._on_ingest_failed, e)
+    
+    def _update_ingest_progress(self, source_name, percent, details):
+        self.query_status_label.config(text=f"Reading {source_name}... {details} ({percent}%)", 
+                                       fg=self.text_secondary)
+    
+    def _on_ingest_failed(self, error):
+        self.root.config(cursor="")
+        self.query_status_label.config(text="❌ Failed to read PostgreSQL results", fg=self.danger_color)
+        messagebox.showerror("Error", f"Failed to parse PostgreSQL results:\n{str(error)}")
+    
+    def _on_ingest_complete(self, source_name, store):
+        self.root.config(cursor="")
+        
+        if not len(store):
+            self.query_status_label.config(text="", fg=self.text_secondary)
+            messagebox.showwarning("No Data", f"No data found in {source_name}!")
+            return
+        
+        self.postgres_data = store
+        self.last_query_timing = None
+        
+        self.query_status_label.config(text=f"✓ {len(store):,} rows loaded from {source_name}", 
+                                       fg=self.success_color)
+        messagebox.showinfo("Success", 
+                          f"PostgreSQL results loaded!\n"
+                          f"Rows: {len(store)}")
     
     def match_results(self):
         if not self.data or not self.headers:
@@ -3248,302 +3606,567 @@ class FileParserGUI:
         
         progress_window.update()
         
+        match_started = time.perf_counter()
+        
         try:
-            status_label.config(text="Reading file columns...")
-            progress_window.update()
-            
             first_idx = self.headers.index(first_col)
             last_idx = self.headers.index(last_col)
             term_idx = self.headers.index(term_col) if term_col else None
             dob_idx = self.headers.index(dob_col) if dob_col else None
-            
-            pg_first_idx = 2
-            pg_last_idx = 3
-            pg_dob_idx = 4
-            pg_term_idx = 9
-            
-            today = datetime.now().date()
-            
-            if billable_status == "Should be billable":
-                file_names_to_include = {}
-                excluded_count = 0
-                
-                status_label.config(text="Processing eligibility file...")
-                progress_bar['maximum'] = len(self.data)
-                progress_window.update()
-                
-                for idx, row in enumerate(self.data):
-                    if idx % 50 == 0:
-                        progress = int((idx / len(self.data)) * 30)
-                        progress_bar['value'] = progress
-                        progress_text.config(text=f"{progress}%")
-                        details_label.config(text=f"Processing row {idx + 1} of {len(self.data)}")
-                        progress_window.update()
-                    
-                    if len(row) > max(first_idx, last_idx):
-                        first = row[first_idx].strip().lower()
-                        last = row[last_idx].strip().lower()
-                        
-                        dob = ''
-                        if dob_idx is not None and len(row) > dob_idx:
-                            dob = row[dob_idx].strip()
-                        
-                        file_term_date = ''
-                        if term_idx is not None and len(row) > term_idx:
-                            file_term_date = row[term_idx].strip()
-                        
-                        should_include = True
-                        
-                        if file_term_date and file_term_date != '':
-                            try:
-                                term_date = None
-                                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d']:
-                                    try:
-                                        term_date = datetime.strptime(file_term_date, fmt).date()
-                                        break
-                                    except ValueError:
-                                        continue
-                                
-                                if term_date and term_date < today:
-                                    should_include = False
-                                    excluded_count += 1
-                            except Exception:
-                                pass
-                        
-                        if should_include:
-                            if dob:
-                                file_names_to_include[(first, last, dob)] = file_term_date
-                            else:
-                                file_names_to_include[(first, last, '')] = file_term_date
-                
-                self.matched_results = []
-                match_with_dob_count = 0
-                match_without_dob_count = 0
-                
-                status_label.config(text="Matching with PostgreSQL data...")
-                progress_bar['maximum'] = 100
-                progress_window.update()
-                
-                for idx, pg_row in enumerate(self.postgres_data):
-                    if idx % 50 == 0:
-                        progress = 30 + int((idx / len(self.postgres_data)) * 70)
-                        progress_bar['value'] = progress
-                        progress_text.config(text=f"{progress}%")
-                        details_label.config(text=f"Matching row {idx + 1} of {len(self.postgres_data)}")
-                        progress_window.update()
-                    
-                    if len(pg_row) > max(pg_first_idx, pg_last_idx):
-                        first = self.clean_postgres_value(pg_row[pg_first_idx]).lower()
-                        last = self.clean_postgres_value(pg_row[pg_last_idx]).lower()
-                        
-                        pg_dob = ''
-                        if len(pg_row) > pg_dob_idx:
-                            pg_dob = self.clean_postgres_value(pg_row[pg_dob_idx]).strip()
-                        
-                        matched_term_date = None
-                        if pg_dob and (first, last, pg_dob) in file_names_to_include:
-                            matched_term_date = file_names_to_include[(first, last, pg_dob)]
-                            match_with_dob_count += 1
-                        elif (first, last, '') in file_names_to_include:
-                            matched_term_date = file_names_to_include[(first, last, '')]
-                            match_without_dob_count += 1
-                        
-                        if matched_term_date is not None:
-                            modified_row = [selected_client]
-                            modified_row.extend(pg_row)
-                            modified_row.append(matched_term_date)
-                            self.matched_results.append(modified_row)
-                
-                msg = f"Found {len(self.matched_results)} matching records from PostgreSQL results.\n"
-                msg += f"Billable Status: {billable_status}\n"
-                msg += f"Client '{selected_client}' added to all matched records.\n"
-                if match_with_dob_count > 0:
-                    msg += f"{match_with_dob_count} matched with DOB verification.\n"
-                if match_without_dob_count > 0:
-                    msg += f"{match_without_dob_count} matched by name only (no DOB in file).\n"
-                if excluded_count > 0:
-                    msg += f"{excluded_count} users with past termination dates were excluded from the file."
-            
+        except ValueError as e:
+            progress_window.destroy()
+            messagebox.showerror("Error", f"Column not found:\n{str(e)}")
+            return
+        
+        widgets = (progress_window, status_label, progress_bar, progress_text, details_label)
+        
+        def post_progress(percent, status, details):
+            self.root.after(0, self._update_match_progress, widgets, percent, status, details)
+        
+        import threading
+        match_thread = threading.Thread(target=self._run_match_worker,
+                                        args=(selected_client, billable_status, first_idx, last_idx, 
+                                              dob_idx, term_idx, self.fuzzy_match.get(), widgets,
+                                              post_progress, match_started),
+                                        daemon=True)
+        match_thread.start()
+    
+    def _run_match_worker(self, client, billable_status, first_idx, last_idx, dob_idx, term_idx, fuzzy,
+                          widgets, post_progress, match_started):
+        try:
+            result = run_match(self.data, self.postgres_data, client, billable_status,
+                               first_idx, last_idx, dob_idx, term_idx, progress_callback=post_progress,
+                               fuzzy=fuzzy)
+            self.root.after(0, self._on_match_complete, client, billable_status, result, 
+                            widgets, time.perf_counter() - match_started, fuzzy)
+        except Exception as e:
+            self.root.after(0, self._on_match_failed, widgets, e)
+    
+    def _update_match_progress(self, widgets, percent, status, details):
+        progress_window, status_label, progress_bar, progress_text, details_label = widgets
+        if not progress_window.winfo_exists():
+            return
+        status_label.config(text=status)
+        progress_bar['value'] = percent
+        progress_text.config(text=f"{percent}%")
+        details_label.config(text=details)
+    
+    def _on_match_failed(self, widgets, error):
+        widgets[0].destroy()
+        messagebox.showerror("Error", f"Failed to match results:\n{str(error)}")
+    
+    def _on_match_complete(self, client, billable_status, result, widgets, elapsed, fuzzy=False):
+        self._update_match_progress(widgets, 100, "Displaying results...", "")
+        
+        self.matched_results = result['rows']
+        counts = result['counts']
+        
+        if billable_status == "Should be billable":
+            msg = f"Found {len(self.matched_results)} matching records from PostgreSQL results.\n"
+            msg += f"Billable Status: {billable_status}\n"
+            msg += f"Client '{client}' added to all matched records.\n"
+            if counts['with_dob'] > 0:
+                msg += f"{counts['with_dob']} matched with DOB verification.\n"
+            if counts['without_dob'] > 0:
+                msg += f"{counts['without_dob']} matched by name only (no DOB in file).\n"
+            if counts.get('fuzzy'):
+                msg += f"{counts['fuzzy']} fuzzy matched on DOB + similar name (review match_confidence).\n"
+            if counts['excluded'] > 0:
+                msg += f"{counts['excluded']} users with past termination dates were excluded from the file."
+        else:
+            msg = f"Found {len(self.matched_results)} users who should not be billable.\n"
+            msg += f"Billable Status: {billable_status}\n"
+            msg += f"Client '{client}' added to all records.\n\n"
+            msg += f"Breakdown:\n"
+            if counts['not_in_file'] > 0:
+                msg += f"  • {counts['not_in_file']} not in file\n"
+            if counts.get('fuzzy_possible'):
+                msg += f"    ({counts['fuzzy_possible']} of these have a possible fuzzy match in the file)\n"
+            if counts['past_term'] > 0:
+                msg += f"  • {counts['past_term']} in file but have past term dates\n"
+            if counts['auto_term_excluded'] > 0:
+                msg += f"\nExcluded:\n"
+                msg += f"  • {counts['auto_term_excluded']} users with past term dates but future termed_in_cheif (auto-term scheduled)\n"
+            msg += f"\n(File contained {result['unique_names']} unique names)"
+        
+        self.record_match_timing(client, billable_status, 'client', elapsed)
+        msg += self.format_match_timings(client, billable_status)
+        
+        self.show_matched_results(fuzzy=fuzzy)
+        
+        widgets[0].destroy()
+        
+        messagebox.showinfo("Match Complete", msg)
+
+    def show_matched_results(self, fuzzy=False):
+        headers = self.postgres_headers + ['match_confidence'] if fuzzy else self.postgres_headers
+        self.show_rows(headers, self.matched_results)
+    
+    def record_match_timing(self, client, billable_status, mode, seconds):
+        timings = self.match_timings.setdefault((client, billable_status), {})
+        
+        if mode == 'client':
+            query_timing = self.last_query_timing
+            if query_timing and query_timing['key'] == (client, billable_status):
+                timings['client'] = {'query': query_timing['seconds'], 'match': seconds}
             else:
-                file_names_with_dob = {}
-                file_names_without_dob = {}
-                
-                status_label.config(text="Building file index...")
-                progress_bar['maximum'] = 100
-                progress_window.update()
-                
-                for idx, row in enumerate(self.data):
-                    if idx % 50 == 0:
-                        progress = int((idx / len(self.data)) * 30)
-                        progress_bar['value'] = progress
-                        progress_text.config(text=f"{progress}%")
-                        details_label.config(text=f"Indexing row {idx + 1} of {len(self.data)}")
-                        progress_window.update()
-                    
-                    if len(row) > max(first_idx, last_idx):
-                        first = row[first_idx].strip().lower()
-                        last = row[last_idx].strip().lower()
-                        
-                        if not first or not last:
-                            continue
-                        
-                        dob = ''
-                        if dob_idx is not None and len(row) > dob_idx:
-                            dob = row[dob_idx].strip()
-                        
-                        file_term_date = ''
-                        if term_idx is not None and len(row) > term_idx:
-                            file_term_date = row[term_idx].strip()
-                        
-                        if dob:
-                            file_names_with_dob[(first, last, dob)] = file_term_date
-                        else:
-                            file_names_without_dob[(first, last)] = file_term_date
-                
-                self.matched_results = []
-                not_in_file_count = 0
-                past_term_in_file_count = 0
-                excluded_auto_term_count = 0
-                
-                status_label.config(text="Finding non-billable users...")
-                progress_window.update()
-                
-                for idx, pg_row in enumerate(self.postgres_data):
-                    if idx % 50 == 0:
-                        progress = 30 + int((idx / len(self.postgres_data)) * 70)
-                        progress_bar['value'] = progress
-                        progress_text.config(text=f"{progress}%")
-                        details_label.config(text=f"Checking row {idx + 1} of {len(self.postgres_data)}")
-                        progress_window.update()
-                    
-                    if len(pg_row) > max(pg_first_idx, pg_last_idx):
-                        first = self.clean_postgres_value(pg_row[pg_first_idx]).lower()
-                        last = self.clean_postgres_value(pg_row[pg_last_idx]).lower()
-                        
-                        if not first or not last:
-                            continue
-                        
-                        pg_dob = ''
-                        if len(pg_row) > pg_dob_idx:
-                            pg_dob = self.clean_postgres_value(pg_row[pg_dob_idx]).strip()
-                        
-                        found_in_file = False
-                        file_term_date_for_match = None
-                        
-                        if pg_dob:
-                            if (first, last, pg_dob) in file_names_with_dob:
-                                found_in_file = True
-                                file_term_date_for_match = file_names_with_dob[(first, last, pg_dob)]
-                        
-                        if not found_in_file:
-                            if (first, last) in file_names_without_dob:
-                                found_in_file = True
-                                file_term_date_for_match = file_names_without_dob[(first, last)]
-                            else:
-                                for (file_first, file_last, file_dob), term_date in file_names_with_dob.items():
-                                    if first == file_first and last == file_last:
-                                        found_in_file = True
-                                        file_term_date_for_match = term_date
-                                        break
-                        
-                        pg_term_date = ''
-                        if len(pg_row) > pg_term_idx:
-                            pg_term_date = self.clean_postgres_value(pg_row[pg_term_idx])
-                        
-                        has_past_file_term_date = False
-                        if found_in_file and file_term_date_for_match and file_term_date_for_match.strip():
-                            try:
-                                file_term_date_obj = None
-                                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d']:
-                                    try:
-                                        file_term_date_obj = datetime.strptime(file_term_date_for_match, fmt).date()
-                                        break
-                                    except ValueError:
-                                        continue
-                                
-                                if file_term_date_obj and file_term_date_obj < today:
-                                    has_past_file_term_date = True
-                            except Exception:
-                                pass
-                        
-                        has_future_termed_in_cheif = False
-                        if pg_term_date and pg_term_date.strip():
-                            try:
-                                cheif_term_date = None
-                                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d']:
-                                    try:
-                                        cheif_term_date = datetime.strptime(pg_term_date, fmt).date()
-                                        break
-                                    except ValueError:
-                                        continue
-                                
-                                if cheif_term_date and cheif_term_date >= today:
-                                    has_future_termed_in_cheif = True
-                            except Exception:
-                                pass
-                        
-                        should_include = False
-                        if has_past_file_term_date and has_future_termed_in_cheif:
-                            should_include = False
-                            excluded_auto_term_count += 1
-                        elif not found_in_file:
-                            should_include = True
-                            not_in_file_count += 1
-                        elif has_past_file_term_date:
-                            should_include = True
-                            past_term_in_file_count += 1
-                        
-                        if should_include:
-                            modified_row = [selected_client]
-                            modified_row.extend(pg_row)
-                            final_term_date = file_term_date_for_match if found_in_file else ''
-                            modified_row.append(final_term_date)
-                            self.matched_results.append(modified_row)
-                
-                msg = f"Found {len(self.matched_results)} users who should not be billable.\n"
-                msg += f"Billable Status: {billable_status}\n"
-                msg += f"Client '{selected_client}' added to all records.\n\n"
-                msg += f"Breakdown:\n"
-                if not_in_file_count > 0:
-                    msg += f"  • {not_in_file_count} not in file\n"
-                if past_term_in_file_count > 0:
-                    msg += f"  • {past_term_in_file_count} in file but have past term dates\n"
-                if excluded_auto_term_count > 0:
-                    msg += f"\nExcluded:\n"
-                    msg += f"  • {excluded_auto_term_count} users with past term dates but future termed_in_cheif (auto-term scheduled)\n"
-                msg += f"\n(File contained {len(file_names_with_dob) + len(file_names_without_dob)} unique names)"
+                timings['client'] = {'query': None, 'match': seconds}
+        else:
+            timings['server'] = seconds
+    
+    def format_match_timings(self, client, billable_status):
+        timings = self.match_timings.get((client, billable_status), {})
+        
+        if 'client' in timings:
+            client_timing = timings['client']
+            if client_timing['query'] is not None:
+                total = client_timing['query'] + client_timing['match']
+                client_text = (f"{total:.2f}s (query {client_timing['query']:.2f}s + "
+                               f"match {client_timing['match']:.2f}s)")
+            else:
+                client_text = f"{client_timing['match']:.2f}s (match only, results were pasted)"
+        else:
+            client_text = "not run"
+        
+        server_text = f"{timings['server']:.2f}s" if 'server' in timings else "not run"
+        
+        self.query_status_label.config(text=f"⏱ Client-side: {client_text}   |   Server join: {server_text}",
+                                       fg=self.text_secondary)
+        
+        return (f"\n\nTimings for {client} ({billable_status}):\n"
+                f"  • Client-side match: {client_text}\n"
+                f"  • Server-side join:  {server_text}")
+    
+    def build_file_match_keys(self, billable_status, first_idx, last_idx, dob_idx, term_idx):
+        file_index = build_file_index(self.data, billable_status, first_idx, last_idx, dob_idx, term_idx)
+        stats = {'excluded_count': file_index.get('excluded_count', 0), 
+                 'unique_names': file_index['unique_names']}
+        return file_key_rows(file_index), stats
+    
+    def build_server_join_query(self, client, billable_status):
+        users_sql = self.build_users_query(client, billable_status, include_order=False)
+        
+        def join(alias, kind, with_dob=False):
+            condition = f"{alias}.kind = '{kind}' AND " + SQL_NAME_MATCH.format(alias=alias)
+            if with_dob:
+                condition += " AND " + SQL_DOB_MATCH.format(alias=alias)
+            return f"LEFT JOIN bh_file_keys {alias} ON {condition}"
+        
+        if billable_status == "Should be billable":
+            return "\n".join([
+                "WITH u AS (",
+                users_sql,
+                ")",
+                "SELECT u.*,",
+                "       CASE WHEN fd.kind IS NOT NULL THEN fd.term_date ELSE fn.term_date END AS bh_file_term_date,",
+                "       CASE WHEN fd.kind IS NOT NULL THEN 'dob' ELSE 'name' END AS bh_outcome",
+                "FROM u",
+                SQL_CLEAN_KEYS,
+                join('fd', 'D', with_dob=True),
+                join('fn', 'N'),
+                "WHERE fd.kind IS NOT NULL OR fn.kind IS NOT NULL",
+                "ORDER BY u.last_login_date DESC NULLS LAST"
+            ])
+        
+        return "\n".join([
+            "WITH u AS (",
+            users_sql,
+            "), m AS (",
+            "    SELECT u.*,",
+            "           CASE WHEN fd.kind IS NOT NULL THEN fd.term_date",
+            "                WHEN fn.kind IS NOT NULL THEN fn.term_date",
+            "                ELSE ff.term_date END AS bh_file_term_date,",
+            "           (fd.kind IS NOT NULL OR fn.kind IS NOT NULL OR ff.kind IS NOT NULL) AS bh_found,",
+            "           COALESCE(CASE WHEN fd.kind IS NOT NULL THEN fd.term_past",
+            "                         WHEN fn.kind IS NOT NULL THEN fn.term_past",
+            "                         ELSE ff.term_past END, FALSE) AS bh_term_past",
+            "    FROM u",
+            SQL_CLEAN_KEYS,
+            "    " + join('fd', 'D', with_dob=True),
+            "    " + join('fn', 'N'),
+            "    " + join('ff', 'F'),
+            "    WHERE c.first_name <> '' AND c.last_name <> ''",
+            ")",
+            "SELECT m.*,",
+            "       CASE WHEN NOT bh_found THEN 'not_in_file'",
+            "            WHEN termed_in_cheif >= %(today)s THEN 'auto_term_excluded'",
+            "            ELSE 'past_term' END AS bh_outcome",
+            "FROM m",
+            "WHERE NOT bh_found OR bh_term_past",
+            "ORDER BY last_login_date DESC NULLS LAST"
+        ])
+    
+    def match_results_in_db(self):
+        if not PSYCOPG2_AVAILABLE:
+            messagebox.showerror("Error", 
+                               "psycopg2 is not installed!\n\n"
+                               "Install it using:\npip install psycopg2-binary")
+            return
+        
+        if not self.data or not self.headers:
+            messagebox.showwarning("No File", "Please upload a file first!")
+            return
+        
+        client = self.client.get()
+        billable_status = self.billable_status.get()
+        
+        if not client:
+            messagebox.showwarning("Client Required", "Please select a client in the configuration!")
+            return
+        
+        if not billable_status:
+            messagebox.showwarning("Billable Status Required", "Please select a billable status in the configuration!")
+            return
+        
+        first_col = self.extract_column_name(self.first_name_col.get())
+        last_col = self.extract_column_name(self.last_name_col.get())
+        term_col = self.extract_column_name(self.termination_date_col.get()) if self.termination_date_col.get() else None
+        dob_col = self.extract_column_name(self.date_of_birth_col.get()) if self.date_of_birth_col.get() else None
+        
+        if not first_col or not last_col:
+            messagebox.showwarning("Column Selection Required", 
+                                "Please select first name and last name columns!")
+            return
+        
+        conn_params = {
+            'host': self.db_host.get().strip(),
+            'port': self.db_port.get().strip(),
+            'database': self.db_name.get().strip(),
+            'user': self.db_user.get().strip(),
+            'password': self.db_password.get()
+        }
+        
+        if not all([conn_params['host'], conn_params['port'], conn_params['database'], conn_params['user']]):
+            messagebox.showwarning("Database Configuration Required",
+                                 "Please fill in all database connection fields:\n"
+                                 "Host, Port, Database, and Username")
+            return
+        
+        started = time.perf_counter()
+        
+        try:
+            first_idx = self.headers.index(first_col)
+            last_idx = self.headers.index(last_col)
+            term_idx = self.headers.index(term_col) if term_col else None
+            dob_idx = self.headers.index(dob_col) if dob_col else None
+        except ValueError as e:
+            messagebox.showerror("Error", f"Column not found:\n{str(e)}")
+            return
+        
+        key_rows, stats = self.build_file_match_keys(billable_status, first_idx, last_idx, dob_idx, term_idx)
+        query = self.build_server_join_query(client, billable_status)
+        
+        self._start_db_work(f"Uploading {len(key_rows):,} file keys to {conn_params['host']}...")
+        
+        import threading
+        join_thread = threading.Thread(target=self._run_server_join_worker, 
+                                       args=(query, client, billable_status, conn_params, key_rows, stats, started),
+                                       daemon=True)
+        join_thread.start()
+    
+    def _run_server_join_worker(self, query, client, billable_status, conn_params, key_rows, stats, started):
+        conn = None
+        cursor = None
+        try:
+            conn = self.acquire_db_connection(conn_params)
+            self.active_db_connection = conn
             
-            status_label.config(text="Displaying results...")
-            progress_bar['value'] = 100
-            progress_text.config(text="100%")
-            progress_window.update()
+            if self.query_cancelled:
+                raise psycopg2.extensions.QueryCanceledError("Query cancelled by user")
             
-            self.tree.delete(*self.tree.get_children())
+            cursor = conn.cursor()
+            cursor.execute(
+                "CREATE TEMP TABLE bh_file_keys ("
+                "kind char(1), first_name text, last_name text, dob date, "
+                "term_date text, term_past boolean) ON COMMIT DROP"
+            )
             
-            self.tree['columns'] = self.postgres_headers
-            self.tree['show'] = 'headings'
+            buffer = io.StringIO()
+            csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(key_rows)
+            buffer.seek(0)
             
-            self.sort_reverse = {}
+            cursor.copy_expert(
+                "COPY bh_file_keys (kind, first_name, last_name, dob, term_date, term_past) "
+                "FROM STDIN WITH (FORMAT csv, FORCE_NULL (dob))", buffer)
+            cursor.execute("CREATE INDEX ON bh_file_keys (first_name, last_name)")
+            cursor.execute("ANALYZE bh_file_keys")
             
-            for col in self.postgres_headers:
-                self.tree.heading(col, text=col, command=lambda c=col: self.sort_treeview(c))
-                self.tree.column(col, width=150, anchor=tk.W)
+            self.root.after(0, self._update_server_join_progress, client)
             
-            self.all_results = list(self.matched_results)
+            # Dates render as ISO text, as str() gives them to the client join
+            cursor.execute("SET LOCAL DateStyle = 'ISO, YMD'")
+            cursor.execute(query, {'today': datetime.now().date(), 'strip_chars': SQL_STRIP_CHARS})
+            rows = cursor.fetchall()
+            column_names = [desc[0] for desc in cursor.description]
             
-            for row in self.matched_results:
-                self.tree.insert('', tk.END, values=row)
+            conn.rollback()
             
-            progress_window.destroy()
+            self.root.after(0, self._on_server_join_complete, client, billable_status, rows, 
+                            column_names, stats, time.perf_counter() - started)
             
-            messagebox.showinfo("Match Complete", msg)
+        except Exception as e:
+            self.root.after(0, self._on_query_failed, client, conn_params, e)
+        finally:
+            # The completion handler may already have let another worker start and set its own
+            if self.active_db_connection is conn:
+                self.active_db_connection = None
+            try:
+                if cursor:
+                    cursor.close()
+            except Exception:
+                pass
+            if conn:
+                self.release_db_connection(conn)
+    
+    def _update_server_join_progress(self, client):
+        if self.query_cancelled:
+            return
+        self.query_status_label.config(text=f"Joining file keys against {client}.users...", 
+                                       fg=self.text_secondary)
+    
+    def _on_server_join_complete(self, client, billable_status, rows, column_names, stats, elapsed):
+        self._reset_query_buttons()
+        
+        term_pos = column_names.index('bh_file_term_date')
+        outcome_pos = column_names.index('bh_outcome')
+        
+        outcome_counts = {}
+        self.matched_results = []
+        
+        for row in rows:
+            outcome = row[outcome_pos]
+            outcome_counts[outcome] = outcome_counts.get(outcome, 0) + 1
             
-        except ValueError as e:
-            progress_window.destroy()
-            messagebox.showerror("Error", f"Column not found:\n{str(e)}")
+            if outcome == 'auto_term_excluded':
+                continue
+            
+            modified_row = [client]
+            modified_row.extend(row[:term_pos])
+            modified_row.append(row[term_pos] or '')
+            self.matched_results.append(modified_row)
+        
+        if billable_status == "Should be billable":
+            msg = f"Found {len(self.matched_results)} matching records (server-side join).\n"
+            msg += f"Billable Status: {billable_status}\n"
+            msg += f"Client '{client}' added to all matched records.\n"
+            if outcome_counts.get('dob'):
+                msg += f"{outcome_counts['dob']} matched with DOB verification.\n"
+            if outcome_counts.get('name'):
+                msg += f"{outcome_counts['name']} matched by name only (no DOB in file).\n"
+            if stats['excluded_count'] > 0:
+                msg += f"{stats['excluded_count']} users with past termination dates were excluded from the file."
+        else:
+            msg = f"Found {len(self.matched_results)} users who should not be billable (server-side join).\n"
+            msg += f"Billable Status: {billable_status}\n"
+            msg += f"Client '{client}' added to all records.\n\n"
+            msg += f"Breakdown:\n"
+            if outcome_counts.get('not_in_file'):
+                msg += f"  • {outcome_counts['not_in_file']} not in file\n"
+            if outcome_counts.get('past_term'):
+                msg += f"  • {outcome_counts['past_term']} in file but have past term dates\n"
+            if outcome_counts.get('auto_term_excluded'):
+                msg += f"\nExcluded:\n"
+                msg += f"  • {outcome_counts['auto_term_excluded']} users with past term dates but future termed_in_cheif (auto-term scheduled)\n"
+            msg += f"\n(File contained {stats['unique_names']} unique names)"
+        
+        self.record_match_timing(client, billable_status, 'server', elapsed)
+        msg += self.format_match_timings(client, billable_status)
+        
+        self.show_matched_results()
+        
+        messagebox.showinfo("Match Complete", msg)
+
+    def run_batch_audit(self):
+        if not PSYCOPG2_AVAILABLE:
+            messagebox.showerror("Error", 
+                               "psycopg2 is not installed!\n\n"
+                               "Install it using:\npip install psycopg2-binary")
+            return
+        
+        conn_params = {
+            'host': self.db_host.get().strip(),
+            'port': self.db_port.get().strip(),
+            'database': self.db_name.get().strip(),
+            'user': self.db_user.get().strip(),
+            'password': self.db_password.get()
+        }
+        
+        if not all([conn_params['host'], conn_params['port'], conn_params['database'], conn_params['user']]):
+            messagebox.showwarning("Database Configuration Required",
+                                 "Please fill in all database connection fields:\n"
+                                 "Host, Port, Database, and Username")
+            return
+        
+        manifest_path = filedialog.askopenfilename(
+            title="Select batch manifest (client, source, billable_status)",
+            filetypes=(("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*"))
+        )
+        
+        if not manifest_path:
+            return
+        
+        try:
+            jobs = load_batch_manifest(manifest_path)
         except Exception as e:
-            progress_window.destroy()
-            messagebox.showerror("Error", f"Failed to match results:\n{str(e)}")
+            messagebox.showerror("Manifest Error", f"Failed to read manifest:\n{str(e)}")
+            return
+        
+        # One pooled connection per worker so nobody waits on a checkout
+        max_workers = DEFAULT_BATCH_WORKERS
+        if DB_POOL_AVAILABLE:
+            max_workers = min(max_workers, get_shared_pool().max_connections)
+        max_workers = min(max_workers, len(jobs))
+        
+        self._start_db_work(f"Batch audit: 0 of {len(jobs)} clients complete ({max_workers} at a time)...", 
+                            cancellable=False)
+        
+        import threading
+        batch_thread = threading.Thread(target=self._run_batch_worker, 
+                                        args=(jobs, conn_params, max_workers, self.s3_browser.profile),
+                                        daemon=True)
+        batch_thread.start()
+    
+    def _run_batch_worker(self, jobs, conn_params, max_workers, s3_profile=S3_PROFILE):
+        started = time.perf_counter()
+        
+        def progress(done, total, result):
+            self.root.after(0, self._update_batch_progress, done, total, result)
+        
+        try:
+            results = run_batch_audit(
+                jobs, max_workers=max_workers, progress_callback=progress,
+                build_query=self.build_users_query,
+                acquire_connection=lambda: self.acquire_db_connection(conn_params),
+                release_connection=self.release_db_connection,
+                fetch_source=lambda source: self._fetch_batch_source(source, s3_profile),
+                date_formats=self.date_formats
+            )
+            self.root.after(0, self._on_batch_complete, results, time.perf_counter() - started)
+        except Exception as e:
+            self.root.after(0, self._on_batch_failed, e)
+    
+    def _fetch_batch_source(self, source, profile=S3_PROFILE):
+        """Return (local_path, is_temp) for a local path, s3://bucket/key URL or bare S3 key
+
+        S3 sources are downloaded with the given AWS profile, the one the S3
+        browser uses.
+        """
+        if os.path.exists(source):
+            return source, False
+        
+        if not BOTO3_AVAILABLE:
+            raise FileNotFoundError(f"{source} not found locally and boto3 is not installed")
+        
+        bucket = S3_BUCKET
+        s3_key = source
+        if source.startswith('s3://'):
+            bucket, _, s3_key = source[len('s3://'):].partition('/')
+        
+        import tempfile
+        fd, local_path = tempfile.mkstemp(prefix="bill_hunter_", suffix=f"_{s3_key.split('/')[-1]}")
+        os.close(fd)
+        
+        try:
+            make_s3_client(profile).download_file(bucket, s3_key, local_path)
+        except Exception:
+            os.remove(local_path)
+            raise
+        
+        return local_path, True
+    
+    def _update_batch_progress(self, done, total, result):
+        status = "failed" if result['error'] else f"{len(result['rows']):,} rows"
+        self.query_status_label.config(text=f"Batch audit: {done} of {total} clients complete "
+                                            f"(last: {result['client']}, {status})", 
+                                       fg=self.text_secondary)
+    
+    def _on_batch_failed(self, error):
+        self._reset_query_buttons()
+        self.query_status_label.config(text="❌ Batch audit failed", fg=self.danger_color)
+        messagebox.showerror("Batch Audit Error", f"Batch audit failed:\n{str(error)}")
+    
+    def _on_batch_complete(self, results, elapsed):
+        self._reset_query_buttons()
+        
+        self.batch_results = results
+        self.matched_results = [row for result in results for row in result['rows']]
+        self.show_matched_results()
+        
+        failed = [result for result in results if result['error']]
+        sequential = sum(result['timings']['total'] for result in results)
+        
+        self.query_status_label.config(
+            text=f"✓ Batch audit: {len(results) - len(failed)} of {len(results)} clients, "
+                 f"{len(self.matched_results):,} rows in {elapsed:.1f}s",
+            fg=self.danger_color if failed else self.success_color)
+        
+        report_lines = [f"Batch audit of {len(results)} clients finished in {elapsed:.1f}s "
+                        f"(sum of client times {sequential:.1f}s)", ""]
+        
+        header = f"{'Client':<24}{'Status':<24}{'File':>9}{'DB':>9}{'Result':>9}"
+        header += f"{'Load':>8}{'Query':>8}{'Match':>8}{'Total':>8}"
+        report_lines.append(header)
+        report_lines.append('-' * len(header))
+        
+        for result in results:
+            timings = result['timings']
+            line = (f"{result['client'][:23]:<24}{result['billable_status'][:23]:<24}"
+                    f"{result['file_rows']:>9,}{result['db_rows']:>9,}{len(result['rows']):>9,}")
+            line += ''.join(f"{timings[key]:>7.1f}s" if key in timings else f"{'--':>8}"
+                            for key in ('load', 'query', 'match', 'total'))
+            report_lines.append(line)
+        
+        if failed:
+            report_lines.extend(["", "Errors:"])
+            report_lines.extend(f"  • {result['client']} ({result['source']}): {result['error']}" 
+                                for result in failed)
+        
+        self.show_batch_report('\n'.join(report_lines))
+    
+    def show_batch_report(self, report_text):
+        report_window = tk.Toplevel(self.root)
+        report_window.title("Batch Audit Report")
+        report_window.geometry("900x450")
+        report_window.transient(self.root)
+        
+        text_widget = scrolledtext.ScrolledText(report_window, font=('Courier', 10), wrap=tk.NONE)
+        text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text_widget.insert('1.0', report_text)
+        text_widget.config(state=tk.DISABLED)
+        
+        buttons_frame = tk.Frame(report_window)
+        buttons_frame.pack(pady=(0, 10))
+        
+        tk.Button(buttons_frame, text="Save Report CSV", command=self.save_batch_report,
+                  padx=12, pady=4).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons_frame, text="Close", command=report_window.destroy,
+                  padx=12, pady=4).pack(side=tk.LEFT, padx=5)
+    
+    def save_batch_report(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Save batch audit report",
+            defaultextension=".csv",
+            filetypes=(("CSV files", "*.csv"), ("All files", "*.*"))
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['client', 'source', 'billable_status', 'file_rows', 'db_rows', 'result_rows',
+                                 'load_seconds', 'query_seconds', 'match_seconds', 'total_seconds', 'error'])
+                for result in self.batch_results:
+                    timings = result['timings']
+                    writer.writerow([result['client'], result['source'], result['billable_status'],
+                                     result['file_rows'], result['db_rows'], len(result['rows'])] +
+                                    [f"{timings[key]:.2f}" if key in timings else '' 
+                                     for key in ('load', 'query', 'match', 'total')] +
+                                    [result['error'] or ''])
+            messagebox.showinfo("Saved", f"Report saved to:\n{file_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save report:\n{str(e)}")
 
 if __name__ == "__main__":
     root = tk.Tk()
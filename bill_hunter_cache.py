@@ -0,0 +1,316 @@
+"""
+Bill Hunter Query Cache
+Local SQLite snapshots of <client>.users query results with watermark refresh
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".bill_hunter_cache.sqlite")
+DEFAULT_CACHE_TTL = 12 * 60 * 60  # Seconds before a snapshot is fully re-fetched
+SCHEMA_VERSION = 2                # Bumped when snapshots written by older versions can no longer be read
+
+# Column positions in the Bill Hunter users query
+USER_ID_IDX = 0
+LAST_LOGIN_IDX = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    port TEXT NOT NULL,
+    database TEXT NOT NULL,
+    db_user TEXT NOT NULL,
+    client TEXT NOT NULL,
+    billable_status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    refreshed_at REAL NOT NULL,
+    max_last_login TEXT,
+    max_user_id INTEGER,
+    UNIQUE (host, port, database, db_user, client, billable_status)
+);
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    snapshot_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    row_json TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, user_id)
+);
+"""
+
+
+KEY_WHERE = "host = ? AND port = ? AND database = ? AND db_user = ? AND client = ? AND billable_status = ?"
+
+# Values psycopg2 returns that JSON cannot hold, tagged so they decode to the same type
+TYPE_TAG = '__bh_type__'
+TAGGED_TYPES = {
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'time': dt_time.fromisoformat,
+    'decimal': Decimal
+}
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {TYPE_TAG: 'datetime', 'value': value.isoformat()}
+    if isinstance(value, date):
+        return {TYPE_TAG: 'date', 'value': value.isoformat()}
+    if isinstance(value, dt_time):
+        return {TYPE_TAG: 'time', 'value': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {TYPE_TAG: 'decimal', 'value': str(value)}
+    return str(value)
+
+
+def _decode_value(obj):
+    if obj.get(TYPE_TAG) in TAGGED_TYPES:
+        return TAGGED_TYPES[obj[TYPE_TAG]](obj['value'])
+    return obj
+
+
+def _encode_row(row):
+    return json.dumps(list(row), default=_encode_value)
+
+
+def _decode_row(row_json):
+    return json.loads(row_json, object_hook=_decode_value)
+
+
+def _watermarks(rows):
+    """Latest last_login_date and, when user_id is an integer, the highest user_id"""
+    logins = [str(row[LAST_LOGIN_IDX]) for row in rows
+              if len(row) > LAST_LOGIN_IDX and row[LAST_LOGIN_IDX] not in (None, '')]
+    max_last_login = max(logins) if logins else None
+
+    user_ids = [row[USER_ID_IDX] for row in rows]
+    if user_ids and all(isinstance(user_id, int) for user_id in user_ids):
+        max_user_id = max(user_ids)
+    else:
+        max_user_id = None
+
+    return max_last_login, max_user_id
+
+
+def sort_users_rows(rows):
+    """Order rows like the users query: last_login_date DESC NULLS LAST"""
+    with_login = [row for row in rows if row[LAST_LOGIN_IDX] not in (None, '')]
+    without_login = [row for row in rows if row[LAST_LOGIN_IDX] in (None, '')]
+    with_login.sort(key=lambda row: str(row[LAST_LOGIN_IDX]), reverse=True)
+    return with_login + without_login
+
+
+class QueryCache:
+    """Per (server, client, billable status) snapshots of users query rows"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            self._restrict_permissions()
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS snapshot_rows; DROP TABLE IF EXISTS snapshots;")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def _restrict_permissions(self):
+        # Snapshots hold member PHI, so the file is only ever readable by its owner.
+        # SQLite gives its journal files the database file's permissions.
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+        os.close(fd)
+        os.chmod(self.path, 0o600)
+
+    @staticmethod
+    def make_key(conn_params, client, billable_status):
+        return (str(conn_params['host']).strip().lower(), str(conn_params['port']).strip(),
+                str(conn_params['database']).strip(), str(conn_params['user']).strip(), client, billable_status)
+
+    def load(self, key):
+        """Return the snapshot for key with its decoded rows, or None"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                snapshot = conn.execute(
+                    "SELECT id, created_at, refreshed_at, max_last_login, max_user_id FROM snapshots "
+                    f"WHERE {KEY_WHERE}", key).fetchone()
+                if not snapshot:
+                    return None
+
+                rows = [_decode_row(row_json) for (row_json,) in conn.execute(
+                    "SELECT row_json FROM snapshot_rows WHERE snapshot_id = ?", (snapshot[0],))]
+            finally:
+                conn.close()
+
+        return {
+            'id': snapshot[0],
+            'created_at': snapshot[1],
+            'refreshed_at': snapshot[2],
+            'max_last_login': snapshot[3],
+            'max_user_id': snapshot[4],
+            'rows': rows
+        }
+
+    def is_fresh(self, snapshot):
+        return snapshot is not None and time.time() - snapshot['created_at'] < self.ttl
+
+    def save(self, key, rows):
+        """Replace the snapshot for key with a full result set"""
+        max_last_login, max_user_id = _watermarks(rows)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        f"DELETE FROM snapshot_rows WHERE snapshot_id IN (SELECT id FROM snapshots WHERE {KEY_WHERE})",
+                        key)
+                    conn.execute(f"DELETE FROM snapshots WHERE {KEY_WHERE}", key)
+                    cursor = conn.execute(
+                        "INSERT INTO snapshots (host, port, database, db_user, client, billable_status, created_at, "
+                        "refreshed_at, max_last_login, max_user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (*key, now, now, max_last_login, max_user_id))
+                    snapshot_id = cursor.lastrowid
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO snapshot_rows (snapshot_id, user_id, row_json) VALUES (?, ?, ?)",
+                        ((snapshot_id, str(row[USER_ID_IDX]), _encode_row(row)) for row in rows))
+            finally:
+                conn.close()
+
+    def merge(self, snapshot, changed_rows, current_user_ids):
+        """Upsert rows fetched since the snapshot's watermarks and return the merged rows
+
+        current_user_ids are every user_id the users query matches now; cached
+        rows outside it (deleted users, or ones whose billable status changed)
+        are dropped, since the watermark refresh only ever sees new rows.
+        changed_rows should include the rows of missing_user_ids, so users who
+        newly match without a new login are added too.
+        """
+        merged = {str(row[USER_ID_IDX]): row for row in snapshot['rows']}
+        for row in changed_rows:
+            merged[str(row[USER_ID_IDX])] = _decode_row(_encode_row(row))
+
+        current_user_ids = {str(user_id) for user_id in current_user_ids}
+        stale_user_ids = [user_id for user_id in merged if user_id not in current_user_ids]
+        for user_id in stale_user_ids:
+            del merged[user_id]
+
+        if changed_rows or stale_user_ids:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO snapshot_rows (snapshot_id, user_id, row_json) VALUES (?, ?, ?)",
+                            ((snapshot['id'], str(row[USER_ID_IDX]), _encode_row(row)) for row in changed_rows))
+                        conn.executemany(
+                            "DELETE FROM snapshot_rows WHERE snapshot_id = ? AND user_id = ?",
+                            ((snapshot['id'], user_id) for user_id in stale_user_ids))
+                finally:
+                    conn.close()
+
+        rows = sort_users_rows(list(merged.values()))
+
+        max_last_login, max_user_id = _watermarks(rows)
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "UPDATE snapshots SET refreshed_at = ?, max_last_login = ?, max_user_id = ? WHERE id = ?",
+                        (time.time(), max_last_login, max_user_id, snapshot['id']))
+            finally:
+                conn.close()
+
+        return rows
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM snapshot_rows")
+                    conn.execute("DELETE FROM snapshots")
+            finally:
+                conn.close()
+
+
+def missing_user_ids(snapshot, changed_rows, current_user_ids):
+    """user_ids the users query matches now that neither the snapshot nor the refresh returned
+
+    These are users who started matching without passing a watermark, such
+    as a billable status change with no new login.
+    """
+    known = {str(row[USER_ID_IDX]) for row in snapshot['rows']}
+    known.update(str(row[USER_ID_IDX]) for row in changed_rows)
+    return [user_id for user_id in current_user_ids if str(user_id) not in known]
+
+
+def build_user_ids_query(users_query):
+    """Every user_id the users query matches now, used to prune rows a refresh cannot see leave"""
+    users_query = users_query.rstrip().rstrip(';')
+    return "\n".join([
+        "SELECT u.user_id FROM (",
+        users_query,
+        ") u"
+    ])
+
+
+def build_users_by_id_query(users_query):
+    """Wrap the users query so only the user_ids in %(user_ids)s come back
+
+    Returns the sql; pass the ids as a list in params['user_ids'].
+    """
+    users_query = users_query.rstrip().rstrip(';')
+    return "\n".join([
+        "SELECT u.* FROM (",
+        users_query,
+        ") u",
+        "WHERE u.user_id = ANY(%(user_ids)s)"
+    ])
+
+
+def build_refresh_query(users_query, snapshot):
+    """Wrap the users query so only rows past the snapshot's watermarks come back
+
+    Returns (sql, params). last_login_date uses >= because it is a date, so
+    rows from the watermark day are re-fetched and upserted.
+    """
+    conditions = []
+    params = {}
+
+    if snapshot['max_last_login']:
+        conditions.append("u.last_login_date >= %(since_login)s")
+        params['since_login'] = snapshot['max_last_login'][:10]
+    if snapshot['max_user_id'] is not None:
+        conditions.append("u.user_id > %(since_user_id)s")
+        params['since_user_id'] = snapshot['max_user_id']
+
+    if not conditions:
+        return None, None
+
+    users_query = users_query.rstrip().rstrip(';')
+    sql = "\n".join([
+        "SELECT u.* FROM (",
+        users_query,
+        ") u",
+        "WHERE " + " OR ".join(conditions),
+        "ORDER BY u.last_login_date DESC NULLS LAST"
+    ])
+    return sql, params
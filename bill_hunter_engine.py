@@ -0,0 +1,1031 @@
+"""
+Bill Hunter Matching Engine
+Matches eligibility file rows against PostgreSQL user rows without touching Tk
+"""
+
+import csv
+import json
+import os
+import re
+import sys
+import time
+from array import array
+from difflib import SequenceMatcher
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+BILLABLE_STATUS = "Should be billable"
+
+MATCH_TERM_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d']
+
+# Column positions in the Bill Hunter users query
+PG_FIRST_IDX = 2
+PG_LAST_IDX = 3
+PG_DOB_IDX = 4
+PG_TERM_IDX = 9
+
+FUZZY_MIN_SCORE = 0.85            # Minimum name similarity for a fuzzy match
+
+PROGRESS_INTERVAL = 0.1           # Seconds between progress callbacks
+JOIN_CHUNK_SIZE = 20000           # PostgreSQL rows joined between progress checks
+
+
+class ProgressThrottle:
+    """Forward progress to a callback at most once per interval"""
+
+    def __init__(self, callback=None, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, percent, status, details='', force=False):
+        if not self.callback:
+            return
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.callback(percent, status, details)
+
+
+# ============================================================================
+# Row store
+# ============================================================================
+
+class ColumnStore:
+    """Column-oriented table of strings for eligibility file data
+
+    Each column keeps one copy of every distinct value plus an array of
+    small integer codes, so a 300k-row file with repetitive columns costs
+    a few bytes per cell instead of a Python str and list slot each.
+    Rows are materialized as lists on access, which keeps row-oriented
+    callers (len(row), row[idx]) working unchanged.
+    """
+
+    def __init__(self, rows=None):
+        self.width = 0
+        self._values = []
+        self._lookup = []
+        self._codes = []
+        self._lengths = None
+        self._count = 0
+        if rows is not None:
+            self.extend(rows)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a store from an iterable of header + data rows; returns (headers, store)"""
+        rows = iter(rows)
+        headers = next(rows, None)
+        store = cls()
+        if headers is not None:
+            store.extend(rows)
+        return headers, store
+
+    def _add_column(self):
+        self._values.append([''])
+        self._lookup.append({'': 0})
+        self._codes.append(array('H', bytes(2 * self._count)))
+        self.width += 1
+
+    def _encode(self, col, value):
+        lookup = self._lookup[col]
+        code = lookup.get(value)
+        if code is None:
+            code = len(self._values[col])
+            if code == 0x10000:
+                self._codes[col] = array('I', self._codes[col])
+            lookup[value] = code
+            self._values[col].append(value)
+        return code
+
+    def append(self, row):
+        length = len(row)
+
+        if length > self.width:
+            if self._lengths is None and self._count:
+                self._lengths = array('H', [self.width]) * self._count
+            while self.width < length:
+                self._add_column()
+
+        if self._lengths is not None:
+            self._lengths.append(length)
+        elif length != self.width and self._count:
+            self._lengths = array('H', [self.width]) * self._count
+            self._lengths.append(length)
+
+        for col in range(self.width):
+            code = self._encode(col, row[col]) if col < length else 0
+            self._codes[col].append(code)
+
+        self._count += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def __len__(self):
+        return self._count
+
+    def row_length(self, index):
+        return self._lengths[index] if self._lengths is not None else self.width
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("row index out of range")
+        return [self._values[col][self._codes[col][index]] for col in range(self.row_length(index))]
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def row_indices(self, min_row_length=0):
+        """Positions of the rows that have at least min_row_length cells"""
+        if self._lengths is None:
+            return list(range(self._count)) if min_row_length <= self.width else []
+        return [index for index, length in enumerate(self._lengths) if length >= min_row_length]
+    
+    def column(self, idx, min_row_length=0):
+        """Decoded values of one column ('' where a row is too short)
+
+        Rows shorter than min_row_length are left out, mirroring the
+        `len(row) > max(...)` guards used on list rows.
+        """
+        if self._lengths is None:
+            if min_row_length > self.width:
+                return []
+            if idx is None or idx >= self.width:
+                return [''] * self._count
+            return list(map(self._values[idx].__getitem__, self._codes[idx]))
+
+        keep = [length >= min_row_length for length in self._lengths]
+        if idx is None or idx >= self.width:
+            return [''] * sum(keep)
+        values = self._values[idx]
+        return [values[code] for code, kept in zip(self._codes[idx], keep) if kept]
+
+    def map_column(self, idx, func):
+        """Replace every non-empty value of a column with func(value)
+
+        func runs once per distinct value. Returns the number of cells
+        that changed.
+        """
+        if idx is None or idx >= self.width:
+            return 0
+
+        old_values = self._values[idx]
+        new_values = ['']
+        new_lookup = {'': 0}
+        remap = [0] * len(old_values)
+        changed = set()
+
+        for code, value in enumerate(old_values):
+            if code == 0:
+                continue
+            mapped = func(value)
+            if mapped != value:
+                changed.add(code)
+            new_code = new_lookup.get(mapped)
+            if new_code is None:
+                new_code = len(new_values)
+                new_lookup[mapped] = new_code
+                new_values.append(mapped)
+            remap[code] = new_code
+
+        if not changed:
+            return 0
+
+        codes = self._codes[idx]
+        counts = Counter(codes)
+        typecode = 'H' if len(new_values) <= 0x10000 else 'I'
+        self._codes[idx] = array(typecode, map(remap.__getitem__, codes))
+        self._values[idx] = new_values
+        self._lookup[idx] = new_lookup
+
+        return sum(counts[code] for code in changed)
+
+    def memory_usage(self):
+        """Approximate bytes used by the store and by the equivalent list of lists"""
+        store_bytes = sys.getsizeof(self)
+        list_bytes = sys.getsizeof([]) + 8 * self._count
+
+        for col in range(self.width):
+            values = self._values[col]
+            codes = self._codes[col]
+            value_sizes = [sys.getsizeof(value) for value in values]
+            store_bytes += (sum(value_sizes) + sys.getsizeof(values) + sys.getsizeof(self._lookup[col]) +
+                            codes.buffer_info()[1] * codes.itemsize)
+            # csv.reader creates a new str object per cell
+            list_bytes += sum(value_sizes[code] * count for code, count in Counter(codes).items())
+
+        if self._lengths is not None:
+            store_bytes += self._lengths.buffer_info()[1] * self._lengths.itemsize
+            list_bytes += sum(sys.getsizeof([]) + 8 * length for length in self._lengths)
+        else:
+            list_bytes += self._count * (sys.getsizeof([]) + 8 * self.width)
+
+        return {'store': store_bytes, 'as_lists': list_bytes}
+
+
+# ============================================================================
+# Key building
+# ============================================================================
+
+def clean_postgres_value(value):
+    if value is None:
+        return ''
+    value_str = str(value).strip()
+    if value_str.startswith('"') and value_str.endswith('"'):
+        value_str = value_str[1:-1]
+    return value_str
+
+
+def _column(rows, idx):
+    if idx is None:
+        return [''] * len(rows)
+    return [row[idx] if len(row) > idx else '' for row in rows]
+
+
+def _strip_values(values, lower=False):
+    """Strip (and optionally lowercase) a list of strings in one vectorized pass"""
+    if PANDAS_AVAILABLE and values:
+        series = pd.Series(values, dtype=object).str.strip()
+        if lower:
+            series = series.str.lower()
+        return series.tolist()
+    if lower:
+        return [v.strip().lower() for v in values]
+    return [v.strip() for v in values]
+
+
+def _clean_postgres_column(values, lower=False):
+    """Vectorized clean_postgres_value over one PostgreSQL column"""
+    values = ['' if v is None else str(v) for v in values]
+    if PANDAS_AVAILABLE and values:
+        series = pd.Series(values, dtype=object).str.strip()
+        quoted = series.str.startswith('"') & series.str.endswith('"')
+        if quoted.any():
+            series[quoted] = series[quoted].str[1:-1]
+        if lower:
+            series = series.str.lower()
+        return series.tolist()
+    cleaned = [clean_postgres_value(v) for v in values]
+    if lower:
+        return [v.lower() for v in cleaned]
+    return cleaned
+
+
+def parse_term_date(value):
+    for fmt in MATCH_TERM_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _date_lookup(values):
+    """Parse each distinct date string once"""
+    return {value: parse_term_date(value) for value in set(values) if value and value.strip()}
+
+
+def build_file_index(data, billable_status, first_idx, last_idx, dob_idx=None, term_idx=None, today=None):
+    """Index the eligibility file the same way for both billable statuses"""
+    today = today or datetime.now().date()
+    min_length = max(first_idx, last_idx) + 1
+
+    if isinstance(data, ColumnStore):
+        columns = [data.column(idx, min_row_length=min_length) for idx in (first_idx, last_idx, dob_idx, term_idx)]
+    else:
+        rows = [row for row in data if len(row) >= min_length]
+        columns = [_column(rows, idx) for idx in (first_idx, last_idx, dob_idx, term_idx)]
+
+    firsts = _strip_values(columns[0], lower=True)
+    lasts = _strip_values(columns[1], lower=True)
+    dobs = _strip_values(columns[2])
+    terms = _strip_values(columns[3])
+
+    term_dates = _date_lookup(terms)
+    past_terms = {value for value, parsed in term_dates.items() if parsed and parsed < today}
+
+    if billable_status == BILLABLE_STATUS:
+        include = {}
+        excluded_count = 0
+
+        for first, last, dob, term in zip(firsts, lasts, dobs, terms):
+            if term in past_terms:
+                excluded_count += 1
+                continue
+            include[(first, last, dob)] = term
+
+        return {
+            'billable': True,
+            'include': include,
+            'excluded_count': excluded_count,
+            'unique_names': len(include),
+            'past_terms': past_terms
+        }
+
+    with_dob = {}
+    without_dob = {}
+
+    for first, last, dob, term in zip(firsts, lasts, dobs, terms):
+        if not first or not last:
+            continue
+        if dob:
+            with_dob[(first, last, dob)] = term
+        else:
+            without_dob[(first, last)] = term
+
+    # A PostgreSQL DOB that matches none of the file DOBs falls back to the
+    # first file entry with the same name
+    first_dob_by_name = {}
+    for (first, last, dob), term in with_dob.items():
+        first_dob_by_name.setdefault((first, last), term)
+
+    return {
+        'billable': False,
+        'with_dob': with_dob,
+        'without_dob': without_dob,
+        'first_dob_by_name': first_dob_by_name,
+        'unique_names': len(with_dob) + len(without_dob),
+        'past_terms': past_terms
+    }
+
+
+def iso_date_key(dob):
+    """A normalized DOB as yyyy-mm-dd for a SQL date column, or '' when it is not a real date
+
+    ISO input reads the same under every server DateStyle, so the server-side
+    join can compare DOBs as dates instead of as text.
+    """
+    try:
+        return datetime.strptime(dob, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return ''
+
+
+def file_key_rows(file_index):
+    """Flatten a file index into (kind, first, last, dob, term_date, term_past) rows
+
+    kind is 'D' for name + DOB keys, 'N' for name-only keys and 'F' for the
+    same-name fallback used by the non-billable match. dob is an ISO date or
+    '' (loaded as NULL), so a DOB that did not normalize to a date never
+    matches on DOB.
+    """
+    past_terms = file_index['past_terms']
+
+    def past_flag(term):
+        return 't' if term in past_terms else 'f'
+
+    if file_index['billable']:
+        return [('D' if dob else 'N', first, last, iso_date_key(dob), term, 'f')
+                for (first, last, dob), term in file_index['include'].items()]
+
+    key_rows = [('D', first, last, iso_date_key(dob), term, past_flag(term))
+                for (first, last, dob), term in file_index['with_dob'].items()]
+    key_rows.extend(('N', first, last, '', term, past_flag(term))
+                    for (first, last), term in file_index['without_dob'].items())
+    key_rows.extend(('F', first, last, '', term, past_flag(term))
+                    for (first, last), term in file_index['first_dob_by_name'].items())
+    return key_rows
+
+
+# ============================================================================
+# Date normalization
+# ============================================================================
+
+class DateNormalizer:
+    """Normalize date strings to yyyy-MM-dd using pre-compiled format patterns
+
+    Results are memoized per raw value, so a column with a few thousand
+    distinct dates only pays for regex + strptime once per distinct value.
+    """
+
+    def __init__(self, date_formats):
+        self.patterns = [(re.compile(info["regex"]), info["format"]) for info in date_formats.values()]
+        self.reset()
+
+    def reset(self):
+        self._memo = {}
+        self.parsed_count = 0
+        self.reused_count = 0
+
+    def normalize(self, value):
+        if not value or str(value).strip() == '':
+            return value
+
+        try:
+            result = self._memo[value]
+            self.reused_count += 1
+            return result
+        except KeyError:
+            pass
+        except TypeError:
+            return self._parse(value)
+
+        result = self._parse(value)
+        self._memo[value] = result
+        self.parsed_count += 1
+        return result
+
+    def _parse(self, value):
+        date_str = str(value).strip()
+        for pattern, fmt in self.patterns:
+            if pattern.match(date_str):
+                try:
+                    return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
+                except ValueError:
+                    continue
+        return value
+
+
+# ============================================================================
+# Fuzzy matching
+# ============================================================================
+
+SOUNDEX_CODES = {letter: str(digit) for digit, letters in
+                 enumerate(['aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r']) for letter in letters}
+
+
+def soundex(name):
+    """American Soundex code ('' for names without letters)"""
+    letters = [c for c in name.lower() if 'a' <= c <= 'z']
+    if not letters:
+        return ''
+
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES[letters[0]]
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES[letter]
+        if digit != '0' and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in 'hw':
+            previous = digit
+
+    return code.ljust(4, '0')
+
+
+def _name_parts(name):
+    """Split hyphenated or multi-word names into their letter-only parts"""
+    parts = re.split(r"[\s\-]+", name)
+    return [''.join(c for c in part if c.isalpha()) for part in parts if part]
+
+
+class NameScorer:
+    """Memoized name similarity; names repeat heavily across a client's users"""
+
+    def __init__(self):
+        self._ratios = {}
+        self._parts = {}
+        self._codes = {}
+
+    def blocking_keys(self, first, last, dob):
+        # Both name fields are indexed so swapped first/last names share a block
+        return {(dob, code) for code in self._phonetic_codes(last) + self._phonetic_codes(first)}
+
+    def _phonetic_codes(self, name):
+        codes = self._codes.get(name)
+        if codes is None:
+            codes = [soundex(part) for part in _name_parts(name) if part]
+            self._codes[name] = codes
+        return codes
+
+    def similarity(self, a, b):
+        if a == b:
+            return 1.0
+        key = (a, b) if a < b else (b, a)
+        ratio = self._ratios.get(key)
+        if ratio is None:
+            ratio = SequenceMatcher(None, a, b).ratio()
+            self._ratios[key] = ratio
+        return ratio
+
+    def part_similarity(self, a, b):
+        """Best similarity between two names, also trying each hyphenated part"""
+        best = self.similarity(a, b)
+        if best == 1.0:
+            return best
+        parts_a = self._name_parts(a)
+        parts_b = self._name_parts(b)
+        if len(parts_a) > 1 or len(parts_b) > 1:
+            for part_a in parts_a:
+                for part_b in parts_b:
+                    best = max(best, self.similarity(part_a, part_b))
+        return best
+
+    def _name_parts(self, name):
+        parts = self._parts.get(name)
+        if parts is None:
+            parts = _name_parts(name) or [name]
+            self._parts[name] = parts
+        return parts
+
+    def score(self, first_a, last_a, first_b, last_b):
+        direct = (self.similarity(first_a, first_b) + self.part_similarity(last_a, last_b)) / 2
+        if direct == 1.0:
+            return direct
+        swapped = (self.similarity(first_a, last_b) + self.similarity(last_a, first_b)) / 2
+        return max(direct, swapped)
+
+
+def fuzzy_match_residuals(file_entries, residuals, min_score=FUZZY_MIN_SCORE):
+    """Score unmatched rows against file entries that share a DOB + phonetic name block
+
+    file_entries is a list of (first, last, dob, term) and residuals a list of
+    (position, first, last, dob). Only entries with a DOB take part, which keeps
+    every block small. Returns {position: (score, file_entry)} for the best
+    candidate at or above min_score.
+    """
+    scorer = NameScorer()
+    residual_dobs = {dob for _, _, _, dob in residuals if dob}
+
+    # Only file entries sharing a DOB with some residual can land in a block
+    blocks = {}
+    for entry in file_entries:
+        first, last, dob, _ = entry
+        if dob not in residual_dobs:
+            continue
+        for key in scorer.blocking_keys(first, last, dob):
+            # One candidate per distinct name in a block
+            blocks.setdefault(key, {}).setdefault((first, last), entry)
+
+    best_by_key = {}
+    matches = {}
+
+    for position, first, last, dob in residuals:
+        if not dob:
+            continue
+
+        # Users sharing a name and DOB get the same candidate
+        key = (first, last, dob)
+        if key not in best_by_key:
+            best_score = 0.0
+            best_entry = None
+            seen = set()
+            for block_key in scorer.blocking_keys(first, last, dob):
+                for name, entry in blocks.get(block_key, {}).items():
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    score = scorer.score(first, last, entry[0], entry[1])
+                    if score > best_score:
+                        best_score = score
+                        best_entry = entry
+            best_by_key[key] = (best_score, best_entry) if best_score >= min_score else None
+
+        if best_by_key[key] is not None:
+            matches[position] = best_by_key[key]
+
+    return matches
+
+
+# ============================================================================
+# Matching
+# ============================================================================
+
+def match_rows(file_index, pg_rows, client, progress=None, today=None, fuzzy=False):
+    """Hash join PostgreSQL rows against a file index
+
+    Returns a dict with the output rows ([client] + pg_row + [file term date])
+    and the per-outcome counts shown in the completion message. With fuzzy
+    set, rows the exact join left unmatched are scored against the file
+    (see fuzzy_match_residuals) and every output row gets a trailing
+    match_confidence cell.
+    """
+    today = today or datetime.now().date()
+    progress = progress or ProgressThrottle()
+
+    min_length = max(PG_FIRST_IDX, PG_LAST_IDX) + 1
+
+    if isinstance(pg_rows, ColumnStore):
+        positions = pg_rows.row_indices(min_length)
+
+        def pg_column(idx):
+            return pg_rows.column(idx, min_row_length=min_length)
+    else:
+        positions = [i for i, row in enumerate(pg_rows) if len(row) >= min_length]
+        kept_rows = [pg_rows[i] for i in positions]
+
+        def pg_column(idx):
+            return _column(kept_rows, idx)
+
+    total = len(positions)
+
+    progress(30, "Building PostgreSQL keys...", f"{total:,} rows", force=True)
+
+    firsts = _clean_postgres_column(pg_column(PG_FIRST_IDX), lower=True)
+    lasts = _clean_postgres_column(pg_column(PG_LAST_IDX), lower=True)
+    dobs = _clean_postgres_column(pg_column(PG_DOB_IDX))
+
+    matched = []
+    counts = {}
+    residuals = []
+
+    def report(done):
+        progress(40 + int((done / max(total, 1)) * 60), "Matching with PostgreSQL data...",
+                 f"Matched {done:,} of {total:,} rows")
+
+    if file_index['billable']:
+        include = file_index['include']
+        dob_count = 0
+        name_count = 0
+
+        for start in range(0, total, JOIN_CHUNK_SIZE):
+            report(start)
+            end = min(start + JOIN_CHUNK_SIZE, total)
+            for i in range(start, end):
+                first = firsts[i]
+                last = lasts[i]
+                pg_dob = dobs[i]
+
+                if pg_dob and (first, last, pg_dob) in include:
+                    term = include[(first, last, pg_dob)]
+                    dob_count += 1
+                elif (first, last, '') in include:
+                    term = include[(first, last, '')]
+                    name_count += 1
+                else:
+                    residuals.append(i)
+                    continue
+
+                matched.append([client, *pg_rows[positions[i]], term])
+
+        counts = {'with_dob': dob_count, 'without_dob': name_count,
+                  'excluded': file_index['excluded_count']}
+
+        if fuzzy:
+            progress(95, "Fuzzy matching unmatched users...", f"{len(residuals):,} rows", force=True)
+            file_entries = [(first, last, dob, term) for (first, last, dob), term in include.items()]
+            fuzzy_matches = fuzzy_match_residuals(
+                file_entries, [(i, firsts[i], lasts[i], dobs[i]) for i in residuals])
+
+            for row in matched:
+                row.append('exact')
+            for i in residuals:
+                if i in fuzzy_matches:
+                    score, entry = fuzzy_matches[i]
+                    matched.append([client, *pg_rows[positions[i]], entry[3],
+                                    f"{score:.2f} ~ {entry[0]} {entry[1]}"])
+            counts['fuzzy'] = len(fuzzy_matches)
+
+        return {'rows': matched, 'counts': counts, 'unique_names': file_index['unique_names']}
+
+    with_dob = file_index['with_dob']
+    without_dob = file_index['without_dob']
+    first_dob_by_name = file_index['first_dob_by_name']
+    past_terms = file_index['past_terms']
+
+    pg_terms = _clean_postgres_column(pg_column(PG_TERM_IDX))
+    cheif_dates = _date_lookup(pg_terms)
+    future_cheif = {value for value, parsed in cheif_dates.items() if parsed and parsed >= today}
+
+    not_in_file = 0
+    past_term = 0
+    auto_term_excluded = 0
+
+    for start in range(0, total, JOIN_CHUNK_SIZE):
+        report(start)
+        end = min(start + JOIN_CHUNK_SIZE, total)
+        for i in range(start, end):
+            first = firsts[i]
+            last = lasts[i]
+            if not first or not last:
+                continue
+
+            pg_dob = dobs[i]
+            term = None
+
+            if pg_dob:
+                term = with_dob.get((first, last, pg_dob))
+            if term is None:
+                term = without_dob.get((first, last))
+            if term is None:
+                term = first_dob_by_name.get((first, last))
+
+            if term is None:
+                not_in_file += 1
+                residuals.append((i, len(matched)))
+                matched.append([client, *pg_rows[positions[i]], ''])
+            elif term in past_terms:
+                if pg_terms[i] in future_cheif:
+                    auto_term_excluded += 1
+                else:
+                    past_term += 1
+                    matched.append([client, *pg_rows[positions[i]], term])
+
+    counts = {'not_in_file': not_in_file, 'past_term': past_term,
+              'auto_term_excluded': auto_term_excluded}
+
+    if fuzzy:
+        # Fuzzy hits stay in the output, flagged for review, rather than
+        # being dropped as "in file" on a similarity score alone
+        progress(95, "Fuzzy matching users not in file...", f"{len(residuals):,} rows", force=True)
+        file_entries = [(first, last, dob, term) for (first, last, dob), term in with_dob.items()]
+        fuzzy_matches = fuzzy_match_residuals(
+            file_entries, [(i, firsts[i], lasts[i], dobs[i]) for i, _ in residuals])
+
+        not_in_file_rows = {row_idx: i for i, row_idx in residuals}
+        for row_idx, row in enumerate(matched):
+            if row_idx not in not_in_file_rows:
+                row.append('exact')
+            elif not_in_file_rows[row_idx] in fuzzy_matches:
+                score, entry = fuzzy_matches[not_in_file_rows[row_idx]]
+                row.append(f"{score:.2f} ~ {entry[0]} {entry[1]}")
+            else:
+                row.append('')
+        counts['fuzzy_possible'] = len(fuzzy_matches)
+
+    return {'rows': matched, 'counts': counts, 'unique_names': file_index['unique_names']}
+
+
+def run_match(data, pg_rows, client, billable_status, first_idx, last_idx, dob_idx=None, term_idx=None,
+              progress_callback=None, fuzzy=False):
+    """Index the file and join it against the PostgreSQL rows in one call"""
+    today = datetime.now().date()
+    progress = ProgressThrottle(progress_callback)
+
+    progress(0, "Building file index...", f"{len(data):,} rows", force=True)
+    file_index = build_file_index(data, billable_status, first_idx, last_idx, dob_idx, term_idx, today=today)
+
+    result = match_rows(file_index, pg_rows, client, progress=progress, today=today, fuzzy=fuzzy)
+    progress(100, "Displaying results...", force=True)
+    return result
+
+
+# ============================================================================
+# Batch audit
+# ============================================================================
+
+DEFAULT_BATCH_WORKERS = 4
+BATCH_FETCH_SIZE = 5000
+
+BILLABLE_STATUSES = [BILLABLE_STATUS, "Should not be billable"]
+
+MATCH_COLUMN_KEYWORDS = {
+    'first_name': ['first', 'fname', 'firstname', 'first_name', 'given', 'givenname'],
+    'last_name': ['last', 'lname', 'lastname', 'last_name', 'surname', 'family', 'familyname'],
+    'termination_date': ['termination', 'term_date', 'termdate', 'termination_date', 'end_date', 'enddate'],
+    'date_of_birth': ['dob', 'birth', 'birthdate', 'birth_date', 'date_of_birth', 'dateofbirth']
+}
+
+MANIFEST_COLUMN_OVERRIDES = {
+    'first_name_col': 'first_name',
+    'last_name_col': 'last_name',
+    'term_col': 'termination_date',
+    'dob_col': 'date_of_birth'
+}
+
+
+def detect_delimiter(file_path):
+    delimiters = ['|', ',', '\t']
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        first_line = f.readline()
+        delimiter_counts = {d: first_line.count(d) for d in delimiters}
+        max_delimiter = max(delimiter_counts, key=delimiter_counts.get)
+        if delimiter_counts[max_delimiter] > 0:
+            return max_delimiter
+
+    return ','
+
+
+def read_eligibility_file(file_path):
+    """Return (headers, ColumnStore) for a pipe, comma or tab delimited file"""
+    delimiter = detect_delimiter(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        headers, data = ColumnStore.from_rows(csv.reader(f, delimiter=delimiter))
+    if headers is None:
+        raise ValueError(f"{os.path.basename(file_path)} is empty")
+    return headers, data
+
+
+def guess_match_columns(headers):
+    """First column index whose header holds a keyword for each match column, or None"""
+    columns = {name: None for name in MATCH_COLUMN_KEYWORDS}
+
+    for idx, header in enumerate(headers):
+        header_lower = header.lower().strip()
+        for name, keywords in MATCH_COLUMN_KEYWORDS.items():
+            if columns[name] is None and any(keyword in header_lower for keyword in keywords):
+                columns[name] = idx
+
+    return columns
+
+
+def detect_match_columns(headers, overrides=None):
+    """Map first_name/last_name/termination_date/date_of_birth to column indexes"""
+    columns = guess_match_columns(headers)
+
+    for name, header in (overrides or {}).items():
+        if header not in headers:
+            raise ValueError(f"Column '{header}' not found in file")
+        columns[name] = headers.index(header)
+
+    if columns['first_name'] is None or columns['last_name'] is None:
+        raise ValueError("Could not detect first and last name columns")
+
+    return columns
+
+
+def load_batch_manifest(manifest_path):
+    """Read a CSV or JSON manifest of client, source and billable_status entries"""
+    if manifest_path.lower().endswith('.json'):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    else:
+        with open(manifest_path, 'r', encoding='utf-8', newline='') as f:
+            entries = list(csv.DictReader(f))
+
+    jobs = []
+    for line_number, entry in enumerate(entries, start=1):
+        entry = {str(k).strip().lower(): str(v).strip() for k, v in entry.items() if k and v is not None}
+        client = entry.get('client', '')
+        source = entry.get('source') or entry.get('file', '')
+        status = entry.get('billable_status', '')
+
+        if not client and not source:
+            continue
+        if not client or not source:
+            raise ValueError(f"Manifest entry {line_number} needs both a client and a source file")
+        if not status:
+            # No default: auditing the wrong population would go unnoticed
+            raise ValueError(f"Manifest entry {line_number} ({client}) needs a billable_status")
+        if status not in BILLABLE_STATUSES:
+            raise ValueError(f"Manifest entry {line_number} has unknown billable_status '{status}'")
+
+        overrides = {name: entry[key] for key, name in MANIFEST_COLUMN_OVERRIDES.items() if entry.get(key)}
+        jobs.append({'client': client, 'source': source, 'billable_status': status, 'columns': overrides})
+
+    if not jobs:
+        raise ValueError("The manifest does not contain any clients")
+
+    return jobs
+
+
+def run_client_audit(job, build_query, acquire_connection, release_connection, fetch_source, date_formats):
+    """Load, query and match one manifest entry; never raises"""
+    started = time.perf_counter()
+    timings = {}
+    result = {'client': job['client'], 'source': job['source'], 'billable_status': job['billable_status'],
+              'rows': [], 'counts': {}, 'file_rows': 0, 'db_rows': 0, 'timings': timings, 'error': None}
+
+    try:
+        local_path, is_temp = fetch_source(job['source'])
+        try:
+            headers, data = read_eligibility_file(local_path)
+        finally:
+            if is_temp and os.path.exists(local_path):
+                os.remove(local_path)
+
+        columns = detect_match_columns(headers, job['columns'])
+        normalizer = DateNormalizer(date_formats)
+        for idx in (columns['date_of_birth'], columns['termination_date']):
+            data.map_column(idx, normalizer.normalize)
+
+        result['file_rows'] = len(data)
+        timings['load'] = time.perf_counter() - started
+
+        query_started = time.perf_counter()
+        query = build_query(job['client'], job['billable_status'])
+        pg_rows = []
+        conn = acquire_connection()
+        discard = False
+        try:
+            cursor = conn.cursor(name=f"bill_hunter_batch_{job['client']}"[:63])
+            cursor.itersize = BATCH_FETCH_SIZE
+            cursor.execute(query.rstrip().rstrip(';'))
+            while True:
+                batch = cursor.fetchmany(BATCH_FETCH_SIZE)
+                if not batch:
+                    break
+                pg_rows.extend(batch)
+            cursor.close()
+        except Exception:
+            discard = True
+            raise
+        finally:
+            release_connection(conn, discard=discard)
+
+        result['db_rows'] = len(pg_rows)
+        timings['query'] = time.perf_counter() - query_started
+
+        match_started = time.perf_counter()
+        match = run_match(data, pg_rows, job['client'], job['billable_status'],
+                          columns['first_name'], columns['last_name'],
+                          columns['date_of_birth'], columns['termination_date'])
+        result['rows'] = match['rows']
+        result['counts'] = match['counts']
+        timings['match'] = time.perf_counter() - match_started
+
+    except Exception as e:
+        result['error'] = str(e)
+
+    timings['total'] = time.perf_counter() - started
+    return result
+
+
+def run_batch_audit(jobs, max_workers=DEFAULT_BATCH_WORKERS, progress_callback=None, **audit_kwargs):
+    """Run run_client_audit for every job on a bounded thread pool
+
+    Results come back in manifest order; progress_callback(done, total, result)
+    is called from the worker threads as each client finishes.
+    """
+    results = [None] * len(jobs)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(run_client_audit, job, **audit_kwargs): position
+                   for position, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results[futures[future]] = result
+            if progress_callback:
+                progress_callback(done, len(jobs), result)
+
+    return results
+
+
+# ============================================================================
+# PostgreSQL export ingest
+# ============================================================================
+
+INGEST_HEADER_FIRST_CELL = 'user_id'
+
+
+def _clean_export_cell(value):
+    value = value.strip()
+    if value == '\\N':
+        return ''
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1]
+    return value
+
+
+def ingest_postgres_export(lines, total_chars=None, progress_callback=None):
+    """Parse pasted psql output or a \\copy TSV/CSV export into a ColumnStore
+
+    lines is any iterable of text lines (a file object or StringIO), read
+    incrementally. Tab-separated text is split like the old clipboard
+    paste, with \\N read as empty; comma-separated input goes through
+    csv.reader. A leading header row starting with user_id is skipped.
+    """
+    progress = ProgressThrottle(progress_callback)
+    store = ColumnStore()
+    consumed = [0]
+
+    def counted(source):
+        for line in source:
+            consumed[0] += len(line)
+            yield line
+
+    source = counted(lines)
+
+    first_line = ''
+    for line in source:
+        if line.strip():
+            first_line = line
+            break
+
+    if not first_line:
+        return store
+
+    def report():
+        percent = int(consumed[0] / total_chars * 100) if total_chars else 0
+        progress(min(percent, 99), "Reading PostgreSQL results...", f"{len(store):,} rows")
+
+    def rows():
+        yield first_line
+        yield from source
+
+    if '\t' in first_line or ',' not in first_line:
+        parsed = ([_clean_export_cell(value) for value in line.rstrip('\r\n').split('\t')]
+                  for line in rows() if line.strip())
+    else:
+        parsed = ([_clean_export_cell(value) for value in row]
+                  for row in csv.reader(rows()) if any(value.strip() for value in row))
+
+    for count, row in enumerate(parsed):
+        if count == 0 and row and row[0].lower() == INGEST_HEADER_FIRST_CELL:
+            continue
+        store.append(row)
+        if count % 1000 == 0:
+            report()
+
+    progress(100, "Reading PostgreSQL results...", f"{len(store):,} rows", force=True)
+    return store
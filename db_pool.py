@@ -0,0 +1,291 @@
+"""
+HelloToolbelt PostgreSQL Connection Pool
+Shared keep-alive psycopg2 connections for HelloToolbelt and its tools
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+DEFAULT_MAX_CONNECTIONS = 4       # Per (host, port, database, user)
+DEFAULT_IDLE_TIMEOUT = 300        # Seconds before an idle connection is closed
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_CHECKOUT_TIMEOUT = 60     # Seconds to wait when every connection is busy
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no pooled connection frees up before the checkout timeout"""
+
+
+# ============================================================================
+# Connection Pool
+# ============================================================================
+
+class PostgresConnectionPool:
+    """Keep-alive psycopg2 connections keyed by host, port, database and user"""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+
+        self._cond = threading.Condition()
+        self._idle = {}
+        self._in_use = {}
+        self._owners = {}
+        self._passwords = {}
+        self._closed = False
+
+        self._reaper_thread = None
+        self._reaper_stop = threading.Event()
+
+        self.stats = {'created': 0, 'reused': 0, 'discarded': 0, 'expired': 0}
+
+    def configure(self, max_connections=None, idle_timeout=None):
+        """Update pool limits from the shared DB settings"""
+        with self._cond:
+            if max_connections:
+                self.max_connections = max(1, int(max_connections))
+            if idle_timeout:
+                self.idle_timeout = max(5, int(idle_timeout))
+            self._cond.notify_all()
+
+    @staticmethod
+    def make_key(host, port, database, user):
+        return (str(host).strip().lower(), str(port or '5432').strip(), str(database).strip(), str(user).strip())
+
+    def getconn(self, host, port, database, user, password, checkout_timeout=DEFAULT_CHECKOUT_TIMEOUT):
+        """Check out a validated connection, opening a new one if the pool has room"""
+        if not PSYCOPG2_AVAILABLE:
+            raise RuntimeError("psycopg2 is not installed. Install with: pip install psycopg2-binary")
+
+        key = self.make_key(host, port, database, user)
+        deadline = time.monotonic() + checkout_timeout
+
+        while True:
+            candidate = None
+
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool has been closed")
+
+                if key in self._passwords and self._passwords[key] != password:
+                    self._close_idle(key)
+                self._passwords[key] = password
+
+                idle = self._idle.get(key)
+                if idle:
+                    candidate = idle.pop()[0]
+                    self._in_use[key] = self._in_use.get(key, 0) + 1
+                elif self._in_use.get(key, 0) < self.max_connections:
+                    self._in_use[key] = self._in_use.get(key, 0) + 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(
+                            f"All {self.max_connections} connections to {key[0]}/{key[2]} are busy")
+                    self._cond.wait(remaining)
+                    continue
+
+            if candidate is not None:
+                if self._validate(candidate):
+                    with self._cond:
+                        self._owners[id(candidate)] = key
+                        self.stats['reused'] += 1
+                    return candidate
+
+                self._discard(key, candidate)
+                continue
+
+            try:
+                conn = psycopg2.connect(
+                    host=host,
+                    port=port,
+                    database=database,
+                    user=user,
+                    password=password,
+                    connect_timeout=self.connect_timeout,
+                    keepalives=1,
+                    keepalives_idle=30,
+                    keepalives_interval=10,
+                    keepalives_count=3
+                )
+            except Exception:
+                with self._cond:
+                    self._in_use[key] = max(0, self._in_use.get(key, 0) - 1)
+                    self._cond.notify()
+                raise
+
+            with self._cond:
+                self._owners[id(conn)] = key
+                self.stats['created'] += 1
+                self._ensure_reaper()
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, or close it if it is broken"""
+        with self._cond:
+            key = self._owners.pop(id(conn), None)
+
+        if key is None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or conn.closed:
+            self._discard(key, conn)
+            return
+
+        with self._cond:
+            self._in_use[key] = max(0, self._in_use.get(key, 0) - 1)
+            if self._closed:
+                self._safe_close(conn)
+            else:
+                self._idle.setdefault(key, []).append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, host, port, database, user, password, checkout_timeout=DEFAULT_CHECKOUT_TIMEOUT):
+        """Context manager that checks a connection out and always returns it"""
+        conn = self.getconn(host, port, database, user, password, checkout_timeout=checkout_timeout)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def close_idle(self, max_age=None):
+        """Close idle connections older than max_age seconds (all of them when None)"""
+        now = time.monotonic()
+        expired = []
+
+        with self._cond:
+            for key, idle in self._idle.items():
+                keep = []
+                for conn, last_used in idle:
+                    if max_age is None or now - last_used >= max_age:
+                        expired.append(conn)
+                    else:
+                        keep.append((conn, last_used))
+                self._idle[key] = keep
+            self.stats['expired'] += len(expired)
+
+        for conn in expired:
+            self._safe_close(conn)
+
+        return len(expired)
+
+    def closeall(self):
+        """Close every idle connection and stop the reaper; busy ones close when returned"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._reaper_stop.set()
+        self.close_idle()
+
+    def status(self):
+        with self._cond:
+            idle = sum(len(v) for v in self._idle.values())
+            in_use = sum(self._in_use.values())
+            stats = dict(self.stats)
+        return {'idle': idle, 'in_use': in_use, **stats}
+
+    def _validate(self, conn):
+        if conn.closed:
+            return False
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, key, conn):
+        self._safe_close(conn)
+        with self._cond:
+            self.stats['discarded'] += 1
+            self._in_use[key] = max(0, self._in_use.get(key, 0) - 1)
+            self._cond.notify()
+
+    def _close_idle(self, key):
+        # Called with self._cond held
+        for conn, _ in self._idle.pop(key, []):
+            self._safe_close(conn)
+
+    @staticmethod
+    def _safe_close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _ensure_reaper(self):
+        # Called with self._cond held, so two first checkouts cannot both start a reaper
+        if self._reaper_thread and self._reaper_thread.is_alive():
+            return
+        self._reaper_stop.clear()
+        self._reaper_thread = threading.Thread(target=self._reap_loop, daemon=True)
+        self._reaper_thread.start()
+
+    def _reap_loop(self):
+        while not self._reaper_stop.wait(max(1, min(30, self.idle_timeout / 2))):
+            self.close_idle(max_age=self.idle_timeout)
+
+
+# ============================================================================
+# Process-wide shared pool
+# ============================================================================
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool():
+    """Return the pool shared by the launcher and every tool in this process"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = PostgresConnectionPool()
+        return _shared_pool
+
+
+def configure_shared_pool(max_connections=None, idle_timeout=None):
+    get_shared_pool().configure(max_connections=max_connections, idle_timeout=idle_timeout)
+
+
+def close_shared_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.closeall()
+            _shared_pool = None
+
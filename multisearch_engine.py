@@ -0,0 +1,1664 @@
+"""
+Multi-File Search Engine
+File reading and matching for the Multi-File Column Search Tool, kept free of
+tkinter so worker processes can import it
+"""
+
+import fnmatch
+import gzip
+import io
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+import zipfile
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from multisearch_index import SearchIndex, decode_positions, file_signature
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+MAX_SEARCH_WORKERS = os.cpu_count() or 4
+DEFAULT_SEARCH_WORKERS = max(1, min(4, MAX_SEARCH_WORKERS - 1))
+
+ARCHIVE_MEMBER_SEPARATOR = '::'   # "archive.zip::folder/member.csv" names a file inside a zip
+
+TXT_DELIMITERS = ['\t', '|', ',', ';', ' ']
+TXT_SNIFF_BYTES = 64 * 1024       # Leading bytes used to pick a .txt file's delimiter and encoding
+
+AUTOMATON_MIN_TERMS = 8           # Below this, plain substring checks are faster
+
+CHUNKED_READ_BYTES = 256 * 1024 * 1024  # Delimited files this large are read chunk by chunk
+CHUNK_ROWS = 100_000
+PROGRESS_POLL_SECONDS = 0.25
+
+MAX_STORED_TEXT_LINES = 100_000   # Matching .txt lines kept per file; the rest are only counted
+
+TABLE_SOURCE_COLUMNS = ['Source_File_Name', 'Source_File_Path', 'Matched_Column', 'Matched_Value',
+                        'Search_Terms_Used', 'Matched_Terms']
+TEXT_RESULT_COLUMNS = ['Source_File_Name', 'Source_File_Path', 'Matched_Search_Terms', 'Match_Type',
+                       'Line_Number', 'Content', 'Matched_Terms']
+TEXT_BLOCK_BYTES = 32 * 1024 * 1024
+SHEET_SOURCE_COLUMN = 'Source_Sheet'  # Added to results when every sheet of a workbook is searched
+
+# Cells pd.read_excel reads as missing: Excel error values and pandas' default NA strings
+EXCEL_ERROR_VALUES = frozenset(['#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'])
+EXCEL_NA_VALUES = EXCEL_ERROR_VALUES | frozenset([
+    '', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA',
+    'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+
+# ============================================================================
+# Cancellation
+# ============================================================================
+
+class SearchCancelled(Exception):
+    """Raised at a checkpoint once the search has been cancelled"""
+
+
+class SearchControl:
+    """Cancel and pause token for a scan
+
+    Flipped from any thread; the scan honours it between files and, inside
+    large or compressed files, between chunks and text blocks. Worker
+    processes get a copy built on manager events (see scan_files).
+    """
+
+    def __init__(self, cancelled=None, running=None):
+        self._cancelled = cancelled if cancelled is not None else threading.Event()
+        self._running = running if running is not None else threading.Event()
+        if running is None:
+            self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # Wake anything waiting on a pause so it sees the cancel
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def is_paused(self):
+        return not self._running.is_set()
+
+    def checkpoint(self):
+        """Block while paused; raise SearchCancelled once cancelled"""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise SearchCancelled()
+
+
+# ============================================================================
+# Search targets
+# ============================================================================
+
+def split_target(target):
+    """(file on disk, archive member or None) for a search target"""
+    file_path, separator, member = target.partition(ARCHIVE_MEMBER_SEPARATOR)
+    return (file_path, member) if separator else (target, None)
+
+
+def target_name(target):
+    """File name for reports, or "archive.zip::member" for a zip member"""
+    file_path, member = split_target(target)
+    file_name = os.path.basename(file_path)
+    return f"{file_name}{ARCHIVE_MEMBER_SEPARATOR}{member}" if member is not None else file_name
+
+
+def target_extension(target):
+    """Lowercase extension of the data inside a target, looking through .gz"""
+    file_path, member = split_target(target)
+    name = (member if member is not None else file_path).lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return Path(name).suffix
+
+
+def is_streamed(target):
+    """Whether a target is decompressed on the fly rather than read from disk"""
+    file_path, member = split_target(target)
+    return member is not None or file_path.lower().endswith('.gz')
+
+
+def open_target(target):
+    """Binary stream of a target, decompressing .gz files and zip members without extracting"""
+    file_path, member = split_target(target)
+    if member is not None:
+        # The member keeps the archive's file handle open until it is closed itself
+        with zipfile.ZipFile(file_path) as archive:
+            return archive.open(member)
+    if file_path.lower().endswith('.gz'):
+        return gzip.open(file_path, 'rb')
+    return open(file_path, 'rb')
+
+
+def target_size(target):
+    """Uncompressed size in bytes; a .gz trailer only records it modulo 4 GB"""
+    file_path, member = split_target(target)
+    if member is not None:
+        with zipfile.ZipFile(file_path) as archive:
+            return archive.getinfo(member).file_size
+
+    size = os.path.getsize(file_path)
+    if file_path.lower().endswith('.gz') and size >= 4:
+        with open(file_path, 'rb') as file:
+            file.seek(-4, os.SEEK_END)
+            size = max(size, int.from_bytes(file.read(4), 'little'))
+    return size
+
+
+def _zip_members(file_path, extensions):
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            return [info.filename for info in archive.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(extensions)]
+    except (zipfile.BadZipFile, OSError):
+        return []
+
+
+def _in_scope(relative_path, include, exclude):
+    path = relative_path.replace(ARCHIVE_MEMBER_SEPARATOR, '/')
+    name = path.rsplit('/', 1)[-1]
+
+    def matches(patterns):
+        return any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+    return (not include or matches(include)) and not (exclude and matches(exclude))
+
+
+def list_search_files(folder_path, file_extensions, recursive=False, include=None, exclude=None,
+                      archives=False):
+    """Search targets under folder_path with one of the extensions, in a stable order
+
+    recursive descends into subfolders. include and exclude are glob patterns
+    matched against a target's path relative to folder_path ("/"-separated,
+    zip members as "archive.zip/member") or its file name. archives adds
+    ".<ext>.gz" files and the matching members of .zip files.
+    """
+    extensions = tuple(f".{ext.lower()}" for ext in file_extensions)
+    gz_extensions = tuple(f"{ext}.gz" for ext in extensions)
+    targets = []
+
+    for dir_path, dir_names, file_names in os.walk(folder_path):
+        if recursive:
+            dir_names.sort()
+        else:
+            dir_names.clear()
+
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            relative_path = os.path.relpath(file_path, folder_path).replace(os.sep, '/')
+            lowered = file_name.lower()
+
+            if lowered.endswith(extensions) or (archives and lowered.endswith(gz_extensions)):
+                candidates = [file_path]
+            elif archives and lowered.endswith('.zip'):
+                candidates = [f"{file_path}{ARCHIVE_MEMBER_SEPARATOR}{member}"
+                              for member in _zip_members(file_path, extensions)]
+            else:
+                continue
+
+            targets.extend(target for target in candidates
+                           if _in_scope(relative_path + target[len(file_path):], include, exclude))
+
+    return sorted(targets)
+
+
+# ============================================================================
+# Matching
+# ============================================================================
+
+class MultiPatternMatcher:
+    """Aho-Corasick automaton that finds every search term inside a value in one pass"""
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for index, term in enumerate(self.terms):
+            state = 0
+            for char in term.lower():
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._out[state] += (index,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._out[next_state] += self._out[fail]
+
+    def find(self, text):
+        """Indices of every term contained in text (already lowercased)"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        found = set()
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+
+        return found
+
+
+def _find_terms(values, terms):
+    """{position: set of term indices} for the lowercased values Series containing any term"""
+    if len(terms) >= AUTOMATON_MIN_TERMS:
+        matcher = MultiPatternMatcher(terms)
+        found = {}
+        for position, value in enumerate(values):
+            value_terms = matcher.find(value)
+            if value_terms:
+                found[position] = value_terms
+        return found
+
+    # With a handful of terms, vectorized substring checks beat walking the automaton in Python
+    found = {}
+    for index, term in enumerate(terms):
+        for position in values.index[values.str.contains(term.lower(), regex=False, na=False)]:
+            found.setdefault(position, set()).add(index)
+    return found
+
+
+def _search_terms(search_values):
+    return list(dict.fromkeys(str(search_value) for search_value in search_values if str(search_value)))
+
+
+def match_distinct_values(values, weights, search_values, search_mode):
+    """Match search values against distinct lowercased values
+
+    weights[i] is the number of rows holding values[i]. Returns the positions
+    of the values whose rows match and {term: matching row count} for the
+    terms found, in search order.
+    """
+    terms = _search_terms(search_values)
+    found = _find_terms(values, terms)
+
+    hit_counts = [0] * len(terms)
+    for position, value_terms in found.items():
+        count = weights[position]
+        for index in value_terms:
+            hit_counts[index] += count
+
+    matched = {index for index, count in enumerate(hit_counts) if count}
+    kept = [position for position, value_terms in found.items()
+            if search_mode != "all" or matched <= value_terms]
+    term_counts = {terms[index]: hit_counts[index] for index in sorted(matched)}
+
+    return kept, term_counts
+
+
+def find_multiple_matches(df, column_name, search_values, search_mode):
+    """Match every search value against a column in a single pass
+
+    Terms are case-insensitive literal substrings. Each distinct cell value is
+    scanned once, so the cost barely grows with the number of terms. Returns
+    the matching rows and {term: matching row count} for the terms found, in
+    search order. In "all" mode a row must contain every term found anywhere
+    in the column. Values are matched as the folder index stores them
+    (normalize_exact, missing cells never matching), so a search finds the
+    same rows with or without the index.
+    """
+    values = df[column_name]
+    codes, uniques = pd.factorize(normalize_exact(values).where(values.notna()))
+    kept, term_counts = match_distinct_values(pd.Series(uniques, dtype=object),
+                                              pd.Series(codes).value_counts(), search_values, search_mode)
+
+    # Code -1 (missing values) indexes the trailing False
+    keep = [False] * (len(uniques) + 1)
+    for position in kept:
+        keep[position] = True
+    mask = pd.Series(keep).to_numpy()[codes]
+
+    return df[mask], term_counts
+
+
+def normalize_exact(values):
+    """Trimmed, lowercased strings used as exact-match keys"""
+    return values.astype(str).str.strip().str.lower()
+
+
+def _exact_terms(search_values):
+    """{exact-match key: search value as typed}, in search order"""
+    term_by_key = {}
+    for search_value in search_values:
+        key = str(search_value).strip().lower()
+        if key:
+            term_by_key.setdefault(key, str(search_value))
+    return term_by_key
+
+
+def find_exact_matches(df, column_name, search_values):
+    """Rows whose column value equals a search value, ignoring case and padding
+
+    One hash-set membership test per row, so the cost is O(rows + values)
+    however many values are searched. Returns the same (rows,
+    {term: matching row count}) shape as find_multiple_matches.
+    """
+    term_by_key = _exact_terms(search_values)
+
+    keys = normalize_exact(df[column_name])
+    mask = keys.isin(term_by_key.keys()) & df[column_name].notna()
+
+    hit_counts = keys[mask].value_counts()
+    term_counts = {term: int(hit_counts[key]) for key, term in term_by_key.items() if key in hit_counts.index}
+
+    return df[mask], term_counts
+
+
+# {file_path: ((signature, delimiter option), (sep or None, encoding))}, per process
+_txt_layouts = {}
+
+
+def sniff_txt_layout(file_path, delimiter=None):
+    """(sep, encoding) for a .txt file, decided from its first TXT_SNIFF_BYTES
+
+    sep is the first candidate delimiter that parses the sample into a real
+    table, or None when the file should be searched as plain text.
+    """
+    with open_target(file_path) as file:
+        sample = file.read(TXT_SNIFF_BYTES)
+        complete = not file.read(1)
+
+    if not complete:
+        # A cut-off last line would break the field counts
+        sample = sample[:sample.rfind(b'\n') + 1] or sample
+
+    try:
+        text, encoding = sample.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError as e:
+        if not complete and e.start >= len(sample) - 3:
+            text, encoding = sample[:e.start].decode('utf-8'), 'utf-8'
+        else:
+            text, encoding = sample.decode('latin-1'), 'latin-1'
+
+    for sep in ([delimiter] if delimiter else TXT_DELIMITERS):
+        try:
+            columns = pd.read_csv(io.StringIO(text), sep=sep).columns
+        except Exception:
+            continue
+        if len(columns) > 1 and not all(col.startswith('Unnamed') for col in columns):
+            return sep, encoding
+
+    return None, encoding
+
+
+def _remember_txt_layout(file_path, delimiter, layout):
+    _txt_layouts[file_path] = ((file_signature(split_target(file_path)[0]), delimiter), layout)
+
+
+def txt_layout(file_path, delimiter=None):
+    """Cached sniff_txt_layout, redone only when the file or the delimiter option changes"""
+    cached = _txt_layouts.get(file_path)
+    if cached and cached[0] == (file_signature(split_target(file_path)[0]), delimiter):
+        return cached[1]
+
+    layout = sniff_txt_layout(file_path, delimiter)
+    _remember_txt_layout(file_path, delimiter, layout)
+    return layout
+
+
+def read_txt_table(file_path, search_values, delimiter=None, exact=False, control=None):
+    """Read a .txt file as a table, falling back to a plain line search
+
+    The delimiter and encoding come from txt_layout, so a file is fully
+    parsed at most once; one that fails to parse is remembered as plain text.
+    """
+    try:
+        sep, encoding = txt_layout(file_path, delimiter)
+
+        if sep is not None:
+            try:
+                with open_target(file_path) as stream:
+                    return pd.read_csv(stream, sep=sep, encoding=encoding)
+            except UnicodeDecodeError:
+                # The sample was clean UTF-8 but the rest is not
+                _remember_txt_layout(file_path, delimiter, (sep, 'latin-1'))
+                with open_target(file_path) as stream:
+                    return pd.read_csv(stream, sep=sep, encoding='latin-1')
+            except Exception:
+                _remember_txt_layout(file_path, delimiter, (None, encoding))
+
+        matches = search_plain_text_file(file_path, search_values, encoding=encoding, exact=exact, control=control)
+        if matches is None and encoding != 'latin-1':
+            matches = search_plain_text_file(file_path, search_values, encoding='latin-1', exact=exact,
+                                             control=control)
+        return matches
+
+    except SearchCancelled:
+        raise
+    except Exception as e:
+        return None
+
+
+def _text_variants(terms, encoding):
+    """Terms as lowercased bytes, for searching ASCII-lowercased blocks
+
+    bytes.lower() only folds ASCII, so each term is also tried as typed and
+    uppercased for non-ASCII text. Hits are re-checked on the decoded line,
+    so the variants only have to find candidate lines.
+    """
+    variants = []
+    for term in terms:
+        for variant in dict.fromkeys([term, term.lower(), term.upper()]):
+            try:
+                variants.append(variant.encode(encoding).lower())
+            except UnicodeEncodeError:
+                continue
+    return list(dict.fromkeys(variants))
+
+
+def _hit_offsets(block, variants, exact):
+    """Offsets in a lowercased block where a term may start, in order"""
+    if not exact and len(variants) < AUTOMATON_MIN_TERMS:
+        # A few bytes.find scans run at memory speed, well ahead of a regex alternation
+        hits = set()
+        for variant in variants:
+            position = block.find(variant)
+            while position != -1:
+                hits.add(position)
+                position = block.find(variant, position + 1)
+        return sorted(hits)
+
+    alternation = b'|'.join(re.escape(variant) for variant in variants)
+    if exact:
+        pattern = re.compile(rb'^[ \t\r\f\v]*(?:' + alternation + rb')[ \t\r\f\v]*$', re.MULTILINE)
+    else:
+        pattern = re.compile(alternation)
+    return (match.start() for match in pattern.finditer(block))
+
+
+def _text_blocks(file_path):
+    """Line-aligned blocks of about TEXT_BLOCK_BYTES, memory-mapped or decompressed"""
+    if is_streamed(file_path):
+        with open_target(file_path) as stream:
+            while True:
+                block = stream.read(TEXT_BLOCK_BYTES)
+                if not block:
+                    return
+                yield block + stream.readline()
+
+    if os.path.getsize(file_path) == 0:
+        return
+
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        block_start = 0
+        while block_start < len(data):
+            block_end = data.find(b'\n', min(block_start + TEXT_BLOCK_BYTES, len(data)) - 1)
+            block_end = len(data) if block_end == -1 else block_end + 1
+            yield data[block_start:block_end]
+            block_start = block_end
+
+
+def search_plain_text_file(file_path, search_values, encoding='utf-8', exact=False, control=None):
+    """Line search over a memory-mapped (or streamed, when compressed) .txt file
+
+    The file is scanned in line-aligned blocks of TEXT_BLOCK_BYTES: each
+    block is lowercased once and searched for every term in one pass (a
+    compiled regex, or bytes.find for a few terms), with line numbers kept
+    by counting newlines. Only matching lines are decoded, and only
+    MAX_STORED_TEXT_LINES of them are kept; total_matches still counts
+    every one.
+    """
+    try:
+        terms = _search_terms(search_values)
+        lowered_values = [(search_value, search_value.lower()) for search_value in terms]
+        exact_values = {}
+        for search_value, search_val in lowered_values:
+            exact_values.setdefault(search_val.strip(), []).append(search_value)
+
+        variants = _text_variants(list(exact_values) if exact else terms, encoding)
+
+        matching_lines = []
+        matched_terms = {}
+        total_matches = 0
+
+        if variants:
+            line_num = 1
+            for raw_block in _text_blocks(file_path):
+                if control is not None:
+                    control.checkpoint()
+                block = raw_block.lower()
+
+                counted_to = 0
+                position = 0
+                for hit in _hit_offsets(block, variants, exact):
+                    if hit < position:
+                        continue
+
+                    line_start = block.rfind(b'\n', 0, hit) + 1
+                    line_end = block.find(b'\n', hit)
+                    if line_end == -1:
+                        line_end = len(block)
+
+                    line_num += block.count(b'\n', counted_to, line_start)
+                    counted_to = line_start
+
+                    line_content = raw_block[line_start:line_end].decode(encoding).strip()
+                    search_line = line_content.lower()
+
+                    if exact:
+                        line_matches = exact_values.get(search_line, [])
+                    else:
+                        line_matches = [search_value for search_value, search_val in lowered_values
+                                        if search_val in search_line]
+
+                    if line_matches:
+                        total_matches += 1
+                        matched_terms.update(dict.fromkeys(line_matches))
+                        if len(matching_lines) < MAX_STORED_TEXT_LINES:
+                            matching_lines.append({
+                                'number': line_num,
+                                'text': line_content,
+                                'matched_terms': line_matches
+                            })
+
+                    position = line_end + 1
+
+                line_num += block.count(b'\n', counted_to)
+
+        if matching_lines:
+            df = pd.DataFrame([{
+                'Line_Number': match['number'],
+                'Content': match['text'],
+                'Matched_Terms': ', '.join(match['matched_terms'])
+            } for match in matching_lines])
+
+            return {
+                'found': True,
+                'total_matches': total_matches,
+                'matched_terms': list(matched_terms),
+                'lines': matching_lines,
+                'content': df,
+                'encoding': encoding
+            }
+        else:
+            return {
+                'found': False,
+                'total_matches': 0,
+                'matched_terms': [],
+                'lines': [],
+                'content': pd.DataFrame(),
+                'encoding': encoding
+            }
+
+    except SearchCancelled:
+        raise
+    except Exception as e:
+        return None
+
+
+# ============================================================================
+# Excel workbooks
+# ============================================================================
+
+@contextmanager
+def open_workbook(source):
+    """Read-only openpyxl workbook of an .xlsx target or binary stream, closed afterwards
+
+    Read-only mode parses a sheet's XML as its rows are iterated instead of
+    building every cell up front, so memory no longer grows with the sheet.
+    """
+    if isinstance(source, str):
+        with open_target(source) as stream:
+            if is_streamed(source):
+                # The workbook is itself a zip and seeks around; seeking a compressed stream rereads it
+                stream = io.BytesIO(stream.read())
+            with open_workbook(stream) as workbook:
+                yield workbook
+        return
+
+    # Imported here so the rest of the search works without openpyxl, as it did through pd.read_excel
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        yield workbook
+    finally:
+        workbook.close()
+
+
+def _worksheet(workbook, sheet_name=0):
+    if isinstance(sheet_name, int):
+        return workbook.worksheets[sheet_name]
+    return workbook[sheet_name]
+
+
+def _cell_value(value):
+    # The conversions pandas' openpyxl reader applies; missing cells are NaN
+    if value is None:
+        return float('nan')
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value in EXCEL_NA_VALUES:
+        return float('nan')
+    return value
+
+
+def _header_names(row):
+    """{column name: name in the sheet} for the first row, named as pd.read_excel names columns
+
+    Trailing empty cells are dropped, empty names become "Unnamed: n" and
+    repeated names get .1, .2, ... suffixes that skip names already taken,
+    renaming unnamed columns last.
+    """
+    names = ["" if value is None else int(value) if isinstance(value, float) and value.is_integer() else value
+             for value in row]
+    while names and names[-1] == "":
+        names.pop()
+
+    unnamed = [position for position, name in enumerate(names) if name == ""]
+    sources = [f"Unnamed: {position}" if name == "" else name for position, name in enumerate(names)]
+    columns = list(sources)
+    counts = {}
+    for position in [position for position in range(len(columns)) if position not in unnamed] + unnamed:
+        source = name = columns[position]
+        count = counts.get(name, 0)
+        while count:
+            counts[source] = count + 1
+            name = f"{source}.{count}"
+            count = count + 1 if name in columns else counts.get(name, 0)
+        columns[position] = name
+        counts[name] = count + 1
+
+    return dict(zip(columns, sources))
+
+
+def _data_rows(rows):
+    """Sheet rows as they are streamed, minus the trailing empty ones pd.read_excel drops"""
+    held = []
+    for row in rows:
+        if all(value is None or value == "" for value in row):
+            held.append(row)
+            continue
+        yield from held
+        held.clear()
+        yield row
+
+
+def sheet_rows(sheet):
+    """(header, data row iterator, declared row count) of a read-only worksheet
+
+    Cells right of the header's last named column are dropped from every
+    row, since streaming cannot know how wide the widest row will be.
+    """
+    declared_rows = sheet.max_row or 0
+    # Stored dimensions are often wrong, so read to the last row as pandas does
+    sheet.reset_dimensions()
+    rows = sheet.iter_rows(values_only=True)
+    header = _header_names(next(rows, ()))
+    return header, _data_rows(rows), declared_rows
+
+
+def _infer_column(values):
+    # Numbers, numeric text included, become a numeric column as pd.read_excel makes them;
+    # anything else keeps its cell types, with all-date columns becoming datetime64
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return values.infer_objects()
+
+
+def _parse_rows(header, rows, dtype=None):
+    """Raw rows as a DataFrame with pd.read_excel's cell conversions and type inference
+
+    A dtype given for a repeated column name also applies to its renamed
+    copies, as in pd.read_excel.
+    """
+    width = len(header)
+    data = []
+    for row in rows:
+        values = [_cell_value(value) for value in row[:width]]
+        data.append(values + [float('nan')] * (width - len(values)))
+
+    df = pd.DataFrame(data, columns=list(header), dtype=object)
+    for column, source in header.items():
+        column_dtype = (dtype or {}).get(column, (dtype or {}).get(source))
+        if column_dtype is not None:
+            # Missing cells stay missing, where astype(str) would write "nan"
+            df[column] = df[column].astype(column_dtype).where(df[column].notna())
+        else:
+            df[column] = _infer_column(df[column])
+    return df
+
+
+def iter_sheet_chunks(header, rows, dtype=None, keep=None):
+    """DataFrames of CHUNK_ROWS sheet rows at a time, indexed by row position
+
+    Only one chunk of cells is held at once. keep(position), when given,
+    drops rows before they are parsed.
+    """
+    if not header:
+        return
+
+    position = 0
+    while True:
+        batch = list(itertools.islice(rows, CHUNK_ROWS))
+        if not batch:
+            return
+
+        positions = range(position, position + len(batch))
+        position += len(batch)
+        if keep is not None:
+            batch = [row for row_position, row in zip(positions, batch) if keep(row_position)]
+            positions = [row_position for row_position in positions if keep(row_position)]
+            if not batch:
+                continue
+
+        chunk = _parse_rows(header, batch, dtype)
+        chunk.index = positions
+        yield chunk
+
+
+def _sheet_progress(file_path, chunks, declared_rows, progress):
+    """Pass chunks through, reporting after each like a delimited file's chunks
+
+    Sheet XML is read from inside the workbook's zip, so bytes read are
+    estimated from the row count the sheet declares.
+    """
+    total_bytes = target_size(file_path)
+    rows_read = 0
+    for chunk in chunks:
+        yield chunk
+        rows_read += len(chunk)
+        if progress is not None:
+            fraction = min(1.0, rows_read / declared_rows) if declared_rows else 0.0
+            progress.put((file_path, rows_read, int(total_bytes * fraction), total_bytes))
+
+
+def read_workbook(source, sheet_name=0, nrows=None, usecols=None, skiprows=None, dtype=None):
+    """pd.read_excel for .xlsx files, streamed through openpyxl's read-only mode
+
+    Supports the arguments the search passes: nrows=0 reads only the header,
+    and rows dropped by skiprows (a callable on row numbers, the header
+    being 0) or columns left out of usecols are never kept, so reading a
+    column or a few rows does not hold the whole sheet.
+    """
+    with open_workbook(source) as workbook:
+        header, rows, _ = sheet_rows(_worksheet(workbook, sheet_name))
+        chunks = []
+        if nrows != 0:
+            keep = (lambda position: not skiprows(position + 1)) if skiprows else None
+            for chunk in iter_sheet_chunks(header, rows, dtype, keep):
+                chunks.append(chunk[usecols] if usecols is not None else chunk)
+
+    if not chunks:
+        return pd.DataFrame(columns=usecols if usecols is not None else list(header))
+
+    df = pd.concat(chunks)
+    if skiprows:
+        df.index = pd.RangeIndex(len(df))
+    return df
+
+
+# ============================================================================
+# Per-file search
+# ============================================================================
+
+def _search_text_matches(file_path, matches, search_values, signature=None):
+    file_name = target_name(file_path)
+
+    if not matches['found']:
+        return None, f"❌ No matches found in {file_name}\n"
+
+    text_results = FileMatches(
+        file_path, None, [line['number'] for line in matches['lines']],
+        _term_ids(search_values, matches['matched_terms']),
+        line_term_ids=[_term_ids(search_values, line['matched_terms']) for line in matches['lines']],
+        encoding=matches['encoding'], signature=signature)
+
+    msg = f"✅ Found {matches['total_matches']} line(s) matching search terms in {file_name}\n"
+    msg += f"   Matched terms: {', '.join(matches['matched_terms'])}\n"
+
+    for line in matches['lines'][:3]:
+        msg += f"   Line {line['number']}: {line['text'][:100]}...\n"
+
+    if len(matches['lines']) > 3:
+        msg += f"   ... and {len(matches['lines']) - 3} more matches\n"
+
+    if matches['total_matches'] > len(matches['lines']):
+        msg += f"   Only the first {len(matches['lines']):,} matching lines were kept\n"
+
+    return text_results, msg
+
+
+def _table_reader(file_ext, delimiter=None):
+    """pandas reader and keyword arguments for a tabular file type, or None"""
+    if file_ext == '.csv':
+        return pd.read_csv, {}
+    if file_ext == '.xlsx':
+        return read_workbook, {}
+    if file_ext == '.xls':
+        return pd.read_excel, {}
+    if file_ext == '.tsv':
+        return pd.read_csv, {'sep': delimiter or '\t'}
+    return None
+
+
+def _reader_key(read_kwargs):
+    # Stored with each index entry so a changed .tsv delimiter invalidates it
+    return json.dumps(read_kwargs, sort_keys=True)
+
+
+def _same_values(expected, actual):
+    # The projected read infers dtypes from matching rows only, so align before comparing
+    try:
+        actual = actual.astype(expected.dtype)
+    except (ValueError, TypeError):
+        pass
+    return [str(value) for value in expected] == [str(value) for value in actual]
+
+
+def read_rows_at(read, file_path, positions, read_kwargs, is_aligned):
+    """Second phase of a projected read: full rows only at the given positions
+
+    Rows are skipped by record number, so is_aligned(rows) checks them against
+    what the first phase saw; if blank or malformed lines shifted the
+    numbering the file is read in full instead.
+    """
+    positions = sorted(positions)
+    wanted = {position + 1 for position in positions}  # Record 0 is the header
+
+    rows = read(file_path, skiprows=lambda i: i != 0 and i not in wanted, **read_kwargs)
+
+    if len(rows) != len(positions) or not is_aligned(rows):
+        rows = read(file_path, **read_kwargs).iloc[positions]
+
+    rows.index = positions
+    return rows
+
+
+def reads_in_chunks(file_path):
+    """Whether a file is searched chunk by chunk
+
+    .xlsx workbooks always are, streamed row by row; so are compressed
+    delimited files, so they are decompressed in a single pass.
+    """
+    try:
+        file_ext = target_extension(file_path)
+        return file_ext == '.xlsx' or (
+            file_ext in ['.csv', '.tsv']
+            and (is_streamed(file_path) or os.path.getsize(file_path) >= CHUNKED_READ_BYTES))
+    except OSError:
+        return False
+
+
+def iter_file_chunks(file_path, read_kwargs, progress=None):
+    """CHUNK_ROWS-row DataFrames of a delimited file or workbook sheet, indexed by row position
+
+    progress.put((file_path, rows_read, bytes_read, total_bytes)) is called
+    after each chunk has been used.
+    """
+    if target_extension(file_path) == '.xlsx':
+        with open_workbook(file_path) as workbook:
+            header, rows, declared_rows = sheet_rows(_worksheet(workbook, read_kwargs.get('sheet_name', 0)))
+            chunks = iter_sheet_chunks(header, rows, read_kwargs.get('dtype'))
+            yield from _sheet_progress(file_path, chunks, declared_rows, progress)
+        return
+
+    total_bytes = target_size(file_path)
+    rows_read = 0
+    with open_target(file_path) as handle:
+        for chunk in pd.read_csv(handle, chunksize=CHUNK_ROWS, **read_kwargs):
+            yield chunk
+            rows_read += len(chunk)
+            if progress is not None:
+                progress.put((file_path, rows_read, handle.tell(), total_bytes))
+
+
+def _match_chunks(chunks, column_name, search_values, search_mode, control=None):
+    """Match DataFrame chunks one at a time, keeping only the hits
+
+    Each chunk keeps the rows holding any term; one final pass over those
+    candidates applies the "all" rule and counts terms, so the result equals
+    matching all the rows at once while memory stays bounded by the chunk
+    size. control is checked before each chunk.
+    """
+    chunk_mode = "any" if search_mode == "all" else search_mode
+    candidates = []
+
+    for chunk in chunks:
+        if control is not None:
+            control.checkpoint()
+        if chunk_mode == "exact":
+            matched, _ = find_exact_matches(chunk, column_name, search_values)
+        else:
+            matched, _ = find_multiple_matches(chunk, column_name, search_values, chunk_mode)
+        if not matched.empty:
+            candidates.append(matched)
+
+    if not candidates:
+        return None, {}
+
+    candidates = pd.concat(candidates)
+    if search_mode == "exact":
+        matched, term_counts = find_exact_matches(candidates, column_name, search_values)
+    else:
+        matched, term_counts = find_multiple_matches(candidates, column_name, search_values, search_mode)
+
+    return (None if matched.empty else matched), term_counts
+
+
+def _read_chunked_matches(file_path, column_name, search_values, search_mode, read_kwargs, progress=None,
+                          control=None):
+    """Match a large, compressed or .xlsx file CHUNK_ROWS rows at a time, reporting through progress"""
+    read_kwargs = {**read_kwargs, 'dtype': {column_name: str}}
+    return _match_chunks(iter_file_chunks(file_path, read_kwargs, progress), column_name, search_values,
+                         search_mode, control)
+
+
+def _stream_reader(read):
+    """Wrap a pandas reader so it reads a compressed target through open_target"""
+    if read is read_workbook:
+        return read  # Opens targets itself, buffering compressed workbooks for random access
+
+    def read_target(target, **read_kwargs):
+        with open_target(target) as stream:
+            return read(stream, **read_kwargs)
+    return read_target
+
+
+def _read_column_matches(read, file_path, column_name, search_values, search_mode, read_kwargs):
+    """Match against the search column alone, then read full rows for the hits"""
+    # Read the column as text, as the folder index does, so leading zeros survive and 123 never becomes 123.0
+    read_kwargs = {**read_kwargs, 'dtype': {column_name: str}}
+    column_df = read(file_path, usecols=[column_name], **read_kwargs)
+
+    if search_mode == "exact":
+        matched, term_counts = find_exact_matches(column_df, column_name, search_values)
+    else:
+        matched, term_counts = find_multiple_matches(column_df, column_name, search_values, search_mode)
+
+    if matched.empty:
+        return None, term_counts
+
+    expected = column_df[column_name].loc[sorted(matched.index)]
+    matching_rows = read_rows_at(read, file_path, matched.index, read_kwargs,
+                                 lambda rows: _same_values(expected, rows[column_name]))
+    matching_rows[column_name] = expected.values
+    return matching_rows.loc[matched.index], term_counts
+
+
+def record_offsets(file_path):
+    """Byte offset of each data record in a delimited file, followed by the file size
+
+    Quote-aware, so a quoted cell spanning lines stays in one record, and
+    empty lines are skipped the way pandas skips them.
+    """
+    offsets = array('Q')
+    in_quotes = False
+    header_seen = False
+    position = 0
+
+    with open(file_path, 'rb') as file:
+        for line in file:
+            if not in_quotes and line.strip(b'\r\n'):
+                if header_seen:
+                    offsets.append(position)
+                header_seen = True
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            position += len(line)
+
+    offsets.append(position)
+    return offsets
+
+
+def read_records(file_path, offsets, positions, read_kwargs):
+    """Parse only the records at positions, seeking straight to their byte offsets"""
+    with open(file_path, 'rb') as file:
+        chunks = [file.read(offsets[0])]
+        for position in positions:
+            file.seek(offsets[position])
+            record = file.read(offsets[position + 1] - offsets[position])
+            chunks.append(record if record.endswith(b'\n') else record + b'\n')
+
+    rows = pd.read_csv(io.BytesIO(b''.join(chunks)), **read_kwargs)
+    rows.index = positions[:len(rows)]
+    return rows
+
+
+def _read_indexed_matches(index, entry, read, file_path, column_name, search_values, search_mode, read_kwargs):
+    """Look matches up in the index, then read full rows only for the hits"""
+    if search_mode == "exact":
+        term_by_key = _exact_terms(search_values)
+        hits = index.exact_lookup(entry['id'], column_name, term_by_key)
+        term_counts = {term: len(hits[key]) for key, term in term_by_key.items() if key in hits}
+    else:
+        values = index.values(entry['id'], column_name)
+        kept, term_counts = match_distinct_values(pd.Series([value[0] for value in values], dtype=object),
+                                                  [value[1] for value in values], search_values, search_mode)
+        hits = {values[position][0]: decode_positions(values[position][2]) for position in kept}
+
+    if not hits:
+        return None, term_counts
+
+    key_by_position = {position: key for key, positions in hits.items() for position in positions}
+    positions = sorted(key_by_position)
+    expected = [key_by_position[position] for position in positions]
+
+    read_kwargs = {**read_kwargs, 'dtype': {column_name: str}}
+
+    def is_aligned(rows):
+        return len(rows) == len(positions) and normalize_exact(rows[column_name]).tolist() == expected
+
+    offsets = index.record_offsets(entry['id']) if read is pd.read_csv else None
+    if offsets is not None:
+        matching_rows = read_records(file_path, offsets, positions, read_kwargs)
+        if is_aligned(matching_rows):
+            return matching_rows, term_counts
+
+    return read_rows_at(read, file_path, positions, read_kwargs, is_aligned), term_counts
+
+
+def _file_results(file_path, column_name, columns, matching_rows, term_counts, search_values, search_mode,
+                  delimiter, source, sheet_names=None):
+    file_name = target_name(file_path)
+    matched_terms = list(term_counts)
+
+    sheet_codes = None
+    if sheet_names is not None:
+        code_by_sheet = {sheet_name: code for code, sheet_name in enumerate(sheet_names)}
+        sheet_codes = [code_by_sheet[sheet_name] for sheet_name in matching_rows[SHEET_SOURCE_COLUMN]]
+
+    file_matches = FileMatches(file_path, columns, matching_rows.index.tolist(),
+                               _term_ids(search_values, matched_terms), column_name=column_name,
+                               search_mode=search_mode, delimiter=delimiter, sheet_names=sheet_names,
+                               sheet_codes=sheet_codes)
+
+    msg = f"✅ Found {len(matching_rows)} match(es) in {file_name}{source}\n"
+    msg += f"   Matched search terms: {', '.join(matched_terms)}\n"
+
+    for term, count in term_counts.items():
+        msg += f"     '{term}': {count} match(es)\n"
+
+    other_cols = [col for col in columns if col != column_name][:2]
+    for idx, row in matching_rows.head(3).iterrows():
+        context_info = f"{row[column_name]}"
+        for col in other_cols:
+            context_info += f" | {col}: {str(row[col])[:30]}"
+        location = f"{row[SHEET_SOURCE_COLUMN]} row {idx}" if sheet_names is not None else f"Row {idx}"
+        msg += f"   {location}: {context_info}\n"
+
+    if len(matching_rows) > 3:
+        msg += f"   ... and {len(matching_rows) - 3} more matches\n"
+
+    return file_matches, msg
+
+
+def _search_sheets(file_path, column_name, search_values, search_mode, progress=None, control=None):
+    """Search every sheet of a workbook that has column_name, one streamed pass per sheet"""
+    file_name = target_name(file_path)
+    dtype = {column_name: str}
+    sheet_names = []
+    columns = []
+    parts = []
+    term_counts = {}
+
+    with open_workbook(file_path) as workbook:
+        all_sheet_names = workbook.sheetnames
+        for sheet in workbook.worksheets:
+            header, rows, declared_rows = sheet_rows(sheet)
+            if column_name not in header:
+                continue
+            sheet_names.append(sheet.title)
+            columns = list(dict.fromkeys(columns + list(header)))
+
+            chunks = _sheet_progress(file_path, iter_sheet_chunks(header, rows, dtype), declared_rows, progress)
+            matching_rows, sheet_term_counts = _match_chunks(chunks, column_name, search_values, search_mode,
+                                                             control)
+            if matching_rows is None:
+                continue
+            if search_mode != "all":
+                matching_rows = matching_rows.drop_duplicates()
+            matching_rows.insert(0, SHEET_SOURCE_COLUMN, sheet.title)
+            parts.append(matching_rows)
+            for term, count in sheet_term_counts.items():
+                term_counts[term] = term_counts.get(term, 0) + count
+
+    if not sheet_names:
+        msg = f"⚠️  Column '{column_name}' not found in any sheet of {file_name}\n"
+        msg += f"   Sheets: {all_sheet_names}\n"
+        return None, msg
+    if not parts:
+        return None, f"❌ No matches found in {file_name} ({len(sheet_names)} sheet(s))\n"
+
+    return _file_results(file_path, column_name, columns, pd.concat(parts), term_counts, search_values,
+                         search_mode, None, f" ({len(sheet_names)} sheet(s))", sheet_names)
+
+
+def search_file(file_path, column_name, search_values, search_mode, delimiter=None, index_path=None,
+                progress=None, control=None, all_sheets=False):
+    """Search one file and return (FileMatches or None, report message)
+
+    Delimited and .xls files are read in two phases: the header and the
+    search column first, then full rows only when something matched.
+    Delimited files past CHUNKED_READ_BYTES are instead streamed in chunks,
+    reporting through progress, as are .gz files and zip members, which are
+    decompressed on the fly, and .xlsx workbooks, read row by row in
+    openpyxl's read-only mode. Only the first sheet of a workbook is
+    searched unless all_sheets is set. With index_path, an unchanged file
+    whose search column is indexed skips the first phase entirely.
+    search_mode is "any", "all" or "exact". control (a SearchControl) is
+    checked before the file and between chunks; SearchCancelled propagates.
+    Runs in a worker process, so everything it returns must pickle.
+    """
+    file_name = target_name(file_path)
+
+    if control is not None:
+        control.checkpoint()
+
+    try:
+        file_ext = target_extension(file_path)
+        if file_ext == '.xlsx' and all_sheets:
+            return _search_sheets(file_path, column_name, search_values, search_mode, progress, control)
+
+        streamed = is_streamed(file_path)
+        reader = _table_reader(file_ext, delimiter)
+        entry = None
+        df = None
+        source = ""
+
+        if reader is not None:
+            read, read_kwargs = reader
+            if streamed:
+                read = _stream_reader(read)
+            elif index_path:
+                index = SearchIndex(index_path)
+                entry = index.lookup_file(file_path, _reader_key(read_kwargs))
+                if entry and column_name in entry['columns'] and column_name not in entry['indexed_columns']:
+                    entry = None
+            if entry:
+                columns = entry['columns']
+                source = " (index)"
+            else:
+                columns = list(read(file_path, nrows=0, **read_kwargs).columns)
+        elif file_ext == '.txt':
+            # Taken before reading, so an edit made during the scan also shows at export
+            signature = file_signature(split_target(file_path)[0])
+            df = read_txt_table(file_path, search_values, delimiter, exact=search_mode == "exact", control=control)
+            if df is None:
+                return None, ""
+            if isinstance(df, dict):
+                return _search_text_matches(file_path, df, search_values, signature)
+            columns = list(df.columns)
+        else:
+            return None, ""
+
+        if column_name not in columns:
+            msg = f"⚠️  Column '{column_name}' not found in {file_name}{source}\n"
+            msg += f"   Available columns: {columns}\n"
+            return None, msg
+
+        if entry:
+            matching_rows, term_counts = _read_indexed_matches(
+                index, entry, read, file_path, column_name, search_values, search_mode, read_kwargs)
+        elif df is None and reads_in_chunks(file_path):
+            matching_rows, term_counts = _read_chunked_matches(
+                file_path, column_name, search_values, search_mode, read_kwargs, progress, control)
+        elif df is None:
+            matching_rows, term_counts = _read_column_matches(
+                read, file_path, column_name, search_values, search_mode, read_kwargs)
+        else:
+            if search_mode == "exact":
+                matched, term_counts = find_exact_matches(df, column_name, search_values)
+            else:
+                matched, term_counts = find_multiple_matches(df, column_name, search_values, search_mode)
+            matching_rows = None if matched.empty else matched
+
+        if matching_rows is None:
+            return None, f"❌ No matches found in {file_name}{source}\n"
+
+        if search_mode != "all":
+            matching_rows = matching_rows.drop_duplicates()
+
+        return _file_results(file_path, column_name, columns, matching_rows, term_counts, search_values,
+                             search_mode, delimiter, source)
+
+    except SearchCancelled:
+        raise
+    except Exception as e:
+        return None, f"❌ Error reading {file_name}: {str(e)}\n"
+
+
+# ============================================================================
+# Match results
+# ============================================================================
+
+def _term_ids(search_values, terms):
+    """Position in search_values of each matched term (its first occurrence)"""
+    first_position = {}
+    for position, search_value in enumerate(search_values):
+        first_position.setdefault(str(search_value), position)
+    return tuple(first_position[str(term)] for term in terms)
+
+
+def _rows_hold_terms(values, terms, search_mode):
+    # Guards read_rows_at against rows read back out of place
+    if search_mode == "exact":
+        return normalize_exact(values).isin({term.strip().lower() for term in terms}).all()
+    lowered_terms = [term.lower() for term in terms]
+    # str() each value as _same_values does; astype(str) leaves NaN a float under pandas 3
+    return all(any(term in str(value).lower() for term in lowered_terms) for value in values)
+
+
+def read_matched_rows(file_path, column_name, positions, terms, search_mode, delimiter=None, sheet_name=0):
+    """Read back the rows at positions the way search_file read the file"""
+    file_ext = target_extension(file_path)
+    wanted = sorted(positions)
+
+    if file_ext == '.txt':
+        df = read_txt_table(file_path, [], delimiter)
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError(f"{target_name(file_path)} no longer reads as a table")
+        return df.loc[positions]
+
+    read, read_kwargs = _table_reader(file_ext, delimiter)
+    if file_ext == '.xlsx':
+        read_kwargs = {**read_kwargs, 'sheet_name': sheet_name}
+    read_kwargs = {**read_kwargs, 'dtype': {column_name: str}}
+
+    # Workbooks skip unwanted rows before parsing them, so they never need the full chunked pass
+    if file_ext != '.xlsx' and reads_in_chunks(file_path):
+        wanted_positions = set(wanted)
+        parts = []
+        for chunk in iter_file_chunks(file_path, read_kwargs):
+            part = chunk[chunk.index.isin(wanted_positions)]
+            if len(part):
+                parts.append(part)
+        if not parts:
+            raise ValueError(f"Matching rows of {target_name(file_path)} are gone")
+        rows = pd.concat(parts)
+    else:
+        if is_streamed(file_path):
+            read = _stream_reader(read)
+        rows = read_rows_at(read, file_path, wanted, read_kwargs,
+                            lambda rows: _rows_hold_terms(rows[column_name], terms, search_mode))
+
+    return rows.loc[positions]
+
+
+def read_text_lines(file_path, line_numbers, encoding='utf-8'):
+    """{line number: stripped text} for the wanted lines, streamed block by block"""
+    wanted = sorted(set(line_numbers))
+    lines = {}
+    next_wanted = 0
+    line_num = 1
+
+    for raw_block in _text_blocks(file_path):
+        block_end_line = line_num + raw_block.count(b'\n')
+        if not raw_block.endswith(b'\n'):
+            block_end_line += 1
+
+        if wanted[next_wanted] < block_end_line:
+            block_lines = raw_block.split(b'\n')
+            while next_wanted < len(wanted) and wanted[next_wanted] < block_end_line:
+                lines[wanted[next_wanted]] = block_lines[wanted[next_wanted] - line_num].decode(encoding).strip()
+                next_wanted += 1
+            if next_wanted == len(wanted):
+                break
+
+        line_num += raw_block.count(b'\n')
+
+    return lines
+
+
+class FileMatches:
+    """One file's matches held as row positions and search-term ids
+
+    Scans return these instead of DataFrames, so results stay small however
+    many rows match; rows() reads the matching rows back, with the source
+    columns added, only when they are needed. Term ids index the search
+    values the file was searched with. For plain-text matches (no column
+    name) the positions are line numbers and each line has its own term ids.
+    When every sheet of a workbook was searched, positions are per sheet and
+    sheet_codes index sheet_names. signature is the file's file_signature()
+    when plain-text lines were matched, since those are read back by line
+    number alone.
+    """
+
+    def __init__(self, file_path, columns, positions, term_ids, column_name=None, search_mode=None,
+                 delimiter=None, line_term_ids=None, encoding=None, sheet_names=None, sheet_codes=None,
+                 signature=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.positions = array('I', positions)
+        self.term_ids = term_ids
+        self.column_name = column_name
+        self.search_mode = search_mode
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.sheet_names = sheet_names
+        self.sheet_codes = array('I', sheet_codes) if sheet_codes is not None else None
+        self.signature = signature
+
+        # Lines mostly repeat a few term combinations, so store each once and a code per line
+        self.line_term_sets = []
+        self.line_term_codes = array('I')
+        if line_term_ids is not None:
+            codes = {}
+            for term_ids in line_term_ids:
+                self.line_term_codes.append(codes.setdefault(term_ids, len(codes)))
+            self.line_term_sets = list(codes)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def matched_terms(self, search_values):
+        return [str(search_values[term_id]) for term_id in self.term_ids]
+
+    def output_columns(self):
+        if self.column_name is None:
+            return list(TEXT_RESULT_COLUMNS)
+        if self.sheet_names is not None:
+            return TABLE_SOURCE_COLUMNS + [SHEET_SOURCE_COLUMN] + list(self.columns)
+        return TABLE_SOURCE_COLUMNS + list(self.columns)
+
+    def rows(self, search_values):
+        """The matching rows as the exported DataFrame, read from the file now"""
+        file_name = target_name(self.file_path)
+        matched_terms = self.matched_terms(search_values)
+        positions = self.positions.tolist()
+
+        if self.column_name is None:
+            # Line numbers carry no content to re-check, so any change to the file invalidates them
+            changed = ValueError(f"{file_name} changed since it was searched; search it again to export its lines")
+            if self.signature is not None and file_signature(split_target(self.file_path)[0]) != self.signature:
+                raise changed
+            lines = read_text_lines(self.file_path, positions, self.encoding)
+            if len(lines) < len(set(positions)):
+                raise changed
+            line_terms = [', '.join(str(search_values[term_id]) for term_id in term_ids)
+                          for term_ids in self.line_term_sets]
+            rows = pd.DataFrame({
+                'Line_Number': positions,
+                'Content': [lines[line_num] for line_num in positions],
+                'Matched_Terms': [line_terms[code] for code in self.line_term_codes]
+            })
+            rows.insert(0, 'Source_File_Name', file_name)
+            rows.insert(1, 'Source_File_Path', self.file_path)
+            rows.insert(2, 'Matched_Search_Terms', ', '.join(matched_terms))
+            rows.insert(3, 'Match_Type', 'Text_Search')
+            return rows
+
+        if self.sheet_names is None:
+            rows = read_matched_rows(self.file_path, self.column_name, positions, matched_terms,
+                                     self.search_mode, self.delimiter)
+        else:
+            # Positions are stored grouped by sheet, in sheet order
+            parts = []
+            for code, sheet_name in enumerate(self.sheet_names):
+                sheet_positions = [position for position, sheet_code in zip(positions, self.sheet_codes)
+                                   if sheet_code == code]
+                if sheet_positions:
+                    part = read_matched_rows(self.file_path, self.column_name, sheet_positions, matched_terms,
+                                             self.search_mode, sheet_name=sheet_name)
+                    part.insert(0, SHEET_SOURCE_COLUMN, sheet_name)
+                    parts.append(part)
+            rows = pd.concat(parts)
+        rows.insert(0, 'Source_File_Name', file_name)
+        rows.insert(1, 'Source_File_Path', self.file_path)
+        rows.insert(2, 'Matched_Column', self.column_name)
+        rows.insert(3, 'Matched_Value', rows[self.column_name])
+        rows.insert(4, 'Search_Terms_Used', ', '.join(search_values))
+        rows.insert(5, 'Matched_Terms', ', '.join(matched_terms))
+        return rows
+
+
+def export_matches_csv(results, search_values, output_path, progress_callback=None):
+    """Write every file's matching rows to one CSV, one file at a time
+
+    Columns are the union of the files' output columns in first-seen order,
+    as pd.concat would lay them out, so only one file's rows are in memory
+    at once. Returns the number of rows written.
+    """
+    columns = list(dict.fromkeys(column for matches in results for column in matches.output_columns()))
+    rows_written = 0
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        pd.DataFrame(columns=columns).to_csv(output, index=False)
+        for done, matches in enumerate(results, 1):
+            rows = matches.rows(search_values).reindex(columns=columns)
+            rows.to_csv(output, index=False, header=False)
+            rows_written += len(rows)
+            if progress_callback:
+                progress_callback(done, len(results), matches.file_path)
+
+    return rows_written
+
+
+# ============================================================================
+# Folder index
+# ============================================================================
+
+def index_file(index, file_path, column_names, delimiter=None):
+    """Index column_names of one file unless an unchanged entry already covers them
+
+    Returns "indexed", "current", or "skipped" for files the index does not
+    serve: .txt files, parsed by trial, and compressed files, whose rows
+    cannot be read back by position, are always searched directly.
+    """
+    reader = _table_reader(target_extension(file_path), delimiter)
+    if reader is None or is_streamed(file_path):
+        return "skipped"
+
+    read, read_kwargs = reader
+    reader_key = _reader_key(read_kwargs)
+
+    entry = index.lookup_file(file_path, reader_key)
+    if entry:
+        wanted = {column_name for column_name in column_names if column_name in entry['columns']}
+        if wanted <= entry['indexed_columns']:
+            return "current"
+        column_names = set(column_names) | entry['indexed_columns']
+
+    # Taken before reading, so a file edited mid-read is left stale rather than mis-indexed
+    signature = file_signature(file_path)
+    indexed_at = time.time()
+
+    columns = list(read(file_path, nrows=0, **read_kwargs).columns)
+    wanted = [column for column in columns if column in set(column_names)]
+
+    column_postings = {}
+    offsets = None
+    if wanted:
+        read_kwargs = {**read_kwargs, 'usecols': wanted, 'dtype': {column: str for column in wanted}}
+        if read is pd.read_csv and reads_in_chunks(file_path):
+            chunks = read(file_path, chunksize=CHUNK_ROWS, **read_kwargs)
+        else:
+            chunks = [read(file_path, **read_kwargs)]
+
+        postings_by_column = {column: {} for column in wanted}
+        row_count = 0
+        for chunk in chunks:
+            for column in wanted:
+                postings = postings_by_column[column]
+                keys = normalize_exact(chunk[column][chunk[column].notna()])
+                for key, positions in keys.index.groupby(keys.values).items():
+                    postings.setdefault(key, []).extend(positions.tolist())
+            row_count += len(chunk)
+
+        column_postings = {column: (postings, row_count) for column, postings in postings_by_column.items()}
+
+        if read is pd.read_csv:
+            offsets = record_offsets(file_path)
+            if len(offsets) - 1 != row_count:
+                offsets = None
+
+    index.save_file(file_path, signature, reader_key, columns, column_postings, indexed_at, offsets)
+    return "indexed"
+
+
+def build_folder_index(index, files, column_names, delimiter=None, progress_callback=None):
+    """Bring the index up to date for files; returns outcome counts and elapsed seconds"""
+    started = time.perf_counter()
+    counts = {"indexed": 0, "current": 0, "skipped": 0, "failed": 0}
+
+    for done, file_path in enumerate(files, 1):
+        try:
+            counts[index_file(index, file_path, column_names, delimiter)] += 1
+        except Exception:
+            counts["failed"] += 1
+        if progress_callback:
+            progress_callback(done, len(files), file_path)
+
+    counts["seconds"] = time.perf_counter() - started
+    return counts
+
+
+# ============================================================================
+# Multi-file scan
+# ============================================================================
+
+class _ProgressRelay:
+    """Stands in for the progress queue when files are searched in the calling process"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def put(self, update):
+        self.callback(*update)
+
+
+def scan_files(files, column_name, search_values, search_mode, delimiter=None,
+               max_workers=DEFAULT_SEARCH_WORKERS, on_file_done=None, index_path=None,
+               on_file_progress=None, control=None, all_sheets=False):
+    """Search files concurrently in worker processes
+
+    on_file_done(file_path, message, done, total, elapsed) is called in the
+    calling thread as each file finishes, in completion order. The returned
+    {file_path: results} dict follows the order of files regardless.
+    on_file_progress(file_path, rows_read, bytes_read, total_bytes) reports
+    progress inside files read in chunks. all_sheets searches every sheet of
+    .xlsx workbooks instead of the first.
+
+    control (a SearchControl) pauses or cancels the scan. Once cancelled,
+    files not yet started are dropped, running workers stop at their next
+    checkpoint and the pool shuts down; the results of files that finished
+    are still returned.
+    """
+    total = len(files)
+    started = time.perf_counter()
+    outcomes = {}
+
+    def finish(file_path, results, message):
+        outcomes[file_path] = results
+        if on_file_done:
+            on_file_done(file_path, message, len(outcomes), total, time.perf_counter() - started)
+
+    def ordered_results():
+        return {file_path: outcomes[file_path] for file_path in files
+                if outcomes.get(file_path) is not None}
+
+    if max_workers <= 1 or total <= 1:
+        progress = _ProgressRelay(on_file_progress) if on_file_progress else None
+        try:
+            for file_path in files:
+                results, message = search_file(file_path, column_name, search_values, search_mode,
+                                               delimiter, index_path, progress, control, all_sheets)
+                finish(file_path, results, message)
+        except SearchCancelled:
+            pass
+        return ordered_results()
+
+    # Only start a manager process when some file will report progress or the scan can be paused
+    manager = None
+    if control is not None or (on_file_progress and any(reads_in_chunks(file_path) for file_path in files)):
+        manager = multiprocessing.Manager()
+    progress = manager.Queue() if manager and on_file_progress else None
+    worker_control = SearchControl(manager.Event(), manager.Event()) if control is not None else None
+    if worker_control is not None:
+        worker_control.resume()
+    worker_state = "running"
+
+    def relay_progress():
+        while True:
+            try:
+                update = progress.get_nowait()
+            except queue.Empty:
+                return
+            on_file_progress(*update)
+
+    def sync_control():
+        # Mirror the caller's token onto the manager events the workers check
+        nonlocal worker_state
+        state = "cancelled" if control.is_cancelled() else "paused" if control.is_paused() else "running"
+        if state != worker_state:
+            getattr(worker_control, {"cancelled": "cancel", "paused": "pause", "running": "resume"}[state])()
+            worker_state = state
+
+    def collect(future, file_path):
+        try:
+            results, message = future.result()
+        except SearchCancelled:
+            return
+        except Exception as e:
+            results, message = None, f"❌ Error reading {target_name(file_path)}: {str(e)}\n"
+        finish(file_path, results, message)
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(max_workers, total)) as executor:
+            futures = {executor.submit(search_file, file_path, column_name, search_values,
+                                       search_mode, delimiter, index_path, progress, worker_control,
+                                       all_sheets): file_path
+                       for file_path in files}
+
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                if progress is not None:
+                    relay_progress()
+                if worker_control is not None:
+                    sync_control()
+
+                for future in done:
+                    collect(future, futures[future])
+
+                if worker_state == "cancelled":
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    for future in pending:
+                        if not future.cancelled():
+                            collect(future, futures[future])
+                    break
+    finally:
+        if manager:
+            manager.shutdown()
+
+    return ordered_results()
@@ -0,0 +1,226 @@
+"""
+Multi-File Search Index
+Persistent inverted index of column values to row positions for repeated folder searches
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from array import array
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".multisearch_index.sqlite")
+LOOKUP_BATCH_SIZE = 500           # Keys per exact-lookup query, below SQLite's variable limit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    reader_key TEXT NOT NULL,
+    columns_json TEXT NOT NULL,
+    record_offsets BLOB,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS indexed_columns (
+    file_id INTEGER NOT NULL,
+    column_name TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (file_id, column_name)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    file_id INTEGER NOT NULL,
+    column_name TEXT NOT NULL,
+    value_key TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (file_id, column_name, value_key)
+) WITHOUT ROWID;
+"""
+
+
+def file_signature(file_path):
+    """(mtime, size) used to tell whether an indexed file has changed"""
+    stat = os.stat(file_path)
+    return stat.st_mtime, stat.st_size
+
+
+def encode_positions(positions):
+    return array('I', positions).tobytes()
+
+
+def decode_positions(blob):
+    positions = array('I')
+    positions.frombytes(blob)
+    return positions.tolist()
+
+
+def decode_offsets(blob):
+    offsets = array('Q')
+    offsets.frombytes(blob)
+    return offsets
+
+
+class SearchIndex:
+    """Per-file column value -> row positions, invalidated by file mtime and size"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            self._restrict_permissions()
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def _restrict_permissions(self):
+        # Postings hold every distinct value of the searched columns (member IDs, names),
+        # so the file is only ever readable by its owner, as the Bill Hunter query cache is.
+        # SQLite gives its journal files the database file's permissions.
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+        os.close(fd)
+        os.chmod(self.path, 0o600)
+
+    def lookup_file(self, file_path, reader_key):
+        """Index entry for an unchanged file, or None when it is missing or stale"""
+        try:
+            mtime, size = file_signature(file_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                entry = conn.execute(
+                    "SELECT id, mtime, size, reader_key, columns_json FROM files WHERE path = ?",
+                    (file_path,)).fetchone()
+                if not entry or entry[1] != mtime or entry[2] != size or entry[3] != reader_key:
+                    return None
+
+                indexed_columns = {column_name for (column_name,) in conn.execute(
+                    "SELECT column_name FROM indexed_columns WHERE file_id = ?", (entry[0],))}
+            finally:
+                conn.close()
+
+        return {
+            'id': entry[0],
+            'columns': json.loads(entry[4]),
+            'indexed_columns': indexed_columns
+        }
+
+    def save_file(self, file_path, signature, reader_key, columns, column_postings, indexed_at,
+                  record_offsets=None):
+        """Replace a file's entry; column_postings is {column: ({value_key: positions}, row_count)}
+
+        record_offsets, for delimited files, holds the byte offset of every
+        data record followed by the end of the file.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM postings WHERE file_id IN (SELECT id FROM files WHERE path = ?)", (file_path,))
+                    conn.execute(
+                        "DELETE FROM indexed_columns WHERE file_id IN (SELECT id FROM files WHERE path = ?)",
+                        (file_path,))
+                    conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+
+                    cursor = conn.execute(
+                        "INSERT INTO files (path, mtime, size, reader_key, columns_json, record_offsets, "
+                        "indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (file_path, signature[0], signature[1], reader_key, json.dumps(columns, default=str),
+                         record_offsets.tobytes() if record_offsets is not None else None, indexed_at))
+                    file_id = cursor.lastrowid
+
+                    for column_name, (postings, row_count) in column_postings.items():
+                        conn.execute(
+                            "INSERT INTO indexed_columns (file_id, column_name, row_count) VALUES (?, ?, ?)",
+                            (file_id, column_name, row_count))
+                        conn.executemany(
+                            "INSERT INTO postings (file_id, column_name, value_key, hits, positions) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            ((file_id, column_name, value_key, len(positions), encode_positions(positions))
+                             for value_key, positions in postings.items()))
+            finally:
+                conn.close()
+
+    def record_offsets(self, file_id):
+        """Byte offsets of a file's data records, or None when they were not stored"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT record_offsets FROM files WHERE id = ?", (file_id,)).fetchone()
+            finally:
+                conn.close()
+
+        return decode_offsets(row[0]) if row and row[0] is not None else None
+
+    def values(self, file_id, column_name):
+        """Every (value_key, hits, positions blob) indexed for a file column"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                return conn.execute(
+                    "SELECT value_key, hits, positions FROM postings WHERE file_id = ? AND column_name = ?",
+                    (file_id, column_name)).fetchall()
+            finally:
+                conn.close()
+
+    def exact_lookup(self, file_id, column_name, value_keys):
+        """{value_key: positions} for the keys present in a file column"""
+        value_keys = list(value_keys)
+        found = {}
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                for start in range(0, len(value_keys), LOOKUP_BATCH_SIZE):
+                    batch = value_keys[start:start + LOOKUP_BATCH_SIZE]
+                    placeholders = ", ".join("?" * len(batch))
+                    for value_key, blob in conn.execute(
+                            "SELECT value_key, positions FROM postings WHERE file_id = ? AND column_name = ? "
+                            f"AND value_key IN ({placeholders})", (file_id, column_name, *batch)):
+                        found[value_key] = decode_positions(blob)
+            finally:
+                conn.close()
+
+        return found
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+                values = conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+            finally:
+                conn.close()
+
+        try:
+            size_bytes = os.path.getsize(self.path)
+        except OSError:
+            size_bytes = 0
+
+        return {'files': files, 'values': values, 'size_bytes': size_bytes}
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM postings")
+                    conn.execute("DELETE FROM indexed_columns")
+                    conn.execute("DELETE FROM files")
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
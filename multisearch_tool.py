@@ -2,9 +2,13 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext
 import pandas as pd
 import os
-import glob
 import threading
-from pathlib import Path
+import time
+from collections import Counter
+
+from multisearch_engine import (list_search_files, scan_files, build_folder_index, export_matches_csv, split_target,
+                                target_name, is_streamed, SearchControl, DEFAULT_SEARCH_WORKERS, MAX_SEARCH_WORKERS)
+from multisearch_index import SearchIndex
 
 class ScrollableFrame(tk.Frame):
     def __init__(self, parent, bg_color='#ffffff', *args, **kwargs):
@@ -215,13 +219,26 @@ class MultiFileColumnSearchTool:
         self.search_column_name = tk.StringVar()
         self.search_delimiter = tk.StringVar(value="auto")
         
+        self.include_subfolders = tk.BooleanVar(value=True)
+        self.search_archives = tk.BooleanVar(value=True)
+        self.include_patterns = tk.StringVar()
+        self.exclude_patterns = tk.StringVar()
+        
         self.csv_enabled = tk.BooleanVar(value=True)
         self.xlsx_enabled = tk.BooleanVar(value=True)
         self.xls_enabled = tk.BooleanVar(value=True)
         self.tsv_enabled = tk.BooleanVar(value=True)
         self.txt_enabled = tk.BooleanVar(value=True)
+        self.search_all_sheets = tk.BooleanVar(value=False)
+        
+        self.search_workers = tk.IntVar(value=DEFAULT_SEARCH_WORKERS)
+        
+        self.search_index = SearchIndex()
+        self.use_search_index = tk.BooleanVar(value=True)
         
         self.search_results = {}
+        self.search_terms = []
+        self.search_control = None
         
         self.build_interface()
         
@@ -444,8 +461,33 @@ class MultiFileColumnSearchTool:
         
         self._add_button_hover(browse_button, self.success_color, '#229954')
         
-        help_text = ("Select the folder containing your data files. All supported file types will be searched recursively.\n"
-                    "The tool will scan through all subdirectories for matching files.")
+        scope_frame = tk.Frame(folder_content, bg=self.frame_bg)
+        scope_frame.pack(anchor="w", pady=(0, 10))
+        
+        tk.Checkbutton(scope_frame, text="Include subfolders", variable=self.include_subfolders,
+                      font=self.label_font, bg=self.frame_bg, fg=self.text_color,
+                      selectcolor=self.frame_bg).pack(side=tk.LEFT)
+        
+        tk.Checkbutton(scope_frame, text="Search inside .zip and .gz archives", variable=self.search_archives,
+                      font=self.label_font, bg=self.frame_bg, fg=self.text_color,
+                      selectcolor=self.frame_bg).pack(side=tk.LEFT, padx=(20, 0))
+        
+        patterns_frame = tk.Frame(folder_content, bg=self.frame_bg)
+        patterns_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        for label_text, variable in (("Include:", self.include_patterns), ("Exclude:", self.exclude_patterns)):
+            tk.Label(patterns_frame, text=label_text, font=self.label_font,
+                    bg=self.frame_bg, fg=self.text_secondary).pack(side=tk.LEFT, padx=(0, 5))
+            pattern_entry_frame = tk.Frame(patterns_frame, bg=self.bg_color, relief='solid', bd=1)
+            pattern_entry_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 15))
+            tk.Entry(pattern_entry_frame, textvariable=variable, font=self.text_font,
+                    bg=self.bg_color, fg=self.text_color, relief='flat', bd=0).pack(fill=tk.X, padx=10, pady=8)
+        
+        help_text = ("Select the folder containing your data files. With 'Include subfolders', all supported file types "
+                    "are searched recursively (e.g. year/month folders).\n"
+                    "Archives are read without extracting: .csv.gz/.txt.gz/... files and matching files inside .zip archives.\n"
+                    "Include/Exclude take glob patterns separated by ';', matched against the path inside the folder or "
+                    "the file name, e.g. 2024/*;*.csv or */tmp/*;*_old.*")
         help_label = tk.Label(folder_content, text=help_text, font=("Segoe UI", 9), 
                              fg="#7f8c8d", bg=self.frame_bg, justify=tk.LEFT, wraplength=900)
         help_label.pack(anchor="w")
@@ -540,13 +582,18 @@ class MultiFileColumnSearchTool:
                       value="any", font=self.label_font, bg=self.frame_bg, fg=self.text_color).pack(side=tk.LEFT, padx=(10, 0))
         tk.Radiobutton(options_frame, text="Find ALL matches", variable=self.search_mode_var, 
                       value="all", font=self.label_font, bg=self.frame_bg, fg=self.text_color).pack(side=tk.LEFT, padx=(10, 0))
+        tk.Radiobutton(options_frame, text="EXACT value (IDs)", variable=self.search_mode_var, 
+                      value="exact", font=self.label_font, bg=self.frame_bg, fg=self.text_color).pack(side=tk.LEFT, padx=(10, 0))
         
         help_text = ("Tips:\n"
                     "• Type each search term on a separate line\n"
                     "• Use 'Load from File' to import terms from a .txt or .csv file\n"
-                    "• Search is case-insensitive and finds partial matches\n"
+                    "• Search is case-insensitive and finds partial matches in each value as written in the file, "
+                    "trimmed of surrounding spaces (so 123 is never read as 123.0), with or without the folder index\n"
                     "• 'ANY match': Returns rows containing at least one search term\n"
-                    "• 'ALL matches': Returns only rows containing every search term")
+                    "• 'ALL matches': Returns only rows containing every search term\n"
+                    "• 'EXACT value': Returns rows whose value equals a search term (ignoring case and spaces) - "
+                    "fastest for long ID lists")
         help_label = tk.Label(values_content, text=help_text, font=("Segoe UI", 9), 
                              fg="#7f8c8d", bg=self.frame_bg, justify=tk.LEFT, wraplength=900)
         help_label.pack(anchor="w")
@@ -579,8 +626,51 @@ class MultiFileColumnSearchTool:
         tk.Label(delimiter_frame, text=" (for .txt and .tsv files)", font=('Segoe UI', 9), 
                 foreground='#7f8c8d', bg=self.frame_bg).pack(side=tk.LEFT, padx=(5, 0))
         
+        workers_frame = tk.Frame(settings_content, bg=self.frame_bg)
+        workers_frame.pack(anchor="w", pady=(0, 15))
+        
+        tk.Label(workers_frame, text="Parallel workers:", font=self.label_font,
+                bg=self.frame_bg, fg=self.text_secondary).pack(side=tk.LEFT)
+        
+        tk.Spinbox(workers_frame, from_=1, to=MAX_SEARCH_WORKERS, textvariable=self.search_workers,
+                  width=5, font=self.label_font).pack(side=tk.LEFT, padx=(10, 0))
+        
+        tk.Label(workers_frame, text=" (files searched at the same time)", font=('Segoe UI', 9), 
+                foreground='#7f8c8d', bg=self.frame_bg).pack(side=tk.LEFT, padx=(5, 0))
+        
+        tk.Checkbutton(settings_content, text="Search all sheets in Excel workbooks (.xlsx)",
+                      variable=self.search_all_sheets, font=self.label_font, bg=self.frame_bg, fg=self.text_color,
+                      selectcolor=self.frame_bg).pack(anchor="w", pady=(0, 15))
+        
+        index_frame = tk.Frame(settings_content, bg=self.frame_bg)
+        index_frame.pack(anchor="w", pady=(0, 5))
+        
+        tk.Checkbutton(index_frame, text="Use folder index for unchanged files", variable=self.use_search_index,
+                      font=self.label_font, bg=self.frame_bg, fg=self.text_color,
+                      selectcolor=self.frame_bg).pack(side=tk.LEFT)
+        
+        self.build_index_button = tk.Button(index_frame, text="🗂️ Build Index", command=self.build_search_index,
+                                            padx=self.button_padx, pady=self.button_pady, font=('Segoe UI', 9),
+                                            bg=self.primary_color, fg=self.button_text_color, relief='flat', bd=0, cursor="hand2")
+        self.build_index_button.pack(side=tk.LEFT, padx=(10, 0))
+        
+        clear_index_button = tk.Button(index_frame, text="Clear Index", command=self.clear_search_index,
+                                       padx=self.button_padx, pady=self.button_pady, font=('Segoe UI', 9),
+                                       bg='#95a5a6', fg=self.button_text_color, relief='flat', bd=0, cursor="hand2")
+        clear_index_button.pack(side=tk.LEFT, padx=(10, 0))
+        
+        self._add_button_hover(self.build_index_button, self.primary_color, '#2980b9')
+        self._add_button_hover(clear_index_button, '#95a5a6', '#7f8c8d')
+        
+        self.index_status_label = tk.Label(settings_content, text=self.format_index_stats(),
+                                           font=('Segoe UI', 9), foreground='#7f8c8d', bg=self.frame_bg)
+        self.index_status_label.pack(anchor="w", pady=(0, 15))
+        
         help_text = ("'Auto' will try common delimiters automatically. Choose a specific delimiter if auto-detection fails.\n"
-                    "Excel files (.xlsx/.xls) don't require delimiter settings.")
+                    "Excel files (.xlsx/.xls) don't require delimiter settings. Only the first sheet is searched "
+                    "unless all sheets are selected; results then show each row's sheet in Source_Sheet.\n"
+                    "Build Index records the Step 2 column of every CSV/TSV/Excel file in the folder. Later searches of "
+                    "that column read only the matching rows of files that have not changed since.")
         help_label = tk.Label(settings_content, text=help_text, font=("Segoe UI", 9), 
                              fg="#7f8c8d", bg=self.frame_bg, justify=tk.LEFT, wraplength=900)
         help_label.pack(anchor="w")
@@ -608,6 +698,16 @@ class MultiFileColumnSearchTool:
                                       bg=self.success_color, fg=self.button_text_color, relief='flat', bd=0, cursor="hand2")
         self.search_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        self.pause_button = tk.Button(buttons_frame, text="⏸ Pause", command=self.toggle_search_pause, state='disabled',
+                                     padx=self.button_padx, pady=self.button_pady, font=('Segoe UI', 9),
+                                     bg=self.warning_color, fg=self.button_text_color, relief='flat', bd=0, cursor="hand2")
+        self.pause_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.cancel_button = tk.Button(buttons_frame, text="⏹ Cancel", command=self.cancel_search, state='disabled',
+                                      padx=self.button_padx, pady=self.button_pady, font=('Segoe UI', 9),
+                                      bg=self.danger_color, fg=self.button_text_color, relief='flat', bd=0, cursor="hand2")
+        self.cancel_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         self.export_csv_button = tk.Button(buttons_frame, text="📊 Export Results to CSV", 
                                           command=self.export_search_results_csv, state='disabled',
                                           padx=self.button_padx, pady=self.button_pady, font=('Segoe UI', 9),
@@ -615,6 +715,8 @@ class MultiFileColumnSearchTool:
         self.export_csv_button.pack(side=tk.LEFT)
         
         self._add_button_hover(self.search_button, self.success_color, '#229954')
+        self._add_button_hover(self.pause_button, self.warning_color, '#d68910')
+        self._add_button_hover(self.cancel_button, self.danger_color, '#c0392b')
         self._add_button_hover(self.export_csv_button, self.primary_color, '#2980b9')
         
         status_frame = tk.Frame(action_content, bg=self.bg_color, relief='solid', bd=1)
@@ -629,7 +731,9 @@ class MultiFileColumnSearchTool:
         self.export_status_label.pack(pady=(0, 10), padx=15, anchor="w")
         
         help_text = ("The search will process all files in the selected folder recursively. "
-                    "Results include source file information and can be exported to CSV for further analysis.")
+                    "Results include source file information and can be exported to CSV for further analysis.\n"
+                    "Pause holds the search between files (and between chunks of large files); Cancel stops it and "
+                    "keeps the results of the files already searched, which can still be exported.")
         help_label = tk.Label(action_content, text=help_text, font=("Segoe UI", 9), 
                              fg="#7f8c8d", bg=self.frame_bg, justify=tk.LEFT, wraplength=900)
         help_label.pack(anchor="w")
@@ -723,6 +827,70 @@ class MultiFileColumnSearchTool:
         values = [line.strip() for line in content.split('\n') if line.strip()]
         return values
 
+    def format_index_stats(self, build_stats=None):
+        if not os.path.exists(self.search_index.path):
+            return "Index: not built yet"
+        
+        try:
+            stats = self.search_index.stats()
+        except Exception:
+            return "Index unavailable"
+        
+        text = f"Index: {stats['files']} files, {stats['values']:,} values, {stats['size_bytes'] / (1024 * 1024):.1f} MB"
+        if build_stats:
+            text = (f"Built in {build_stats['seconds']:.1f}s ({build_stats['indexed']} indexed, "
+                    f"{build_stats['current']} unchanged, {build_stats['failed']} failed) • " + text)
+        return text
+
+    def build_search_index(self):
+        folder_path = self.search_folder_path.get()
+        column_name = self.search_column_name.get().strip()
+        
+        if not folder_path or not os.path.exists(folder_path):
+            messagebox.showerror("Validation Error", "Please select a folder to index.")
+            return
+        
+        if not column_name:
+            messagebox.showerror("Validation Error", "Please enter the column name to index.")
+            return
+        
+        files = list_search_files(folder_path, self.get_enabled_search_extensions(), **self.get_search_scope())
+        delimiter = self.get_selected_search_delimiter()
+        
+        self.build_index_button.config(state='disabled')
+        self.index_status_label.config(text=f"Indexing {len(files)} files...")
+        
+        index_thread = threading.Thread(target=self._run_index_build, args=(files, column_name, delimiter))
+        index_thread.daemon = True
+        index_thread.start()
+
+    def _run_index_build(self, files, column_name, delimiter):
+        def on_progress(done, total, file_path):
+            status = f"Indexing {done}/{total}: {target_name(file_path)}"
+            self.root.after(0, lambda s=status: self.index_status_label.config(text=s))
+        
+        try:
+            build_stats = build_folder_index(self.search_index, files, [column_name], delimiter, on_progress)
+            self.root.after(0, self._on_index_built, build_stats, None)
+        except Exception as e:
+            self.root.after(0, self._on_index_built, None, e)
+
+    def _on_index_built(self, build_stats, error):
+        self.build_index_button.config(state='normal')
+        if error:
+            self.index_status_label.config(text="Index build failed!")
+            messagebox.showerror("Index Error", f"Failed to build index: {str(error)}")
+            return
+        self.index_status_label.config(text=self.format_index_stats(build_stats))
+
+    def clear_search_index(self):
+        try:
+            self.search_index.clear()
+        except Exception as e:
+            messagebox.showerror("Index Error", f"Failed to clear index: {str(e)}")
+            return
+        self.index_status_label.config(text=self.format_index_stats())
+
     def browse_search_folder(self):
         folder = filedialog.askdirectory(title="Select folder to search")
         if folder:
@@ -739,9 +907,26 @@ class MultiFileColumnSearchTool:
         }
         return delimiter_map.get(self.search_delimiter.get(), None)
 
+    def get_search_worker_count(self):
+        try:
+            return max(1, min(MAX_SEARCH_WORKERS, int(self.search_workers.get())))
+        except (tk.TclError, ValueError):
+            return DEFAULT_SEARCH_WORKERS
+
     def get_enabled_search_extensions(self):
         return ['csv', 'xlsx', 'xls', 'tsv', 'txt']
 
+    def get_search_scope(self):
+        def patterns(variable):
+            return [pattern.strip() for pattern in variable.get().split(';') if pattern.strip()]
+        
+        return {
+            'recursive': self.include_subfolders.get(),
+            'include': patterns(self.include_patterns),
+            'exclude': patterns(self.exclude_patterns),
+            'archives': self.search_archives.get()
+        }
+
     def validate_search_inputs(self):
         if not self.search_folder_path.get():
             messagebox.showerror("Validation Error", "Please select a folder to search.")
@@ -766,8 +951,11 @@ class MultiFileColumnSearchTool:
         if not self.validate_search_inputs():
             return
         
+        self.search_control = SearchControl()
         self.search_button.config(state='disabled')
         self.export_csv_button.config(state='disabled')
+        self.pause_button.config(state='normal', text="⏸ Pause")
+        self.cancel_button.config(state='normal')
         self.search_progress['value'] = 0
         self.search_progress_label.config(text="Initializing search...")
         self.search_results_text.delete(1.0, tk.END)
@@ -777,6 +965,33 @@ class MultiFileColumnSearchTool:
         search_thread.daemon = True
         search_thread.start()
 
+    def toggle_search_pause(self):
+        if not self.search_control:
+            return
+        
+        if self.search_control.is_paused():
+            self.search_control.resume()
+            self.pause_button.config(text="⏸ Pause")
+            self.search_progress_label.config(text="Resuming search...")
+        else:
+            self.search_control.pause()
+            self.pause_button.config(text="▶ Resume")
+            self.search_progress_label.config(text="Paused - files in progress stop at their next checkpoint")
+
+    def cancel_search(self):
+        if not self.search_control:
+            return
+        
+        self.search_control.cancel()
+        self.pause_button.config(state='disabled', text="⏸ Pause")
+        self.cancel_button.config(state='disabled')
+        self.search_progress_label.config(text="Cancelling search...")
+
+    def _end_search_controls(self):
+        self.search_button.config(state='normal')
+        self.pause_button.config(state='disabled', text="⏸ Pause")
+        self.cancel_button.config(state='disabled')
+
     def perform_column_search(self):
         try:
             folder_path = self.search_folder_path.get()
@@ -790,6 +1005,7 @@ class MultiFileColumnSearchTool:
             )
             
             self.search_results = results
+            self.search_terms = search_values
             
             self.root.after(0, self.display_column_search_results)
             
@@ -797,246 +1013,85 @@ class MultiFileColumnSearchTool:
             self.root.after(0, lambda: self.display_column_search_error(str(e)))
 
     def search_files_for_multiple_entries(self, folder_path, column_name, search_values, search_mode, file_extensions):
-        results = {}
-        
-        all_files = []
-        for ext in file_extensions:
-            pattern = os.path.join(folder_path, f"*.{ext}")
-            all_files.extend(glob.glob(pattern))
+        all_files = list_search_files(folder_path, file_extensions, **self.get_search_scope())
         
         if not all_files:
             self.root.after(0, lambda: self.update_search_results_text(
                 f"No files found with extensions {file_extensions} in {folder_path}\n"))
             self.root.after(0, lambda: self.update_search_progress(0, 0, "No files found"))
-            return results
+            return {}
         
         total_files = len(all_files)
+        max_workers = self.get_search_worker_count()
         search_summary = f"Searching {total_files} files for {len(search_values)} values in column '{column_name}' (Mode: {search_mode.upper()})"
         self.root.after(0, lambda: self.update_search_results_text(f"{search_summary}\n"))
         self.root.after(0, lambda: self.update_search_results_text(f"Search values: {', '.join(search_values[:5])}" + 
                                                                     (f"... and {len(search_values)-5} more" if len(search_values) > 5 else "") + "\n"))
+        self.root.after(0, lambda: self.update_search_results_text(f"Parallel workers: {max_workers}\n"))
+        
+        archive_members = Counter(split_target(file_path)[0] for file_path in all_files
+                                  if split_target(file_path)[1] is not None)
+        archive_members_done = Counter()
+        compressed_files = sum(1 for file_path in all_files if is_streamed(file_path))
+        if compressed_files:
+            compressed_summary = f"Compressed files: {compressed_files}"
+            if archive_members:
+                compressed_summary += f" ({sum(archive_members.values())} inside {len(archive_members)} .zip archives)"
+            self.root.after(0, lambda: self.update_search_results_text(f"{compressed_summary}\n"))
         self.root.after(0, lambda: self.update_search_results_text("-" * 80 + "\n"))
         
-        for i, file_path in enumerate(all_files):
-            current_file = i + 1
-            progress_percent = (current_file / total_files) * 100
+        files_done = [0]
+        
+        def on_file_done(file_path, message, done, total, elapsed):
+            files_done[0] = done
+            rate = done / elapsed if elapsed > 0 else 0
+            status = f"Processed {done}/{total} files ({rate:.1f} files/s): {target_name(file_path)}"
+            msg = f"[{done}/{total}] {target_name(file_path)}\n{message}"
             
-            self.root.after(0, lambda p=progress_percent, c=current_file, t=total_files, f=os.path.basename(file_path): 
-                        self.update_search_progress(p, c, f"Processing {c}/{t}: {f}"))
+            archive_path, member = split_target(file_path)
+            if member is not None:
+                archive_members_done[archive_path] += 1
+                members_done, members_total = archive_members_done[archive_path], archive_members[archive_path]
+                status += f" • {os.path.basename(archive_path)}: {members_done}/{members_total} members"
+                if members_done == members_total:
+                    msg += f"📦 Finished {os.path.basename(archive_path)} ({members_total} members searched)\n"
             
-            try:
-                progress_msg = f"[{current_file}/{total_files}] Processing: {os.path.basename(file_path)}\n"
-                self.root.after(0, lambda msg=progress_msg: self.update_search_results_text(msg))
-                
-                file_ext = Path(file_path).suffix.lower()
-                df = None
-                
-                if file_ext == '.csv':
-                    df = pd.read_csv(file_path)
-                elif file_ext in ['.xlsx', '.xls']:
-                    df = pd.read_excel(file_path)
-                elif file_ext == '.tsv':
-                    selected_delimiter = self.get_selected_search_delimiter()
-                    if selected_delimiter:
-                        df = pd.read_csv(file_path, sep=selected_delimiter)
-                    else:
-                        df = pd.read_csv(file_path, sep='\t') 
-                elif file_ext == '.txt':
-                    df = self.handle_search_txt_file_multiple(file_path, column_name, search_values)
-                    if df is None:
-                        continue
-                else:
-                    continue
-                
-                if df is None:
-                    continue
-                
-                if file_ext == '.txt' and isinstance(df, dict):
-                    matches = df
-                    if matches['found']:
-                        text_results = matches['content'].copy()
-                        text_results.insert(0, 'Source_File_Name', os.path.basename(file_path))
-                        text_results.insert(1, 'Source_File_Path', file_path)
-                        text_results.insert(2, 'Matched_Search_Terms', matches['matched_terms'])
-                        text_results.insert(3, 'Match_Type', 'Text_Search')
-                        
-                        results[file_path] = text_results
-                        msg = f"✅ Found {matches['total_matches']} line(s) matching search terms in {os.path.basename(file_path)}\n"
-                        msg += f"   Matched terms: {', '.join(matches['matched_terms'])}\n"
-                        
-                        for j, line in enumerate(matches['lines'][:3]):
-                            msg += f"   Line {line['number']}: {line['text'][:100]}...\n"
-                        
-                        if len(matches['lines']) > 3:
-                            msg += f"   ... and {len(matches['lines']) - 3} more matches\n"
-                        
-                        self.root.after(0, lambda m=msg: self.update_search_results_text(m))
-                    else:
-                        msg = f"❌ No matches found in {os.path.basename(file_path)}\n"
-                        self.root.after(0, lambda m=msg: self.update_search_results_text(m))
-                    continue
-                
-                if column_name not in df.columns:
-                    msg = f"⚠️  Column '{column_name}' not found in {os.path.basename(file_path)}\n"
-                    msg += f"   Available columns: {list(df.columns)}\n"
-                    self.root.after(0, lambda m=msg: self.update_search_results_text(m))
-                    continue
-                
-                matching_rows, matched_terms = self.find_multiple_matches(df, column_name, search_values, search_mode)
-                
-                if not matching_rows.empty:
-                    matching_rows_with_source = matching_rows.copy()
-                    matching_rows_with_source.insert(0, 'Source_File_Name', os.path.basename(file_path))
-                    matching_rows_with_source.insert(1, 'Source_File_Path', file_path)
-                    matching_rows_with_source.insert(2, 'Matched_Column', column_name)
-                    matching_rows_with_source.insert(3, 'Matched_Value', matching_rows_with_source[column_name])
-                    matching_rows_with_source.insert(4, 'Search_Terms_Used', ', '.join(search_values))
-                    matching_rows_with_source.insert(5, 'Matched_Terms', ', '.join(matched_terms))
-                    
-                    results[file_path] = matching_rows_with_source
-                    msg = f"✅ Found {len(matching_rows)} match(es) in {os.path.basename(file_path)}\n"
-                    msg += f"   Matched search terms: {', '.join(matched_terms)}\n"
-                    
-                    term_summary = {}
-                    for term in matched_terms:
-                        term_matches = df[df[column_name].astype(str).str.contains(str(term), case=False, na=False)]
-                        term_summary[term] = len(term_matches)
-                    
-                    for term, count in term_summary.items():
-                        msg += f"     '{term}': {count} match(es)\n"
-                    
-                    for idx, row in matching_rows.head(3).iterrows():
-                        context_info = f"{row[column_name]}"
-                        other_cols = [col for col in df.columns if col != column_name][:2]
-                        for col in other_cols:
-                            context_info += f" | {col}: {str(row[col])[:30]}"
-                        msg += f"   Row {idx}: {context_info}\n"
-                    
-                    if len(matching_rows) > 3:
-                        msg += f"   ... and {len(matching_rows) - 3} more matches\n"
-                    
-                    self.root.after(0, lambda m=msg: self.update_search_results_text(m))
-                else:
-                    msg = f"❌ No matches found in {os.path.basename(file_path)}\n"
-                    self.root.after(0, lambda m=msg: self.update_search_results_text(m))
-                    
-            except Exception as e:
-                msg = f"❌ Error reading {os.path.basename(file_path)}: {str(e)}\n"
-                self.root.after(0, lambda m=msg: self.update_search_results_text(m))
+            if self.search_control.is_paused():
+                status += " • paused"
+            
+            self.root.after(0, lambda p=(done / total) * 100, c=done, s=status: self.update_search_progress(p, c, s))
+            self.root.after(0, lambda m=msg: self.update_search_results_text(m))
+        
+        def on_file_progress(file_path, rows_read, bytes_read, total_bytes):
+            action = "Decompressing" if is_streamed(file_path) else "Reading"
+            status = (f"{action} {target_name(file_path)} in chunks: {rows_read:,} rows "
+                      f"({bytes_read / max(total_bytes, 1):.0%} of {total_bytes / (1024 * 1024):,.0f} MB)")
+            self.root.after(0, lambda s=status: self.search_progress_label.config(text=s))
+        
+        started = time.perf_counter()
+        results = scan_files(all_files, column_name, search_values, search_mode,
+                             delimiter=self.get_selected_search_delimiter(),
+                             max_workers=max_workers, on_file_done=on_file_done,
+                             index_path=self.search_index.path if self.use_search_index.get() else None,
+                             on_file_progress=on_file_progress, control=self.search_control,
+                             all_sheets=self.search_all_sheets.get())
+        elapsed = time.perf_counter() - started
+        
+        if self.search_control.is_cancelled():
+            self.root.after(0, lambda: self.update_search_progress(
+                (files_done[0] / total_files) * 100, files_done[0],
+                f"Cancelled after {files_done[0]}/{total_files} files in {elapsed:.1f}s"))
+            self.root.after(0, lambda: self.update_search_results_text(
+                f"\n⏹ Search cancelled after {files_done[0]} of {total_files} files. "
+                f"Results from those files are kept.\n"))
+            return results
         
-        self.root.after(0, lambda: self.update_search_progress(100, total_files, f"Completed searching {total_files} files"))
+        self.root.after(0, lambda: self.update_search_progress(
+            100, total_files, f"Completed searching {total_files} files in {elapsed:.1f}s "
+                              f"({total_files / max(elapsed, 0.001):.1f} files/s)"))
         
         return results
 
-    def find_multiple_matches(self, df, column_name, search_values, search_mode):
-        all_matches = pd.DataFrame()
-        matched_terms = set()
-        
-        for search_value in search_values:
-            mask = df[column_name].astype(str).str.contains(str(search_value), case=False, na=False)
-            value_matches = df[mask]
-            
-            if not value_matches.empty:
-                matched_terms.add(search_value)
-                if search_mode == "any":
-                    all_matches = pd.concat([all_matches, value_matches]).drop_duplicates()
-                elif search_mode == "all":
-                    if all_matches.empty:
-                        all_matches = value_matches
-                    else:
-                        all_matches = all_matches[all_matches.index.isin(value_matches.index)]
-        
-        return all_matches, list(matched_terms)
-
-    def handle_search_txt_file_multiple(self, file_path, column_name, search_values):
-        try:
-            selected_delimiter = self.get_selected_search_delimiter()
-            
-            if selected_delimiter is None:
-                delimiters = ['\t', '|', ',', ';', ' ']
-            else:
-                delimiters = [selected_delimiter]
-            
-            for delimiter in delimiters:
-                try:
-                    df = pd.read_csv(file_path, sep=delimiter, encoding='utf-8')
-                    if len(df.columns) > 1 and not all(col.startswith('Unnamed') for col in df.columns):
-                        return df
-                except:
-                    continue
-            
-            return self.search_plain_text_file_multiple(file_path, search_values)
-            
-        except Exception as e:
-            try:
-                return self.search_plain_text_file_multiple(file_path, search_values, encoding='latin-1')
-            except:
-                return None
-
-    def search_plain_text_file_multiple(self, file_path, search_values, encoding='utf-8'):
-        try:
-            with open(file_path, 'r', encoding=encoding) as file:
-                lines = file.readlines()
-            
-            matching_lines = []
-            matched_terms = set()
-            case_sensitive = False
-            exact_match = False
-            
-            for line_num, line in enumerate(lines, 1):
-                line_content = line.strip()
-                search_line = line_content if case_sensitive else line_content.lower()
-                
-                line_matches = []
-                for search_value in search_values:
-                    search_val = search_value if case_sensitive else search_value.lower()
-                    
-                    found = False
-                    if exact_match:
-                        found = search_val == search_line
-                    else:
-                        found = search_val in search_line
-                    
-                    if found:
-                        line_matches.append(search_value)
-                        matched_terms.add(search_value)
-                
-                if line_matches:
-                    matching_lines.append({
-                        'number': line_num,
-                        'text': line_content,
-                        'matched_terms': line_matches
-                    })
-            
-            if matching_lines:
-                df_data = []
-                for match in matching_lines:
-                    df_data.append({
-                        'Line_Number': match['number'],
-                        'Content': match['text'],
-                        'Matched_Terms': ', '.join(match['matched_terms'])
-                    })
-                df = pd.DataFrame(df_data)
-                
-                return {
-                    'found': True,
-                    'total_matches': len(matching_lines),
-                    'matched_terms': list(matched_terms),
-                    'lines': matching_lines,
-                    'content': df
-                }
-            else:
-                return {
-                    'found': False,
-                    'total_matches': 0,
-                    'matched_terms': [],
-                    'lines': [],
-                    'content': pd.DataFrame()
-                }
-                
-        except Exception as e:
-            return None
-
     def update_search_results_text(self, text):
         self.search_results_text.insert(tk.END, text)
         self.search_results_text.see(tk.END)
@@ -1048,29 +1103,27 @@ class MultiFileColumnSearchTool:
         self.root.update_idletasks()
 
     def display_column_search_results(self):
-        self.search_progress['value'] = 100
-        self.search_progress_label.config(text="Search completed!")
-        self.search_button.config(state='normal')
+        cancelled = self.search_control is not None and self.search_control.is_cancelled()
+        if not cancelled:
+            self.search_progress['value'] = 100
+            self.search_progress_label.config(text="Search completed!")
+        self._end_search_controls()
         
         self.update_search_results_text("\n" + "=" * 80 + "\n")
-        self.update_search_results_text("SEARCH SUMMARY\n")
+        self.update_search_results_text("SEARCH SUMMARY (PARTIAL - CANCELLED)\n" if cancelled else "SEARCH SUMMARY\n")
         self.update_search_results_text("=" * 80 + "\n")
         
         if self.search_results:
-            total_matches = sum(len(df) if isinstance(df, pd.DataFrame) else 0 for df in self.search_results.values())
-            search_values = self.get_search_values_from_text()
+            total_matches = sum(len(matches) for matches in self.search_results.values())
+            search_values = self.search_terms
             
             self.update_search_results_text(f"Search terms used: {len(search_values)}\n")
             self.update_search_results_text(f"Total matches found: {total_matches}\n")
             self.update_search_results_text(f"Files with matches: {len(self.search_results)}\n")
             
             all_matched_terms = set()
-            for result in self.search_results.values():
-                if isinstance(result, pd.DataFrame) and 'Matched_Terms' in result.columns:
-                    for matched_terms_str in result['Matched_Terms'].dropna():
-                        if matched_terms_str:
-                            terms = [term.strip() for term in str(matched_terms_str).split(',')]
-                            all_matched_terms.update(terms)
+            for matches in self.search_results.values():
+                all_matched_terms.update(matches.matched_terms(search_values))
             
             if all_matched_terms:
                 self.update_search_results_text(f"Unique terms with matches: {len(all_matched_terms)}\n")
@@ -1107,33 +1160,49 @@ class MultiFileColumnSearchTool:
         if not file_path:
             return
         
+        self.export_csv_button.config(state='disabled')
+        self.search_button.config(state='disabled')
+        self.export_status_label.config(text="Exporting results...", foreground="#7f8c8d")
+        
+        export_thread = threading.Thread(target=self._run_export,
+                                         args=(list(self.search_results.values()), self.search_terms, file_path))
+        export_thread.daemon = True
+        export_thread.start()
+
+    def _run_export(self, results, search_values, file_path):
+        def on_progress(done, total, source_file):
+            status = f"Exporting {done}/{total} files: {target_name(source_file)}"
+            self.root.after(0, lambda s=status: self.export_status_label.config(text=s))
+        
         try:
-            all_results = []
-            
-            for source_file, df in self.search_results.items():
-                if isinstance(df, pd.DataFrame) and not df.empty:
-                    all_results.append(df)
-            
-            if all_results:
-                combined_df = pd.concat(all_results, ignore_index=True)
-                combined_df.to_csv(file_path, index=False)
-                
-                search_values = self.get_search_values_from_text()
-                messagebox.showinfo("Export Successful", 
-                                   f"✅ Exported {len(combined_df):,} results to CSV!\n\n"
-                                   f"📊 Export Summary:\n"
-                                   f"• Total rows exported: {len(combined_df):,}\n"
-                                   f"• Files processed: {len(self.search_results)}\n"
-                                   f"• Search terms used: {len(search_values)}\n"
-                                   f"• Saved to: {os.path.basename(file_path)}")
-            
+            rows_written = export_matches_csv(results, search_values, file_path, on_progress)
+            self.root.after(0, self._on_export_done, file_path, len(results), len(search_values), rows_written, None)
         except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export results: {str(e)}")
+            self.root.after(0, self._on_export_done, file_path, len(results), len(search_values), 0, e)
+
+    def _on_export_done(self, file_path, file_count, term_count, rows_written, error):
+        self.export_csv_button.config(state='normal')
+        self.search_button.config(state='normal')
+        
+        if error:
+            self.export_status_label.config(text="✗ Export failed", foreground=self.danger_color)
+            messagebox.showerror("Export Error", f"Failed to export results: {str(error)}")
+            return
+        
+        self.export_status_label.config(text=f"✓ Exported {rows_written:,} results to {os.path.basename(file_path)}",
+                                        foreground=self.success_color)
+        messagebox.showinfo("Export Successful", 
+                           f"✅ Exported {rows_written:,} results to CSV!\n\n"
+                           f"📊 Export Summary:\n"
+                           f"• Total rows exported: {rows_written:,}\n"
+                           f"• Files processed: {file_count}\n"
+                           f"• Search terms used: {term_count}\n"
+                           f"• Saved to: {os.path.basename(file_path)}")
 
     def display_column_search_error(self, error_msg):
         self.search_progress['value'] = 0
         self.search_progress_label.config(text="Search failed!")
-        self.search_button.config(state='normal')
+        self._end_search_controls()
         messagebox.showerror("Search Error", f"Search failed: {error_msg}")
 
 
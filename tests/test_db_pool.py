@@ -0,0 +1,202 @@
+"""
+Tests for the shared PostgreSQL connection pool, run against an in-memory stand-in for psycopg2
+"""
+
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+import db_pool
+from db_pool import PoolExhaustedError, PostgresConnectionPool
+
+TRANSACTION_STATUS_IDLE = 0
+TRANSACTION_STATUS_INTRANS = 2
+
+PARAMS = {'host': 'db.example', 'port': '5432', 'database': 'app', 'user': 'tester', 'password': 'secret'}
+
+
+class FakeOperationalError(Exception):
+    pass
+
+
+class FakeInterfaceError(Exception):
+    pass
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query):
+        if self.conn.broken:
+            raise FakeOperationalError("server closed the connection unexpectedly")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.transaction_status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.transaction_status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = 1
+
+
+class PoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.connections = []
+
+        def connect(**kwargs):
+            conn = FakeConnection()
+            self.connections.append(conn)
+            return conn
+
+        fake_psycopg2 = types.SimpleNamespace(
+            connect=connect,
+            extensions=types.SimpleNamespace(TRANSACTION_STATUS_IDLE=TRANSACTION_STATUS_IDLE),
+            OperationalError=FakeOperationalError,
+            InterfaceError=FakeInterfaceError
+        )
+        patchers = [mock.patch.object(db_pool, 'psycopg2', fake_psycopg2, create=True),
+                    mock.patch.object(db_pool, 'PSYCOPG2_AVAILABLE', True)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.pool = PostgresConnectionPool(max_connections=2, idle_timeout=60)
+        self.addCleanup(self.pool.closeall)
+
+
+class MaxConnectionsTest(PoolTestCase):
+
+    def test_checkout_blocks_until_a_connection_is_returned(self):
+        first = self.pool.getconn(**PARAMS)
+        self.pool.getconn(**PARAMS)
+        checked_out = []
+
+        waiter = threading.Thread(target=lambda: checked_out.append(self.pool.getconn(**PARAMS)))
+        waiter.start()
+        waiter.join(0.2)
+        self.assertTrue(waiter.is_alive(), "third checkout should wait while both connections are busy")
+
+        self.pool.putconn(first)
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertIs(checked_out[0], first)
+        self.assertEqual(len(self.connections), 2)
+        self.assertEqual(self.pool.status()['reused'], 1)
+
+    def test_checkout_times_out_when_pool_stays_full(self):
+        self.pool.getconn(**PARAMS)
+        self.pool.getconn(**PARAMS)
+
+        with self.assertRaises(PoolExhaustedError):
+            self.pool.getconn(checkout_timeout=0.1, **PARAMS)
+        self.assertEqual(self.pool.status()['in_use'], 2)
+
+    def test_limit_is_per_server_and_user(self):
+        self.pool.getconn(**PARAMS)
+        self.pool.getconn(**PARAMS)
+
+        other_user = self.pool.getconn(**{**PARAMS, 'user': 'someone_else'})
+        self.assertIsNotNone(other_user)
+        self.assertEqual(self.pool.status()['in_use'], 3)
+
+
+class IdleEvictionTest(PoolTestCase):
+
+    def test_idle_connections_past_timeout_are_closed(self):
+        conn = self.pool.getconn(**PARAMS)
+        self.pool.putconn(conn)
+
+        self.assertEqual(self.pool.close_idle(max_age=self.pool.idle_timeout), 0)
+        self.assertFalse(conn.closed)
+
+        later = time.monotonic() + self.pool.idle_timeout + 1
+        with mock.patch.object(db_pool.time, 'monotonic', return_value=later):
+            self.assertEqual(self.pool.close_idle(max_age=self.pool.idle_timeout), 1)
+
+        self.assertTrue(conn.closed)
+        status = self.pool.status()
+        self.assertEqual((status['idle'], status['expired']), (0, 1))
+
+    def test_dead_idle_connection_is_replaced_on_checkout(self):
+        conn = self.pool.getconn(**PARAMS)
+        self.pool.putconn(conn)
+        conn.broken = True
+
+        replacement = self.pool.getconn(**PARAMS)
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.status()['discarded'], 1)
+
+    def test_changed_password_drops_idle_connections(self):
+        conn = self.pool.getconn(**PARAMS)
+        self.pool.putconn(conn)
+
+        replacement = self.pool.getconn(**{**PARAMS, 'password': 'rotated'})
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+
+
+class ReleaseOnErrorTest(PoolTestCase):
+
+    def test_query_error_returns_connection_rolled_back(self):
+        with self.assertRaises(ValueError):
+            with self.pool.connection(**PARAMS) as conn:
+                conn.transaction_status = TRANSACTION_STATUS_INTRANS
+                raise ValueError("bad row")
+
+        self.assertFalse(conn.closed)
+        self.assertEqual(conn.rollbacks, 1)
+        status = self.pool.status()
+        self.assertEqual((status['in_use'], status['idle']), (0, 1))
+
+    def test_connection_error_discards_connection(self):
+        with self.assertRaises(FakeOperationalError):
+            with self.pool.connection(**PARAMS) as conn:
+                raise FakeOperationalError("connection reset")
+
+        self.assertTrue(conn.closed)
+        status = self.pool.status()
+        self.assertEqual((status['in_use'], status['idle'], status['discarded']), (0, 0, 1))
+
+    def test_failed_connect_frees_its_slot(self):
+        with mock.patch.object(db_pool.psycopg2, 'connect', side_effect=FakeOperationalError("refused")):
+            for _ in range(3):
+                with self.assertRaises(FakeOperationalError):
+                    self.pool.getconn(**PARAMS)
+
+        self.assertEqual(self.pool.status()['in_use'], 0)
+        self.assertIsNotNone(self.pool.getconn(**PARAMS))
+
+    def test_foreign_connection_is_closed_not_pooled(self):
+        stranger = FakeConnection()
+        self.pool.putconn(stranger)
+
+        self.assertTrue(stranger.closed)
+        self.assertEqual(self.pool.status()['idle'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()